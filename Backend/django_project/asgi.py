@@ -3,5 +3,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_project.settings')
+# Pod ASGI żądania GET list i podsumowań obsługują widoki asynchroniczne (myapp.async_views).
+os.environ.setdefault('ASYNC_READ_VIEWS', '1')
+# Pod ASGI kod synchroniczny działa w wątku danego żądania, więc trwałe połączenia
+# nie byłyby ponownie używane; pulę połączeń zapewnia wtedy PgBouncer (DB_PGBOUNCER=1).
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
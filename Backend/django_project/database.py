@@ -0,0 +1,55 @@
+from urllib.parse import urlparse, parse_qsl
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+def _flag(value):
+    return str(value).lower() in TRUE_VALUES
+
+
+def database_from_url(url, environ):
+    """
+    **Buduje konfigurację bazy PostgreSQL z `DATABASE_URL` i zmiennych środowiskowych.**
+
+    Parametry puli można podać w adresie (`?conn_max_age=600&pgbouncer=1`) lub w
+    zmiennych `DB_*`; zmienne środowiskowe mają pierwszeństwo:
+
+    - `conn_max_age` / `DB_CONN_MAX_AGE` - czas życia połączenia w sekundach
+      (0 - nowe połączenie na każde żądanie, `none` - bez limitu),
+    - `conn_health_checks` / `DB_CONN_HEALTH_CHECKS` - sprawdzenie połączenia przed ponownym użyciem,
+    - `pgbouncer` / `DB_PGBOUNCER` - zgodność z PgBouncerem w trybie transakcji
+      (bez kursorów po stronie serwera),
+    - `statement_timeout` / `DB_STATEMENT_TIMEOUT` - limit czasu zapytania w ms.
+
+    Pozostałe parametry adresu (np. `sslmode`, `connect_timeout`) trafiają do `OPTIONS`.
+    """
+    parsed = urlparse(url)
+    query = dict(parse_qsl(parsed.query))
+
+    def option(name, default):
+        return environ.get(f'DB_{name.upper()}', query.pop(name, default))
+
+    conn_max_age = option('conn_max_age', '60')
+    health_checks = option('conn_health_checks', '1')
+    pgbouncer = _flag(option('pgbouncer', '0'))
+    statement_timeout = int(option('statement_timeout', '0'))
+
+    options = dict(query)
+    if statement_timeout:
+        # PgBouncer w trybie transakcji odrzuca parametr startowy `options`; limit
+        # należy wtedy ustawić po stronie bazy (ALTER ROLE ... SET statement_timeout).
+        if not pgbouncer:
+            options['options'] = f'-c statement_timeout={statement_timeout}'
+
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': parsed.path[1:],
+        'USER': parsed.username,
+        'PASSWORD': parsed.password,
+        'HOST': parsed.hostname,
+        'PORT': parsed.port,
+        'CONN_MAX_AGE': None if str(conn_max_age).lower() == 'none' else int(conn_max_age),
+        'CONN_HEALTH_CHECKS': _flag(health_checks),
+        'DISABLE_SERVER_SIDE_CURSORS': pgbouncer,
+        'OPTIONS': options,
+    }
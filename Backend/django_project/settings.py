@@ -2,7 +2,8 @@ from pathlib import Path
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
-from urllib.parse import urlparse
+
+from .database import database_from_url
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -17,17 +18,68 @@ ALLOWED_HOSTS = ['*']
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'myapp.authentication.StatelessJWTAuthentication'
+        if os.getenv('JWT_STATELESS_AUTH', '0') == '1'
+        else 'myapp.authentication.CachedJWTAuthentication',
     ],
+    # Limity prób logowania i rejestracji (myapp.throttling).
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.getenv('LOGIN_IP_THROTTLE_RATE', '20/min'),
+        'login_username': os.getenv('LOGIN_USERNAME_THROTTLE_RATE', '10/min'),
+        'register_ip': os.getenv('REGISTER_IP_THROTTLE_RATE', '10/hour'),
+    },
+    # Liczba zaufanych proxy przed aplikacją; 0 - adres klienta z REMOTE_ADDR
+    # (nagłówek X-Forwarded-For od klienta nie może omijać limitów).
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
 }
 
+LEDGER_PAGE_SIZE = int(os.getenv('LEDGER_PAGE_SIZE', 100))
+LEDGER_MAX_PAGE_SIZE = int(os.getenv('LEDGER_MAX_PAGE_SIZE', 1000))
+LEDGER_BULK_MAX_ITEMS = int(os.getenv('LEDGER_BULK_MAX_ITEMS', 5000))
+LEDGER_BULK_CHUNK_SIZE = int(os.getenv('LEDGER_BULK_CHUNK_SIZE', 500))
+LEDGER_IMPORT_BATCH_SIZE = int(os.getenv('LEDGER_IMPORT_BATCH_SIZE', 2000))
+# Import przez API działa w ramach żądania (ok. 5 tys. wierszy/s), więc plik musi
+# zmieścić się w GUNICORN_TIMEOUT; większe pliki - polecenie `import_transactions`.
+LEDGER_IMPORT_MAX_BYTES = int(os.getenv('LEDGER_IMPORT_MAX_BYTES', 5 * 1024 * 1024))
+LEDGER_IMPORT_MAX_ROWS = int(os.getenv('LEDGER_IMPORT_MAX_ROWS', 50000))
+LEDGER_EXPORT_CHUNK_SIZE = int(os.getenv('LEDGER_EXPORT_CHUNK_SIZE', 2000))
+SUMMARY_MAX_MONTHS = int(os.getenv('SUMMARY_MAX_MONTHS', 120))
+DELETION_BATCH_SIZE = int(os.getenv('DELETION_BATCH_SIZE', 1000))
+ADMIN_USER_PAGE_SIZE = int(os.getenv('ADMIN_USER_PAGE_SIZE', 50))
+ADMIN_USER_MAX_PAGE_SIZE = int(os.getenv('ADMIN_USER_MAX_PAGE_SIZE', 500))
+SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', 50))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv('SEARCH_MAX_PAGE_SIZE', 200))
+
+# Kolejka zadań w tle (run_worker). JOB_CONCURRENCY w formacie "typ=limit,typ=limit"
+# nadpisuje limity równoczesności zadeklarowane przy funkcjach obsługujących.
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 5))
+JOB_RETRY_BASE_DELAY = int(os.getenv('JOB_RETRY_BASE_DELAY', 10))
+JOB_RETRY_MAX_DELAY = int(os.getenv('JOB_RETRY_MAX_DELAY', 60 * 60))
+JOB_LOCK_TIMEOUT = int(os.getenv('JOB_LOCK_TIMEOUT', 60 * 60))
+JOB_CONCURRENCY = {
+    job_type.strip(): int(limit)
+    for job_type, limit in (
+        item.split('=', 1) for item in os.getenv('JOB_CONCURRENCY', '').split(',') if '=' in item
+    )
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "TOKEN_OBTAIN_SERIALIZER": "myapp.serializers.ClaimsTokenObtainPairSerializer",
+    # Claimy `is_staff`/`is_superuser` itd. są przy odświeżeniu odczytywane z bazy, więc przy
+    # JWT_STATELESS_AUTH zmiana uprawnień działa najpóźniej po ACCESS_TOKEN_LIFETIME.
+    "TOKEN_REFRESH_SERIALIZER": "myapp.serializers.ClaimsTokenRefreshSerializer",
 }
+# Czas (s) przechowywania użytkownika w pamięci procesu przy uwierzytelnianiu JWT (0 - wyłączone).
+JWT_USER_CACHE_TTL = int(os.getenv('JWT_USER_CACHE_TTL', 30))
+# Maksymalna liczba równoczesnych haszowań hasła w procesie (0 - bez limitu) i czas
+# oczekiwania (s) na wolne miejsce, po którym logowanie/rejestracja dostaje 429.
+PASSWORD_HASH_CONCURRENCY = int(os.getenv('PASSWORD_HASH_CONCURRENCY', 1))
+PASSWORD_HASH_WAIT = float(os.getenv('PASSWORD_HASH_WAIT', 0.5))
 
 INSTALLED_APPS = [
     'django.contrib.admin',
@@ -79,19 +131,41 @@ SPECTACULAR_SETTINGS = {
 }
 
 WSGI_APPLICATION = 'django_project.wsgi.application'
+ASGI_APPLICATION = 'django_project.asgi.application'
 
 if DATABASE_URL:
-    parsed_url = urlparse(DATABASE_URL)
+    # Trwałe połączenia (CONN_MAX_AGE), health checki, tryb PgBouncera i statement_timeout
+    # - patrz django_project/database.py.
     DATABASES = {
+        'default': database_from_url(DATABASE_URL, os.environ),
+    }
+
+CACHE_DIR = os.getenv('CACHE_DIR')
+if CACHE_DIR:
+    CACHES = {
         'default': {
-            'ENGINE': 'django.db.backends.postgresql',
-            'NAME': parsed_url.path[1:],
-            'USER': parsed_url.username,
-            'PASSWORD': parsed_url.password,
-            'HOST': parsed_url.hostname,
-            'PORT': parsed_url.port,
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
         }
     }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'home-budget',
+        }
+    }
+# Liczniki limitów logowania zawsze w lokalnej pamięci procesu.
+CACHES['throttle'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'home-budget-throttle',
+}
+
+SUMMARY_CACHE_TIMEOUT = int(os.getenv('SUMMARY_CACHE_TIMEOUT', 24 * 60 * 60))
+SINGLE_FLIGHT_ADVISORY_LOCK = os.getenv('SINGLE_FLIGHT_ADVISORY_LOCK', '0') == '1'
+# Asynchroniczne widoki odczytu (listy miesięczne, kategorie, podsumowanie, profil);
+# włączać przy uruchomieniu pod ASGI (django_project.asgi).
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', '0') == '1'
 
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
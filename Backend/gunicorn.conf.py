@@ -0,0 +1,58 @@
+"""
+Konfiguracja gunicorn dla środowiska produkcyjnego.
+
+Profil wybiera zmienna GUNICORN_PROFILE:
+
+- `sync`    - klasyczne workery synchroniczne (jedno żądanie na proces),
+- `gthread` - workery wielowątkowe (domyślny; GUNICORN_THREADS wątków na proces),
+- `asgi`    - workery uvicorn z aplikacją `django_project.asgi` (widoki asynchroniczne).
+
+Liczbę workerów wyznacza liczba rdzeni (2 * CPU + 1 dla `sync`, CPU + 1 dla
+`gthread`, CPU dla `asgi`), a nadpisuje ją GUNICORN_WORKERS (lub WEB_CONCURRENCY).
+"""
+import multiprocessing
+import os
+
+PROFILES = {
+    'sync': {'worker_class': 'sync', 'app': 'django_project.wsgi:application'},
+    'gthread': {'worker_class': 'gthread', 'app': 'django_project.wsgi:application'},
+    'asgi': {'worker_class': 'uvicorn.workers.UvicornWorker', 'app': 'django_project.asgi:application'},
+}
+
+profile = os.getenv('GUNICORN_PROFILE', 'gthread')
+if profile not in PROFILES:
+    raise RuntimeError(f"Nieznany GUNICORN_PROFILE={profile!r}; dostępne: {', '.join(PROFILES)}")
+
+cpus = multiprocessing.cpu_count()
+default_workers = {'sync': 2 * cpus + 1, 'gthread': cpus + 1, 'asgi': cpus}[profile]
+
+wsgi_app = PROFILES[profile]['app']
+worker_class = PROFILES[profile]['worker_class']
+workers = int(os.getenv('GUNICORN_WORKERS', os.getenv('WEB_CONCURRENCY', default_workers)))
+threads = int(os.getenv('GUNICORN_THREADS', 4)) if profile == 'gthread' else 1
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+backlog = int(os.getenv('GUNICORN_BACKLOG', 2048))
+
+# Aplikacja ładowana raz w procesie głównym; workery współdzielą jej pamięć (copy-on-write).
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') == '1'
+
+# Okresowy restart workerów ogranicza skutki wycieków pamięci; jitter rozkłada
+# restarty w czasie, żeby wszystkie workery nie restartowały się naraz.
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def pre_fork(server, worker):
+    # Połączenia z bazą otwarte w procesie głównym przy `preload_app` nie mogą być
+    # dziedziczone przez workery; proces główny nie obsługuje żądań, więc je zamyka.
+    from django.db import connections
+    connections.close_all()
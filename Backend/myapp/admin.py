@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
-from myapp.models import IncomesCategory, ExpensesCategory, Incomes, Expenses
+from myapp.models import IncomesCategory, ExpensesCategory, Incomes, Expenses, MonthlyCategoryTotal, LedgerVersion, PendingDeletion, Job
 
 admin.site.unregister(User)
 admin.site.register(User, UserAdmin)
@@ -9,3 +9,7 @@ admin.site.register(IncomesCategory)
 admin.site.register(ExpensesCategory)
 admin.site.register(Incomes)
 admin.site.register(Expenses)
+admin.site.register(MonthlyCategoryTotal)
+admin.site.register(LedgerVersion)
+admin.site.register(PendingDeletion)
+admin.site.register(Job)
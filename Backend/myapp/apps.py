@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class MyappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'myapp'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        # Rejestracja funkcji obsługujących zadania w tle (`run_worker`).
+        from . import deletion, rollups  # noqa: F401
@@ -0,0 +1,184 @@
+import datetime
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .authentication import user_cache
+from .filters import filter_by_month, filter_ledger, LEDGER_ORDERINGS
+from .models import Incomes, Expenses, IncomesCategory, ExpensesCategory, LedgerVersion
+from .serializers import IncomesSerializer, ExpensesSerializer, IncomesCategorySerializer, \
+    ExpensesCategorySerializer, LedgerListFilterSerializer, LEDGER_LIST_VALUES
+from .summary import cached_month_summary
+
+_jwt = JWTAuthentication()
+
+
+def _json(data, status_code=status.HTTP_200_OK):
+    # Te same bajty co `JSONRenderer` w widokach DRF.
+    return HttpResponse(JSONRenderer().render(data), status=status_code, content_type='application/json')
+
+
+def _unauthorized(exc):
+    # Ten sam kształt odpowiedzi co w `rest_framework.views.exception_handler`.
+    response = _json(exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail},
+                     status.HTTP_401_UNAUTHORIZED)
+    response['WWW-Authenticate'] = _jwt.authenticate_header(None)
+    return response
+
+
+async def authenticate(request):
+    """
+    **Asynchroniczny odpowiednik `JWTAuthentication` + `IsAuthenticated`.**
+
+    Weryfikacja tokenu nie wymaga bazy danych; użytkownik jest brany z `user_cache`
+    albo pobierany przez asynchroniczne ORM (`afirst`). Błędy zgłaszane są tymi samymi
+    wyjątkami co w DRF.
+    """
+    header = _jwt.get_header(request)
+    raw_token = _jwt.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        raise NotAuthenticated()
+    token = _jwt.get_validated_token(raw_token)
+    user_id = token.get(jwt_settings.USER_ID_CLAIM)
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id}).afirst()
+        if user is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if user.is_active:
+            user_cache.set(user)
+    if not user.is_active:
+        raise AuthenticationFailed("User is inactive", code="user_inactive")
+    return user
+
+
+async def _ledger_etag(request, user):
+    version = await LedgerVersion.objects.filter(user_id=user.id).values_list('version', flat=True).afirst()
+    request.ledger_data_version = version or 0
+    return f'"{user.id}.{request.ledger_data_version}.json"'
+
+
+def _with_etag(response, etag):
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def async_read_view(sync_view, handler, ledger_etag=False):
+    """
+    **Łączy asynchroniczną obsługę `GET`/`HEAD` z istniejącym widokiem DRF dla pozostałych metod.**
+
+    `handler(request, user, **kwargs)` zwraca dane odpowiedzi albo gotowy `HttpResponse`.
+    Przy `ledger_etag=True` obsługiwane są żądania warunkowe, tak jak w `LedgerETagMixin`.
+    Widok zachowuje atrybuty `cls`/`initkwargs` widoku DRF, więc schemat OpenAPI się nie zmienia.
+    """
+    async def view(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return await sync_to_async(sync_view)(request, *args, **kwargs)
+        try:
+            user = await authenticate(request)
+        except (NotAuthenticated, AuthenticationFailed, InvalidToken) as exc:
+            return _unauthorized(exc)
+        request.user = user
+        etag = None
+        if ledger_etag:
+            etag = await _ledger_etag(request, user)
+            not_modified = get_conditional_response(request, etag=etag)
+            if not_modified is not None:
+                return _with_etag(not_modified, etag)
+        data = await handler(request, user, *args, **kwargs)
+        response = data if isinstance(data, HttpResponse) else _json(data)
+        if etag and response.status_code == status.HTTP_200_OK:
+            _with_etag(response, etag)
+        return response
+
+    view.csrf_exempt = True
+    view.cls = sync_view.cls
+    view.initkwargs = sync_view.initkwargs
+    view.view_class = sync_view.view_class
+    view.view_initkwargs = sync_view.view_initkwargs
+    return view
+
+
+async def user_info(request, user):
+    return {
+        "id": user.id,
+        "username": user.username,
+        "is_superuser": user.is_superuser,
+        "is_staff": user.is_staff,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+    }
+
+
+async def incomes_categories(request, user):
+    categories = [c async for c in IncomesCategory.objects.filter(user=user, is_deleted=False).order_by('category')]
+    return IncomesCategorySerializer(categories, many=True).data
+
+
+async def expenses_categories(request, user):
+    categories = [c async for c in ExpensesCategory.objects.filter(user=user, is_deleted=False).order_by('category')]
+    return ExpensesCategorySerializer(categories, many=True).data
+
+
+async def _month_rows(request, model, year, month):
+    # Te same filtry i sortowanie co w `IncomesView`/`ExpensesView.get_queryset`.
+    queryset = model.objects.filter(user=request.user, category__is_deleted=False)
+    try:
+        queryset = filter_by_month(queryset, year, month)
+    except ValueError:
+        return []
+    filters = LedgerListFilterSerializer(data=request.GET)
+    if not filters.is_valid():
+        return _json(filters.errors, status.HTTP_400_BAD_REQUEST)
+    queryset = filter_ledger(queryset, filters.validated_data)
+    ordering = LEDGER_ORDERINGS[filters.validated_data['ordering']]
+    return [row async for row in queryset.order_by(*ordering).values(*LEDGER_LIST_VALUES)]
+
+
+async def incomes_by_month(request, user, year, month):
+    rows = await _month_rows(request, Incomes, year, month)
+    if isinstance(rows, HttpResponse):
+        return rows
+    return IncomesSerializer(rows, many=True).data
+
+
+async def expenses_by_month(request, user, year, month):
+    rows = await _month_rows(request, Expenses, year, month)
+    if isinstance(rows, HttpResponse):
+        return rows
+    return ExpensesSerializer(rows, many=True).data
+
+
+async def monthly_summary(request, user, year, month):
+    try:
+        current_year = datetime.datetime.now().year
+        if not (1900 <= year <= current_year + 1):
+            return _json(
+                {"error": "Invalid year. Year must be between 1900 and the current year + 1."},
+                status.HTTP_400_BAD_REQUEST
+            )
+        if not (1 <= month <= 12):
+            return _json(
+                {"error": "Invalid month. Month must be between 1 and 12."},
+                status.HTTP_400_BAD_REQUEST
+            )
+        datetime.date(year, month, 1)
+    except ValueError:
+        return _json({"error": "Invalid year or month combination."}, status.HTTP_400_BAD_REQUEST)
+
+    # Cache i `single_flight` są synchroniczne; pod ASGI każde żądanie ma własny
+    # wątek dla kodu synchronicznego, więc równoległe żądania się nie blokują.
+    summary, hit = await sync_to_async(cached_month_summary)(user.id, year, month, request.ledger_data_version)
+    response = _json(summary)
+    response['X-Summary-Cache'] = 'hit' if hit else 'miss'
+    return response
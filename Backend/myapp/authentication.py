@@ -0,0 +1,175 @@
+import copy
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    **Pamięć podręczna użytkowników w obrębie procesu, z czasem życia `JWT_USER_CACHE_TTL` sekund.**
+
+    Wpis jest usuwany przy każdym zapisie lub usunięciu użytkownika (sygnały w `signals.py`).
+    Inne procesy widzą zmianę najpóźniej po upływie TTL. Zwracane są kopie, więc
+    modyfikacja `request.user` nie zmienia wpisu w cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = {}
+
+    def get(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            entry = self._users.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires <= time.monotonic():
+                del self._users[key]
+                return None
+        return copy.copy(user)
+
+    def set(self, user):
+        ttl = settings.JWT_USER_CACHE_TTL
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._users[str(user.pk)] = (time.monotonic() + ttl, copy.copy(user))
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache()
+
+
+def _user_id(validated_token):
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError as e:
+        raise InvalidToken("Token contained no recognizable user identification") from e
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    **`JWTAuthentication` bez zapytania o użytkownika przy każdym żądaniu.**
+
+    Wiersz użytkownika jest pobierany raz i przechowywany w `user_cache`; kontrola
+    aktywności konta (i ewentualnie `CHECK_REVOKE_TOKEN`) wykonywana jest także dla
+    użytkownika z cache.
+    """
+
+    def get_user(self, validated_token):
+        user = user_cache.get(_user_id(validated_token))
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user)
+            return user
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and \
+                validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.", code="password_changed")
+        return user
+
+
+TOKEN_USER_CLAIMS = ('username', 'is_staff', 'is_superuser')
+TOKEN_PROFILE_CLAIMS = ('email', 'first_name', 'last_name')
+PROFILE_VERSION_CLAIM = 'profile_version'
+
+
+def profile_version(user):
+    """
+    **Wersja danych profilu zapisanych w claimach: skrót pól `TOKEN_USER_CLAIMS` i `TOKEN_PROFILE_CLAIMS`.**
+
+    Każda zmiana tych pól zmienia wersję, więc tokeny wydane wcześniej przestają być aktualne.
+    """
+    values = '\x00'.join(str(getattr(user, field)) for field in TOKEN_USER_CLAIMS + TOKEN_PROFILE_CLAIMS)
+    return hashlib.sha256(values.encode()).hexdigest()[:16]
+
+
+def user_claims(user):
+    """
+    **Claimy użytkownika i profilu zapisywane w tokenach, razem z `profile_version`.**
+    """
+    claims = {claim: getattr(user, claim) for claim in TOKEN_USER_CLAIMS + TOKEN_PROFILE_CLAIMS}
+    claims[PROFILE_VERSION_CLAIM] = profile_version(user)
+    return claims
+
+
+class StatelessJWTAuthentication(CachedJWTAuthentication):
+    """
+    **Uwierzytelnianie bez bazy danych: użytkownik budowany jest z claimów tokenu (`JWT_STATELESS_AUTH`).**
+
+    `request.user` to niezapisany obiekt `User` z `id`, `username`, `is_staff` i
+    `is_superuser` z tokenu, z atrybutem `from_token = True`. Zmiany uprawnień lub
+    dezaktywacja konta działają dopiero po wygaśnięciu tokenu dostępu
+    (`ACCESS_TOKEN_LIFETIME`); przy odświeżeniu claimy są odczytywane z bazy
+    (`ClaimsTokenRefreshSerializer`). Tokeny bez tych claimów (wydane wcześniej)
+    obsługiwane są jak w `CachedJWTAuthentication`.
+    """
+
+    def get_user(self, validated_token):
+        user_id = _user_id(validated_token)
+        if any(claim not in validated_token for claim in TOKEN_USER_CLAIMS):
+            return super().get_user(validated_token)
+        user = User(
+            id=user_id,
+            username=validated_token['username'],
+            is_staff=validated_token['is_staff'],
+            is_superuser=validated_token['is_superuser'],
+            is_active=True,
+            **{claim: validated_token[claim] for claim in TOKEN_PROFILE_CLAIMS if claim in validated_token},
+        )
+        user.from_token = True
+        return user
+
+
+def database_user(user):
+    """
+    **Zwraca bieżący wiersz użytkownika z bazy.**
+
+    Używane przed zapisem użytkownika: obiekt z tokenu ma puste pozostałe pola (np. hasło),
+    a kopia z `user_cache` może nie zawierać zmian (np. `is_staff`, `is_active`)
+    zapisanych w innym procesie w ciągu ostatnich `JWT_USER_CACHE_TTL` sekund.
+    """
+    user = User.objects.get(pk=user.pk)
+    user_cache.set(user)
+    return user
+
+
+def token_profile(user, token):
+    """
+    **Dane profilu z claimów tokenu, o ile są aktualne; w przeciwnym razie `None`.**
+
+    Claimy są aktualne, gdy `profile_version` z tokenu zgadza się z wersją bieżącego
+    użytkownika: `request.user` z `user_cache`/bazy albo - dla użytkownika zbudowanego
+    z tokenu - wpisu w `user_cache`. Brak wpisu oznacza, że aktualności nie da się
+    sprawdzić bez bazy.
+    """
+    claims = TOKEN_USER_CLAIMS + TOKEN_PROFILE_CLAIMS
+    if token is None or any(claim not in token for claim in claims + (PROFILE_VERSION_CLAIM,)):
+        return None
+    current = user_cache.get(user.pk) if getattr(user, 'from_token', False) else user
+    if current is None or profile_version(current) != token[PROFILE_VERSION_CLAIM]:
+        return None
+    return {'id': user.pk, **{claim: token[claim] for claim in claims}}
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    # Ten sam schemat `Bearer` w dokumentacji OpenAPI co dla `JWTAuthentication`.
+    target_class = 'myapp.authentication.CachedJWTAuthentication'
+    match_subclasses = True
@@ -0,0 +1,56 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from .models import LedgerVersion
+
+
+def ledger_version(user_id):
+    """
+    **Zwraca bieżący numer wersji danych użytkownika (0, jeśli nic jeszcze nie zapisał).**
+    """
+    version = LedgerVersion.objects.filter(user_id=user_id).values_list('version', flat=True).first()
+    return version or 0
+
+
+def bump_ledger_version(user_id):
+    """
+    **Zwiększa numer wersji danych użytkownika (tworząc wiersz w razie potrzeby).**
+
+    Wywoływana w tej samej transakcji co zapis, więc wycofany zapis nie zmienia wersji.
+    """
+    if LedgerVersion.objects.filter(user_id=user_id).update(version=F('version') + 1):
+        return
+    try:
+        with transaction.atomic():
+            LedgerVersion.objects.create(user_id=user_id, version=1)
+    except IntegrityError:
+        LedgerVersion.objects.filter(user_id=user_id).update(version=F('version') + 1)
+
+
+class LedgerETagMixin:
+    """
+    **Mixin obsługujący warunkowe żądania GET (`If-None-Match`) na danych użytkownika.**
+
+    `ETag` wyznaczany jest z numeru wersji danych użytkownika, więc odpowiedź 304
+    nie wymaga wykonania głównego zapytania ani serializacji.
+    """
+    ledger_etag = None
+    ledger_data_version = None
+
+    def ledger_not_modified(self, request):
+        """
+        **Zwraca odpowiedź 304, jeśli klient ma aktualną wersję danych, w przeciwnym razie `None`.**
+
+        Odczytana wersja zostaje w `ledger_data_version` (np. dla cache podsumowań).
+        """
+        version = self.ledger_data_version = ledger_version(request.user.id)
+        self.ledger_etag = f'"{request.user.id}.{version}.{request.accepted_renderer.format}"'
+        return get_conditional_response(request, etag=self.ledger_etag)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.ledger_etag and request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+            response['ETag'] = self.ledger_etag
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
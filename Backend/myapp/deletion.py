@@ -0,0 +1,139 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import router, transaction
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from . import jobs, rollups
+from .models import Incomes, Expenses, IncomesCategory, ExpensesCategory, PendingDeletion
+
+LEDGER_BY_CATEGORY = {
+    IncomesCategory: Incomes,
+    ExpensesCategory: Expenses,
+}
+
+KIND_BY_CATEGORY = {
+    IncomesCategory: PendingDeletion.KIND_INCOMES_CATEGORY,
+    ExpensesCategory: PendingDeletion.KIND_EXPENSES_CATEGORY,
+}
+
+CATEGORY_BY_KIND = {kind: model for model, kind in KIND_BY_CATEGORY.items()}
+
+
+def schedule_category_deletion(category):
+    """
+    **Oznacza kategorię jako usuniętą i zleca usunięcie jej wpisów w tle.**
+
+    Kategoria znika z list od razu, a jej sumy miesięczne są usuwane w tej samej
+    transakcji. Koszt nie zależy od liczby wpisów kategorii.
+    """
+    category_model = type(category)
+    ledger_model = LEDGER_BY_CATEGORY[category_model]
+    with transaction.atomic():
+        category.is_deleted = True
+        category.save(update_fields=['is_deleted'])
+        rollups.forget_category(ledger_model, category.pk)
+        pending = PendingDeletion.objects.create(
+            kind=KIND_BY_CATEGORY[category_model],
+            object_id=category.pk,
+            owner_id=category.user_id,
+            total=ledger_model.objects.filter(category=category).count(),
+        )
+        jobs.enqueue('purge_deletion', {'deletion_id': pending.pk}, owner_id=pending.owner_id)
+        return pending
+
+
+def schedule_user_deletion(user, requested_by):
+    """
+    **Dezaktywuje użytkownika i zleca usunięcie jego danych w tle.**
+
+    Ponowne zlecenie dla użytkownika, którego usuwanie jeszcze trwa, zwraca istniejące zlecenie.
+    """
+    with transaction.atomic():
+        existing = PendingDeletion.objects.filter(
+            kind=PendingDeletion.KIND_USER, object_id=user.pk,
+            status__in=[PendingDeletion.STATUS_PENDING, PendingDeletion.STATUS_RUNNING],
+        ).first()
+        if existing is not None:
+            return existing
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+        pending = PendingDeletion.objects.create(
+            kind=PendingDeletion.KIND_USER,
+            object_id=user.pk,
+            owner_id=requested_by.pk,
+            total=Incomes.objects.filter(user=user).count() + Expenses.objects.filter(user=user).count(),
+        )
+        jobs.enqueue('purge_deletion', {'deletion_id': pending.pk}, owner_id=pending.owner_id)
+        return pending
+
+
+def _delete(objects, origin):
+    # `origin` wskazuje sygnałom, że to usuwanie w tle, a nie bezpośrednie usunięcie
+    # wpisu - sumy miesięczne zostały już wyczyszczone przy zleceniu.
+    if not objects:
+        return
+    collector = Collector(using=router.db_for_write(type(objects[0])), origin=origin)
+    collector.collect(objects)
+    collector.delete()
+
+
+def _purge_querysets(pending):
+    if pending.kind == PendingDeletion.KIND_USER:
+        return [
+            Incomes.objects.filter(user_id=pending.object_id),
+            Expenses.objects.filter(user_id=pending.object_id),
+        ], User.objects.filter(pk=pending.object_id)
+    category_model = CATEGORY_BY_KIND[pending.kind]
+    ledger_model = LEDGER_BY_CATEGORY[category_model]
+    return [ledger_model.objects.filter(category_id=pending.object_id)], \
+        category_model.objects.filter(pk=pending.object_id)
+
+
+def purge(pending, batch_size=None):
+    """
+    **Usuwa dane zlecenia porcjami po `batch_size` wpisów, zapisując postęp po każdej porcji.**
+
+    Każda porcja to osobna transakcja, więc przerwane usuwanie można wznowić
+    (także po błędzie, przy kolejnej próbie zadania). Na końcu usuwany jest sam
+    obiekt (kategoria lub użytkownik).
+    """
+    batch_size = batch_size or settings.DELETION_BATCH_SIZE
+    querysets, target = _purge_querysets(pending)
+    pending.status = PendingDeletion.STATUS_RUNNING
+    pending.save(update_fields=['status'])
+    try:
+        for queryset in querysets:
+            while True:
+                with transaction.atomic():
+                    batch = list(queryset.order_by('pk')[:batch_size])
+                    if not batch:
+                        break
+                    _delete(batch, pending)
+                    pending.deleted += len(batch)
+                    pending.save(update_fields=['deleted'])
+        with transaction.atomic():
+            _delete(list(target), pending)
+            pending.status = PendingDeletion.STATUS_DONE
+            pending.finished_at = timezone.now()
+            pending.save(update_fields=['status', 'finished_at'])
+    except Exception as exc:
+        pending.status = PendingDeletion.STATUS_FAILED
+        pending.error = str(exc)
+        pending.finished_at = timezone.now()
+        pending.save(update_fields=['status', 'error', 'finished_at'])
+        raise
+    return pending
+
+
+
+@jobs.job_handler('purge_deletion', concurrency=2)
+def purge_deletion_job(job):
+    """
+    **Zadanie w tle usuwające dane zlecenia `PendingDeletion` o ID `payload['deletion_id']`.**
+    """
+    pending = PendingDeletion.objects.get(pk=job.payload['deletion_id'])
+    if pending.status == PendingDeletion.STATUS_DONE:
+        return {'deleted': pending.deleted}
+    purge(pending)
+    return {'deleted': pending.deleted}
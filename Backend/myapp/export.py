@@ -0,0 +1,82 @@
+import csv
+import json
+import zlib
+
+from django.conf import settings
+
+from .filters import filter_ledger
+from .models import Incomes, Expenses
+
+EXPORT_COLUMNS = ['type', 'id', 'date', 'category', 'amount', 'description']
+
+KIND_LABELS = {Incomes: 'income', Expenses: 'expense'}
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def ledger_rows(user, models, filters=None):
+    """
+    **Generator krotek `(type, id, date, category, amount, description)` z księgi użytkownika.**
+
+    `filters` to zweryfikowane filtry `LedgerFilterSerializer` (kategorie, kwoty, daty).
+    Wiersze są pobierane przez `QuerySet.iterator(chunk_size=...)`, więc w pamięci
+    znajduje się co najwyżej jedna porcja niezależnie od liczby wpisów.
+    """
+    for model in models:
+        queryset = filter_ledger(model.objects.filter(user=user, category__is_deleted=False), filters or {})
+        rows = queryset.order_by('date', 'id').values_list(
+            'id', 'date', 'category__category', 'amount', 'description'
+        ).iterator(chunk_size=settings.LEDGER_EXPORT_CHUNK_SIZE)
+        label = KIND_LABELS[model]
+        for row in rows:
+            yield (label,) + row
+
+
+def _batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for batch in _batched(rows, settings.LEDGER_EXPORT_CHUNK_SIZE):
+        yield ''.join(
+            writer.writerow((kind, id_, date.isoformat(), category, f'{amount:.2f}', description or ''))
+            for kind, id_, date, category, amount, description in batch
+        )
+
+
+def stream_json(rows):
+    yield '['
+    separator = ''
+    for batch in _batched(rows, settings.LEDGER_EXPORT_CHUNK_SIZE):
+        chunk = ','.join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, (kind, id_, date.isoformat(), category, f'{amount:.2f}', description))),
+                       ensure_ascii=False)
+            for kind, id_, date, category, amount, description in batch
+        )
+        yield separator + chunk
+        separator = ','
+    yield ']'
+
+
+def gzip_stream(chunks):
+    """
+    **Kompresuje strumień tekstu do formatu gzip w locie, porcja po porcji.**
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
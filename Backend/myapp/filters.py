@@ -0,0 +1,106 @@
+import datetime
+
+from django.db.models import DecimalField, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Incomes, Expenses, MonthlyCategoryTotal
+
+
+def month_date_range(year, month):
+    """
+    **Zwraca półotwarty zakres dat `[początek, koniec)` dla danego miesiąca.**
+
+    Koniec zakresu to pierwszy dzień kolejnego miesiąca, dzięki czemu warunek
+    `date >= start AND date < end` może korzystać z indeksu `(user, -date)`.
+    """
+    start = datetime.date(year, month, 1)
+    if month == 12:
+        end = datetime.date(year + 1, 1, 1)
+    else:
+        end = datetime.date(year, month + 1, 1)
+    return start, end
+
+
+def filter_by_month(queryset, year, month, field='date'):
+    """
+    **Zawęża queryset do wpisów z danego miesiąca.**
+
+    Zastępuje niesargowalne `date__year`/`date__month` porównaniem zakresowym.
+    """
+    start, end = month_date_range(year, month)
+    return queryset.filter(**{f'{field}__gte': start, f'{field}__lt': end})
+
+
+# Dopuszczalne wartości parametru `ordering` list przychodów i wydatków. Drugie pole
+# (`id`) rozstrzyga remisy i jest częścią kursora paginacji.
+LEDGER_ORDERINGS = {
+    '-date': ('-date', '-id'),
+    'date': ('date', 'id'),
+    '-amount': ('-amount', '-id'),
+    'amount': ('amount', 'id'),
+}
+
+
+def filter_ledger(queryset, filters):
+    """
+    **Zawęża queryset przychodów lub wydatków według zweryfikowanych filtrów (`LedgerFilterSerializer`).**
+
+    Każdy filtr to prosty warunek na kolumnie, który baza może oprzeć na indeksie:
+    zakres dat - `(user, -date, -id)`, zakres kwot - `(user, amount, id)`
+    (migracja `0018_ledger_amount_indexes`), kategorie - `category_id IN (...)` na
+    indeksie klucza obcego.
+    """
+    if filters.get('category'):
+        queryset = queryset.filter(category_id__in=filters['category'])
+    if filters.get('amount_min') is not None:
+        queryset = queryset.filter(amount__gte=filters['amount_min'])
+    if filters.get('amount_max') is not None:
+        queryset = queryset.filter(amount__lte=filters['amount_max'])
+    if filters.get('date_from') is not None:
+        queryset = queryset.filter(date__gte=filters['date_from'])
+    if filters.get('date_to') is not None:
+        queryset = queryset.filter(date__lte=filters['date_to'])
+    return queryset
+
+
+def search_users(queryset, term):
+    """
+    **Wyszukiwanie użytkowników po prefiksie nazwy lub adresu e-mail (bez rozróżniania wielkości liter).**
+
+    Warunek `UPPER(pole) LIKE 'PREFIKS%'` korzysta w PostgreSQL z indeksów
+    `auth_user_upper_*_like` (migracja `0016_admin_user_search_indexes`).
+    """
+    term = (term or '').strip()
+    if not term:
+        return queryset
+    return queryset.filter(Q(username__istartswith=term) | Q(email__istartswith=term))
+
+
+def _rollup_sum(kind, field, output_field):
+    totals = MonthlyCategoryTotal.objects.filter(user=OuterRef('pk'), kind=kind).order_by() \
+        .values('user').annotate(value=Sum(field)).values('value')
+    return Coalesce(Subquery(totals, output_field=output_field), Value(0), output_field=output_field)
+
+
+def _last_date(model):
+    return Subquery(model.objects.filter(user=OuterRef('pk')).order_by('-date').values('date')[:1])
+
+
+def annotate_user_stats(queryset):
+    """
+    **Dodaje do listy użytkowników statystyki aktywności, liczone podzapytaniami w tym samym zapytaniu.**
+
+    Liczby i sumy transakcji pochodzą z sum miesięcznych (`MonthlyCategoryTotal`),
+    a data ostatniej aktywności - z indeksu `(user, -date, -id)` przychodów i wydatków.
+    Koszt zależy od liczby użytkowników na stronie, a nie od liczby ich transakcji.
+    """
+    amount = DecimalField(max_digits=14, decimal_places=2)
+    last_income, last_expense = _last_date(Incomes), _last_date(Expenses)
+    return queryset.annotate(
+        incomes_count=_rollup_sum(MonthlyCategoryTotal.KIND_INCOME, 'count', IntegerField()),
+        expenses_count=_rollup_sum(MonthlyCategoryTotal.KIND_EXPENSE, 'count', IntegerField()),
+        total_incomes=_rollup_sum(MonthlyCategoryTotal.KIND_INCOME, 'total', amount),
+        total_expenses=_rollup_sum(MonthlyCategoryTotal.KIND_EXPENSE, 'total', amount),
+        # Greatest zwraca NULL, gdy jeden z argumentów jest NULL (SQLite, MySQL).
+        last_activity=Greatest(Coalesce(last_income, last_expense), Coalesce(last_expense, last_income)),
+    )
@@ -0,0 +1,216 @@
+import csv
+import datetime
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+
+from . import rollups
+from .conditional import bump_ledger_version
+from .models import Incomes, Expenses, IncomesCategory, ExpensesCategory
+
+DEFAULT_COLUMNS = {
+    'date': 'date',
+    'amount': 'amount',
+    'category': 'category',
+    'description': 'description',
+    'type': 'type',
+}
+
+INCOME_TYPES = {'income', 'incomes', 'przychód', 'przychod', 'przychody'}
+EXPENSE_TYPES = {'expense', 'expenses', 'wydatek', 'wydatki'}
+
+DEFAULT_CATEGORY = 'Import'
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportResult:
+    """
+    **Podsumowanie importu: liczba wierszy, zapisanych wpisów, nowych kategorii i błędów.**
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.incomes = 0
+        self.expenses = 0
+        self.categories_created = 0
+        self.skipped = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def created(self):
+        return self.incomes + self.expenses
+
+    def add_error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'incomes': self.incomes,
+            'expenses': self.expenses,
+            'categories_created': self.categories_created,
+            'skipped': self.skipped,
+            'errors': self.errors,
+        }
+
+
+class TransactionImporter:
+    """
+    **Strumieniowy import przychodów i wydatków z pliku CSV (np. wyciągu bankowego).**
+
+    Plik jest czytany wiersz po wierszu, a wpisy zapisywane porcjami `batch_size`
+    przez `bulk_create`, więc zużycie pamięci nie zależy od rozmiaru pliku.
+    Brakujące kategorie są tworzone jednym zapytaniem na porcję. Gdy plik nie ma
+    kolumny z typem transakcji, kwoty ujemne są traktowane jako wydatki.
+    Przy `max_rows` plik z większą liczbą wierszy danych jest odrzucany w całości.
+    """
+
+    def __init__(self, user, columns=None, delimiter=',', date_format='%Y-%m-%d',
+                 decimal_comma=False, batch_size=None, max_rows=None):
+        self.user = user
+        self.max_rows = max_rows
+        self.columns = {**DEFAULT_COLUMNS, **(columns or {})}
+        self.delimiter = delimiter
+        self.date_format = date_format
+        self.decimal_comma = decimal_comma
+        self.batch_size = batch_size or settings.LEDGER_IMPORT_BATCH_SIZE
+        self.categories = {
+            Incomes: {c.category: c for c in IncomesCategory.objects.filter(user=user, is_deleted=False)},
+            Expenses: {c.category: c for c in ExpensesCategory.objects.filter(user=user, is_deleted=False)},
+        }
+        self.category_models = {Incomes: IncomesCategory, Expenses: ExpensesCategory}
+
+    def run(self, stream):
+        result = ImportResult()
+        started = time.perf_counter()
+        if self.max_rows is not None:
+            self.check_row_limit(stream)
+        reader = csv.reader(stream, delimiter=self.delimiter)
+        header = next(reader, None)
+        if header is None:
+            result.elapsed = time.perf_counter() - started
+            return result
+        positions = self.column_positions(header)
+
+        pending = {Incomes: [], Expenses: []}
+        for line, row in enumerate(reader, start=2):
+            if not any(row):
+                continue
+            result.rows += 1
+            try:
+                model, values = self.parse_row(row, positions)
+            except (ValueError, IndexError, InvalidOperation) as exc:
+                result.add_error(line, str(exc) or "Niepoprawny wiersz.")
+                continue
+            pending[model].append(values)
+            if len(pending[model]) >= self.batch_size:
+                self.flush(model, pending[model], result)
+                pending[model] = []
+
+        for model, rows in pending.items():
+            if rows:
+                self.flush(model, rows, result)
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    def check_row_limit(self, stream):
+        """
+        **Sprawdza liczbę wierszy danych przed zapisem czegokolwiek (strumień musi obsługiwać `seek`).**
+
+        Porcje są zatwierdzane w trakcie importu, więc limit przekroczony w połowie
+        pliku zostawiłby import częściowy.
+        """
+        reader = csv.reader(stream, delimiter=self.delimiter)
+        next(reader, None)
+        rows = 0
+        for row in reader:
+            rows += bool(any(row))
+            if rows > self.max_rows:
+                raise ValueError(
+                    f"Plik ma więcej niż {self.max_rows} wierszy danych. Podziel go na mniejsze części."
+                )
+        stream.seek(0)
+
+    def column_positions(self, header):
+        normalized = [name.strip().lower() for name in header]
+        positions = {}
+        for key, name in self.columns.items():
+            name = name.strip().lower()
+            if name in normalized:
+                positions[key] = normalized.index(name)
+            elif key in ('date', 'amount'):
+                raise ValueError(f"Brak wymaganej kolumny '{name}' w nagłówku pliku.")
+        return positions
+
+    def parse_row(self, row, positions):
+        raw_amount = row[positions['amount']].strip().replace(' ', '').replace('\xa0', '')
+        if self.decimal_comma:
+            raw_amount = raw_amount.replace('.', '').replace(',', '.')
+        amount = Decimal(raw_amount)
+
+        raw_date = row[positions['date']].strip()
+        if self.date_format == '%Y-%m-%d':
+            date = datetime.date.fromisoformat(raw_date)
+        else:
+            date = datetime.datetime.strptime(raw_date, self.date_format).date()
+
+        kind = row[positions['type']].strip().lower() if 'type' in positions else ''
+        if kind in INCOME_TYPES:
+            model = Incomes
+        elif kind in EXPENSE_TYPES:
+            model = Expenses
+        elif kind:
+            raise ValueError(f"Nieznany typ transakcji '{kind}'.")
+        else:
+            model = Expenses if amount < 0 else Incomes
+        amount = abs(amount).quantize(Decimal('0.01'))
+        if amount >= Decimal('100000000'):
+            raise ValueError("Kwota przekracza dopuszczalny zakres.")
+
+        category = row[positions['category']].strip() if 'category' in positions else ''
+        description = row[positions['description']].strip() if 'description' in positions else ''
+        return model, (category[:255] or DEFAULT_CATEGORY, amount, description or None, date)
+
+    def resolve_categories(self, model, names, result):
+        known = self.categories[model]
+        missing = {name for name in names if name not in known}
+        if not missing:
+            return known
+        category_model = self.category_models[model]
+        live = category_model.objects.filter(user=self.user, is_deleted=False)
+        # Kategorie utworzone od startu importu (np. przez równoległy import) nie są liczone jako nowe.
+        for category in live.filter(category__in=list(missing)):
+            known[category.category] = category
+            missing.discard(category.category)
+        if not missing:
+            return known
+        category_model.objects.bulk_create(
+            [category_model(user=self.user, category=name) for name in missing],
+            ignore_conflicts=True,
+        )
+        created = list(live.filter(category__in=list(missing)))
+        result.categories_created += len(created)
+        for category in created:
+            known[category.category] = category
+        return known
+
+    def flush(self, model, rows, result):
+        with transaction.atomic():
+            categories = self.resolve_categories(model, {row[0] for row in rows}, result)
+            objects = [
+                model(user=self.user, category=categories[name], amount=amount,
+                      description=description, date=date)
+                for name, amount, description, date in rows
+            ]
+            model.objects.bulk_create(objects, batch_size=settings.LEDGER_BULK_CHUNK_SIZE)
+            rollups.record_transactions(model, objects)
+            bump_ledger_version(self.user.id)
+        if model is Incomes:
+            result.incomes += len(objects)
+        else:
+            result.expenses += len(objects)
@@ -0,0 +1,198 @@
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Job
+from .singleflight import _lock_id
+
+
+class JobHandler:
+    def __init__(self, type, fn, concurrency=None, max_attempts=None):
+        self.type = type
+        self.fn = fn
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+
+
+_handlers = {}
+
+
+def job_handler(type, concurrency=None, max_attempts=None):
+    """
+    **Dekorator rejestrujący funkcję obsługującą zadania danego typu.**
+
+    Funkcja otrzymuje obiekt `Job`, a jej wynik (serializowalny do JSON) trafia do `Job.result`.
+    `concurrency` ogranicza liczbę równocześnie wykonywanych zadań tego typu
+    (nadpisywane przez `JOB_CONCURRENCY`), a `max_attempts` liczbę prób wykonania.
+    """
+    def decorator(fn):
+        _handlers[type] = JobHandler(type, fn, concurrency, max_attempts)
+        return fn
+    return decorator
+
+
+def get_handler(type):
+    return _handlers.get(type)
+
+
+def concurrency_limit(type):
+    """
+    **Zwraca limit równoczesnych wykonań zadań danego typu (`None` - bez limitu).**
+    """
+    if type in settings.JOB_CONCURRENCY:
+        return settings.JOB_CONCURRENCY[type]
+    handler = _handlers.get(type)
+    return handler.concurrency if handler else None
+
+
+def enqueue(type, payload=None, owner_id=None, run_after=None, max_attempts=None):
+    """
+    **Dodaje zadanie do kolejki.**
+
+    Zadanie dodane w transakcji staje się widoczne dla procesów roboczych dopiero
+    po jej zatwierdzeniu.
+    """
+    if type not in _handlers:
+        raise ValueError(f"Nieznany typ zadania: {type}")
+    handler = _handlers[type]
+    return Job.objects.create(
+        type=type,
+        payload=payload or {},
+        owner_id=owner_id,
+        run_after=run_after or timezone.now(),
+        max_attempts=max_attempts or handler.max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def requeue_stale_jobs():
+    """
+    **Przywraca do kolejki zadania, których proces roboczy nie zakończył w czasie `JOB_LOCK_TIMEOUT`.**
+
+    Dotyczy zadań przerwanych np. zatrzymaniem procesu roboczego.
+    """
+    stale_before = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    return Job.objects.filter(status=Job.STATUS_RUNNING, locked_at__lt=stale_before).update(
+        status=Job.STATUS_QUEUED, locked_at=None, locked_by='', run_after=timezone.now(),
+    )
+
+
+def _type_lock(type):
+    # Blokada doradcza na czas transakcji: dwa procesy nie sprawdzą limitu
+    # równoczesności tego samego typu jednocześnie.
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [_lock_id(f'jobs:{type}')])
+
+
+def _running_counts():
+    return dict(
+        Job.objects.filter(status=Job.STATUS_RUNNING)
+        .values('type').annotate(count=Count('id')).values_list('type', 'count')
+    )
+
+
+def claim_next_job(worker_id=None, types=None):
+    """
+    **Przejmuje najstarsze gotowe do wykonania zadanie (lub zwraca `None`).**
+
+    W PostgreSQL kandydat wybierany jest przez `SELECT ... FOR UPDATE SKIP LOCKED`,
+    więc równolegle działające procesy robocze nie czekają na siebie nawzajem.
+    W SQLite (bez `SKIP LOCKED`) zadanie przejmowane jest warunkowym `UPDATE`
+    na wierszu w stanie `queued`. Typy, które osiągnęły limit równoczesności, są pomijane.
+    """
+    worker_id = worker_id or default_worker_id()
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    saturated = set()
+    while True:
+        with transaction.atomic():
+            queryset = Job.objects.filter(status=Job.STATUS_QUEUED, run_after__lte=timezone.now())
+            if types:
+                queryset = queryset.filter(type__in=types)
+            if saturated:
+                queryset = queryset.exclude(type__in=saturated)
+            queryset = queryset.order_by('run_after', 'id')
+            if skip_locked:
+                queryset = queryset.select_for_update(skip_locked=True)
+            job = queryset.first()
+            if job is None:
+                return None
+
+            limit = concurrency_limit(job.type)
+            if limit is not None:
+                _type_lock(job.type)
+                if _running_counts().get(job.type, 0) >= limit:
+                    saturated.add(job.type)
+                    continue
+
+            now = timezone.now()
+            claimed = Job.objects.filter(pk=job.pk, status=Job.STATUS_QUEUED).update(
+                status=Job.STATUS_RUNNING, attempts=job.attempts + 1, locked_at=now, locked_by=worker_id,
+            )
+            if not claimed:
+                continue
+            job.status = Job.STATUS_RUNNING
+            job.attempts += 1
+            job.locked_at = now
+            job.locked_by = worker_id
+            return job
+
+
+def retry_delay(attempts):
+    """
+    **Opóźnienie przed kolejną próbą: `JOB_RETRY_BASE_DELAY * 2^(attempts - 1)`, najwyżej `JOB_RETRY_MAX_DELAY` sekund.**
+    """
+    return min(settings.JOB_RETRY_BASE_DELAY * 2 ** (attempts - 1), settings.JOB_RETRY_MAX_DELAY)
+
+
+def run_job(job):
+    """
+    **Wykonuje przejęte zadanie i zapisuje jego wynik.**
+
+    Po błędzie zadanie wraca do kolejki z wykładniczym opóźnieniem, a po
+    wyczerpaniu `max_attempts` otrzymuje stan `failed`.
+    """
+    handler = _handlers.get(job.type)
+    try:
+        if handler is None:
+            raise LookupError(f"Brak funkcji obsługującej zadania typu {job.type}")
+        result = handler.fn(job)
+    except Exception as exc:
+        job.error = ''.join(traceback.format_exception_only(type(exc), exc)).strip()
+        job.locked_at = None
+        job.locked_by = ''
+        if handler is not None and job.attempts < job.max_attempts:
+            job.status = Job.STATUS_QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        else:
+            job.status = Job.STATUS_FAILED
+            job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'locked_at', 'locked_by', 'run_after', 'finished_at'])
+        return job
+
+    job.status = Job.STATUS_SUCCEEDED
+    job.result = result
+    job.error = ''
+    job.locked_at = None
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'locked_at', 'finished_at'])
+    return job
+
+
+def run_next_job(worker_id=None, types=None):
+    """
+    **Przejmuje i wykonuje jedno zadanie; zwraca je albo `None`, gdy kolejka jest pusta.**
+    """
+    job = claim_next_job(worker_id, types)
+    if job is not None:
+        run_job(job)
+    return job
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+
+from . import rollups
+from .conditional import bump_ledger_version
+from .serializers import LedgerBulkItemSerializer
+
+
+def bulk_create_transactions(model, category_model, user, items, atomic=False):
+    """
+    **Waliduje i zapisuje paczkę przychodów lub wydatków.**
+
+    Każdy wpis jest walidowany osobno, kategorie są sprawdzane jednym zapytaniem
+    ograniczonym do kategorii użytkownika, a zapis odbywa się przez `bulk_create`
+    w porcjach `LEDGER_BULK_CHUNK_SIZE`. Zwraca parę `(zapisane obiekty, błędy)`,
+    gdzie błędy to lista słowników `{'index': ..., 'errors': ...}`.
+    """
+    item_serializer = LedgerBulkItemSerializer()
+    valid = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, item_serializer.run_validation(item)))
+        except serializers.ValidationError as exc:
+            errors.append({'index': index, 'errors': exc.detail})
+
+    category_ids = {data['category'] for _, data in valid}
+    categories = category_model.objects.filter(user=user, is_deleted=False, id__in=category_ids).in_bulk()
+
+    objects = []
+    for index, data in valid:
+        category = categories.get(data['category'])
+        if category is None:
+            errors.append({'index': index, 'errors': {'category': ["Nieprawidłowa kategoria."]}})
+            continue
+        objects.append(model(
+            user=user,
+            category=category,
+            amount=data['amount'],
+            description=data.get('description'),
+            date=data['date'],
+        ))
+    errors.sort(key=lambda error: error['index'])
+
+    if not objects or (atomic and errors):
+        return [], errors
+
+    with transaction.atomic():
+        model.objects.bulk_create(objects, batch_size=settings.LEDGER_BULK_CHUNK_SIZE)
+        rollups.record_transactions(model, objects)
+        bump_ledger_version(user.id)
+    return objects, errors
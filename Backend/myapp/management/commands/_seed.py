@@ -0,0 +1,69 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+
+BENCH_USER_PREFIX = 'bench_user_'
+
+
+def bench_users(count):
+    """
+    **Zwraca (tworząc w razie potrzeby) użytkowników używanych w benchmarkach.**
+    """
+    users = []
+    for i in range(count):
+        user, _ = User.objects.get_or_create(username=f'{BENCH_USER_PREFIX}{i}')
+        users.append(user)
+    return users
+
+
+def is_bench_database():
+    """
+    **Sprawdza, czy skonfigurowana baza zawiera wyłącznie użytkowników benchmarkowych.**
+    """
+    return not User.objects.exclude(username__startswith=BENCH_USER_PREFIX).exists()
+
+
+def seed_transactions(model, category_model, rows, users=100, years=5, batch_size=10000,
+                      seed=0, stdout=None, describe=None):
+    """
+    **Wypełnia tabelę `Incomes` lub `Expenses` losowymi wpisami benchmarkowymi.**
+
+    Wiersze są rozkładane równomiernie między użytkowników i ostatnie `years` lat.
+    Jeżeli tabela ma już co najmniej `rows` wpisów benchmarkowych, nic nie jest dodawane.
+    `describe(rng)` zwraca opis wpisu (domyślnie stały tekst `bench`).
+    """
+    bench = bench_users(users)
+    existing = model.objects.filter(user__username__startswith=BENCH_USER_PREFIX).count()
+    if existing >= rows:
+        return bench
+
+    rng = random.Random(seed)
+    categories = {}
+    for user in bench:
+        categories[user.id] = [
+            category_model.objects.get_or_create(user=user, category=f'Bench {n}')[0]
+            for n in range(5)
+        ]
+
+    today = datetime.date.today()
+    span = years * 365
+    remaining = rows - existing
+    while remaining > 0:
+        size = min(batch_size, remaining)
+        batch = []
+        for _ in range(size):
+            user = rng.choice(bench)
+            batch.append(model(
+                user=user,
+                category=rng.choice(categories[user.id]),
+                amount=Decimal(rng.randint(100, 500000)) / 100,
+                description=describe(rng) if describe else 'bench',
+                date=today - datetime.timedelta(days=rng.randrange(span)),
+            ))
+        model.objects.bulk_create(batch)
+        remaining -= size
+        if stdout is not None and (remaining == 0 or (rows - remaining) % (batch_size * 10) == 0):
+            stdout.write(f'  seeded {rows - remaining}/{rows} {model._meta.model_name}')
+    return bench
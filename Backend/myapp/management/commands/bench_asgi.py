@@ -0,0 +1,207 @@
+import asyncio
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myapp.models import Expenses, ExpensesCategory, MonthlyCategoryTotal
+from myapp.rollups import rebuild_user_rollups
+from ._seed import seed_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        "Test obciążeniowy endpointów odczytu: aplikacja WSGI z N synchronicznymi workerami "
+        "vs. aplikacja ASGI z widokami asynchronicznymi (ASYNC_READ_VIEWS) w jednym procesie. "
+        "Raportuje żądania/s, opóźnienia i pamięć na równoczesne połączenie. Każdy serwer "
+        "mierzony jest w osobnym procesie."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=['both', 'wsgi', 'asgi'], default='both')
+        parser.add_argument('--rows', type=int, default=200_000, help="Liczba wpisów wydatków.")
+        parser.add_argument('--concurrency', type=int, default=64, help="Liczba równoczesnych klientów.")
+        parser.add_argument('--requests', type=int, default=2000, help="Łączna liczba żądań.")
+        parser.add_argument('--workers', type=int, default=4,
+                            help="Liczba synchronicznych workerów WSGI (gunicorn sync obsługuje jedno żądanie na worker).")
+        parser.add_argument('--db-latency-ms', type=float, default=5.0,
+                            help="Dodatkowe opóźnienie każdego zapytania (symulacja sieci do bazy).")
+
+    def handle(self, *args, **options):
+        if options['server'] == 'both':
+            self.stdout.write(f"{'server':>6} {'workers':>8} {'clients':>8} {'req/s':>10} {'p50 ms':>9} "
+                              f"{'p95 ms':>9} {'KB/conn':>10}")
+            for server in ('wsgi', 'asgi'):
+                self.run_subprocess(server, options)
+            return
+
+        user = seed_transactions(Expenses, ExpensesCategory, options['rows'], stdout=self.stderr)[0]
+        if not MonthlyCategoryTotal.objects.filter(user=user).exists():
+            rebuild_user_rollups(user)
+        latest = Expenses.objects.filter(user=user).latest('date').date
+        auth = f'Bearer {AccessToken.for_user(user)}'
+        paths = [
+            reverse('expenses-list-by-month', args=[latest.year, latest.month]),
+            reverse('expenses-categories'),
+            reverse('categories_summary_by_month', args=[latest.year, latest.month]),
+            reverse('user_info'),
+        ]
+        self.add_db_latency(options['db_latency_ms'] / 1000)
+
+        if options['server'] == 'wsgi':
+            timings, elapsed, per_conn = self.run_wsgi(paths, auth, options)
+            workers = options['workers']
+        else:
+            timings, elapsed, per_conn = self.run_asgi(paths, auth, options)
+            workers = 1
+        self.stdout.write(
+            f"{options['server']:>6} {workers:>8} {options['concurrency']:>8} {len(timings) / elapsed:>10.1f} "
+            f"{statistics.median(timings):>9.1f} {statistics.quantiles(timings, n=20)[18]:>9.1f} {per_conn:>10.1f}"
+        )
+
+    def run_subprocess(self, server, options):
+        env = dict(os.environ, ASYNC_READ_VIEWS='1' if server == 'asgi' else '0')
+        command = [
+            sys.executable, sys.argv[0], 'bench_asgi', '--server', server,
+            '--rows', str(options['rows']), '--concurrency', str(options['concurrency']),
+            '--requests', str(options['requests']), '--workers', str(options['workers']),
+            '--db-latency-ms', str(options['db_latency_ms']),
+        ]
+        if os.environ.get('DJANGO_SETTINGS_MODULE'):
+            command.append(f"--settings={os.environ['DJANGO_SETTINGS_MODULE']}")
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+        if result.returncode:
+            raise CommandError(result.stderr)
+        self.stdout.write(result.stdout.strip())
+
+    def add_db_latency(self, delay):
+        if not delay:
+            return
+
+        def wrapper(execute, sql, params, many, context):
+            time.sleep(delay)
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            connection.execute_wrappers.append(wrapper)
+
+        connection_created.connect(install, weak=False)
+
+    def run_wsgi(self, paths, auth, options):
+        from django.core.wsgi import get_wsgi_application
+        if settings.ASYNC_READ_VIEWS:
+            raise CommandError("Pomiar WSGI wymaga ASYNC_READ_VIEWS=0.")
+        app = get_wsgi_application()
+        factory = RequestFactory()
+        # Pula wątków o rozmiarze `workers` odpowiada workerom gunicorn sync: każdy
+        # obsługuje jedno żądanie naraz, pozostałe połączenia czekają w kolejce.
+        pool = ThreadPoolExecutor(max_workers=options['workers'])
+
+        def call(path):
+            environ = factory.get(path, HTTP_AUTHORIZATION=auth).environ
+            statuses = []
+            body = app(environ, lambda status, headers, exc_info=None: statuses.append(status))
+            try:
+                for _ in body:
+                    pass
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+            if not statuses[0].startswith('200'):
+                raise CommandError(f"{path}: {statuses[0]}")
+
+        def request(path):
+            start = time.perf_counter()
+            pool.submit(call, path).result()
+            return (time.perf_counter() - start) * 1000
+
+        for path in paths:  # rozgrzewka (import modułów, cache podsumowań)
+            call(path)
+        timings, elapsed = self.run_clients(paths, options, request)
+        pool.shutdown()
+        # Każde równocześnie obsługiwane połączenie zajmuje cały proces workera.
+        rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return timings, elapsed, rss_kb
+
+    def run_clients(self, paths, options, request):
+        timings = []
+        lock = threading.Lock()
+        per_client = max(1, options['requests'] // options['concurrency'])
+
+        def client(n):
+            local = [request(paths[(n + i) % len(paths)]) for i in range(per_client)]
+            with lock:
+                timings.extend(local)
+
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(options['concurrency'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings, time.perf_counter() - start
+
+    def run_asgi(self, paths, auth, options):
+        from django.core.asgi import get_asgi_application
+        if not settings.ASYNC_READ_VIEWS:
+            raise CommandError("Pomiar ASGI wymaga ASYNC_READ_VIEWS=1.")
+        app = get_asgi_application()
+        per_client = max(1, options['requests'] // options['concurrency'])
+
+        async def call(path):
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+                'root_path': '', 'headers': [(b'authorization', auth.encode()), (b'host', b'testserver')],
+                'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+            }
+            messages = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+            async def send(message):
+                messages.append(message)
+
+            start = time.perf_counter()
+            await app(scope, receive, send)
+            if messages[0]['status'] != 200:
+                raise CommandError(f"{path}: {messages[0]['status']}")
+            return (time.perf_counter() - start) * 1000
+
+        async def client(n):
+            return [await call(paths[(n + i) % len(paths)]) for i in range(per_client)]
+
+        async def run():
+            results = await asyncio.gather(*(client(n) for n in range(options['concurrency'])))
+            return [t for result in results for t in result]
+
+        for path in paths:  # rozgrzewka (import modułów, cache podsumowań)
+            asyncio.run(call(path))
+        start = time.perf_counter()
+        timings = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+
+        # Pamięć: przyrost szczytowej alokacji przy `concurrency` żądaniach w locie.
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+
+        async def burst():
+            await asyncio.gather(*(call(paths[n % len(paths)]) for n in range(options['concurrency'])))
+
+        asyncio.run(burst())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return timings, elapsed, (peak - baseline) / 1024 / options['concurrency']
@@ -0,0 +1,64 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ._seed import bench_users
+
+
+class Command(BaseCommand):
+    help = (
+        "Mierzy koszt otwierania połączenia z bazą na każde żądanie: seria żądań "
+        "przez aplikację WSGI z CONN_MAX_AGE=0 vs. z trwałymi połączeniami "
+        "(CONN_MAX_AGE>0, opcjonalnie z CONN_HEALTH_CHECKS). Najlepiej uruchamiać z DATABASE_URL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help="Liczba żądań w każdym wariancie.")
+        parser.add_argument('--conn-max-age', type=int, default=60, help="CONN_MAX_AGE wariantu z trwałymi połączeniami.")
+
+    def handle(self, *args, **options):
+        user = bench_users(1)[0]
+        app = get_wsgi_application()
+        environ = RequestFactory().get(
+            reverse('user_info'), HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        ).environ
+
+        opened = []
+        connection_created.connect(lambda sender, connection, **kwargs: opened.append(1), weak=False)
+
+        def request():
+            statuses = []
+            body = app(dict(environ), lambda status, headers, exc_info=None: statuses.append(status))
+            body.close()  # wysyła request_finished -> close_old_connections
+            assert statuses[0].startswith('200'), statuses[0]
+
+        self.stdout.write(f"{connection.vendor}: {options['requests']} requests")
+        self.stdout.write(f"{'variant':>28} {'median ms':>10} {'p95 ms':>8} {'connects':>9}")
+        variants = (
+            ('CONN_MAX_AGE=0', 0, False),
+            (f"CONN_MAX_AGE={options['conn_max_age']}", options['conn_max_age'], False),
+            (f"CONN_MAX_AGE={options['conn_max_age']} + checks", options['conn_max_age'], True),
+        )
+        for name, max_age, health_checks in variants:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = max_age
+            connection.settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+            request()  # rozgrzewka
+            opened.clear()
+            timings = []
+            for _ in range(options['requests']):
+                start = time.perf_counter()
+                request()
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(
+                f"{name:>28} {statistics.median(timings):>10.2f} "
+                f"{statistics.quantiles(timings, n=20)[18]:>8.2f} {len(opened):>9}"
+            )
+        connection.close()
@@ -0,0 +1,154 @@
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myapp.models import Expenses, ExpensesCategory, MonthlyCategoryTotal
+from myapp.rollups import rebuild_user_rollups
+from ._seed import seed_transactions
+
+PROFILES = ('sync', 'gthread', 'asgi')
+
+
+class Command(BaseCommand):
+    help = (
+        "Powtarzalny test obciążeniowy serwera gunicorn (gunicorn.conf.py) w profilach "
+        "sync, gthread i asgi: uruchamia serwer, wysyła żądania z wielu połączeń przez "
+        "zadany czas i raportuje żądania/s, opóźnienia oraz pamięć (RSS) wszystkich procesów."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', action='append', dest='profiles', choices=PROFILES, default=[],
+                            help="Profil do zmierzenia (można powtarzać; domyślnie wszystkie).")
+        parser.add_argument('--rows', type=int, default=200_000, help="Liczba wpisów wydatków.")
+        parser.add_argument('--concurrency', type=int, default=32, help="Liczba równoczesnych połączeń.")
+        parser.add_argument('--duration', type=float, default=15.0, help="Czas pomiaru każdego profilu (s).")
+        parser.add_argument('--workers', type=int, default=None, help="GUNICORN_WORKERS (domyślnie z liczby CPU).")
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        user = seed_transactions(Expenses, ExpensesCategory, options['rows'], stdout=self.stderr)[0]
+        if not MonthlyCategoryTotal.objects.filter(user=user).exists():
+            rebuild_user_rollups(user)
+        latest = Expenses.objects.filter(user=user).latest('date').date
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        paths = [
+            reverse('expenses-list-by-month', args=[latest.year, latest.month]),
+            reverse('expenses-categories'),
+            reverse('categories_summary_by_month', args=[latest.year, latest.month]),
+            reverse('user_info'),
+        ]
+
+        self.stdout.write(f"{'profile':>8} {'workers':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+                          f"{'errors':>7} {'RSS MB':>8}")
+        for profile in options['profiles'] or PROFILES:
+            self.run_profile(profile, paths, headers, options)
+
+    def run_profile(self, profile, paths, headers, options):
+        env = dict(
+            os.environ,
+            GUNICORN_PROFILE=profile,
+            GUNICORN_BIND=f"127.0.0.1:{options['port']}",
+            GUNICORN_ACCESS_LOG='/dev/null',
+            GUNICORN_LOG_LEVEL='warning',
+        )
+        if options['workers']:
+            env['GUNICORN_WORKERS'] = str(options['workers'])
+        log = tempfile.TemporaryFile()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', str(settings.BASE_DIR / 'gunicorn.conf.py')],
+            cwd=settings.BASE_DIR, env=env, stdout=log, stderr=log,
+        )
+        try:
+            self.wait_for_port(options['port'], server, log)
+            for path in paths:  # rozgrzewka
+                self.get(options['port'], path, headers)
+            timings, errors, elapsed = self.load(paths, headers, options)
+            workers = self.children(server.pid)
+            rss = sum(self.rss_kb(pid) for pid in [server.pid] + workers) / 1024
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+        if not timings:
+            raise CommandError(f"{profile}: brak udanych żądań")
+        self.stdout.write(
+            f"{profile:>8} {len(workers):>8} {len(timings) / elapsed:>9.1f} {statistics.median(timings):>8.1f} "
+            f"{statistics.quantiles(timings, n=20)[18]:>8.1f} {errors:>7} {rss:>8.1f}"
+        )
+
+    def wait_for_port(self, port, server, log, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                log.seek(0)
+                raise CommandError(log.read().decode(errors='replace'))
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"Serwer nie nasłuchuje na porcie {port}.")
+
+    def get(self, port, path, headers, connection=None):
+        connection = connection or http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise CommandError(f"{path}: {response.status}")
+        return connection
+
+    def load(self, paths, headers, options):
+        timings, lock = [], threading.Lock()
+        errors = [0]
+        deadline = time.monotonic() + options['duration']
+
+        def client(n):
+            connection, local, failed, i = None, [], 0, n
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    connection = self.get(options['port'], paths[i % len(paths)], headers, connection)
+                    local.append((time.perf_counter() - start) * 1000)
+                except (OSError, http.client.HTTPException, CommandError):
+                    failed += 1
+                    connection = None
+                i += 1
+            with lock:
+                timings.extend(local)
+                errors[0] += failed
+
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(options['concurrency'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings, errors[0], time.perf_counter() - start
+
+    def children(self, pid):
+        try:
+            with open(f'/proc/{pid}/task/{pid}/children') as f:
+                return [int(child) for child in f.read().split()]
+        except OSError:
+            return []
+
+    def rss_kb(self, pid):
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+        return 0
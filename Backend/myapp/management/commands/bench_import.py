@@ -0,0 +1,48 @@
+import csv
+import datetime
+import os
+import random
+import tempfile
+
+from django.core.management.base import BaseCommand
+
+from myapp.importer import TransactionImporter
+from ._seed import bench_users
+from .import_transactions import report_throughput
+
+
+class Command(BaseCommand):
+    help = (
+        "Generuje plik CSV z wyciągiem bankowym i mierzy przepustowość (wiersze/s) "
+        "oraz szczytowe RSS strumieniowego importu."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Liczba wierszy w pliku.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Rozmiar porcji zapisu.")
+
+    def handle(self, *args, **options):
+        user = bench_users(1)[0]
+        rng = random.Random(0)
+        today = datetime.date.today()
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        try:
+            with os.fdopen(fd, 'w', newline='') as stream:
+                writer = csv.writer(stream)
+                writer.writerow(['date', 'amount', 'category', 'description'])
+                for i in range(options['rows']):
+                    amount = rng.randint(-50000, 20000) / 100
+                    writer.writerow([
+                        (today - datetime.timedelta(days=rng.randrange(3650))).isoformat(),
+                        f'{amount:.2f}',
+                        f'Bank {rng.randrange(20)}',
+                        f'Operacja {i}',
+                    ])
+            self.stdout.write(f"Wygenerowano {options['rows']} wierszy ({os.path.getsize(path) / 2**20:.1f} MB).")
+
+            importer = TransactionImporter(user, batch_size=options['batch_size'])
+            with open(path, newline='') as stream:
+                result = importer.run(stream)
+            self.stdout.write(report_throughput(result))
+        finally:
+            os.remove(path)
@@ -0,0 +1,62 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from myapp.models import Expenses, ExpensesCategory
+from myapp.pagination import LedgerCursorPagination
+from ._seed import seed_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        "Porównuje czas pobrania strony listy wydatków na różnych głębokościach: "
+        "OFFSET/LIMIT vs. paginacja kursorowa (date, id)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help="Liczba wpisów jednego użytkownika.")
+        parser.add_argument('--page-size', type=int, default=100, help="Rozmiar strony.")
+        parser.add_argument('--repeat', type=int, default=20, help="Liczba powtórzeń na każdej głębokości.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Seeding {options['rows']} rows for one user...")
+        user = seed_transactions(Expenses, ExpensesCategory, options['rows'], users=1, stdout=self.stdout)[0]
+        queryset = Expenses.objects.filter(user=user).order_by('-date', '-id')
+        total = queryset.count()
+        page_size = options['page_size']
+        factory = APIRequestFactory()
+
+        depth = 0
+        depths = []
+        while depth < total:
+            depths.append(depth)
+            depth = depth * 10 if depth else page_size * 10
+        self.stdout.write(f"{'depth':>10} {'offset ms':>12} {'keyset ms':>12}")
+
+        for depth in depths:
+            offset_ms = self.measure(lambda: list(queryset[depth:depth + page_size]), options['repeat'])
+
+            paginator = LedgerCursorPagination()
+            url = f'/api/expenses/?page_size={page_size}'
+            if depth:
+                paginator.base_url = url
+                anchor = queryset[depth - 1:depth].get()
+                url = paginator.encode_cursor(anchor)
+            request = Request(factory.get(url))
+
+            def keyset_page():
+                LedgerCursorPagination().paginate_queryset(queryset, request)
+
+            keyset_ms = self.measure(keyset_page, options['repeat'])
+            self.stdout.write(f"{depth:>10} {offset_ms:>12.2f} {keyset_ms:>12.2f}")
+
+    def measure(self, fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from myapp.models import Expenses, ExpensesCategory
+from myapp.serializers import ExpensesSerializer, LEDGER_LIST_VALUES
+from ._seed import seed_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        "Mierzy przepustowość (wiersze/s) serializacji listy wydatków: ModelSerializer "
+        "na obiektach modelu vs. szybka ścieżka `LedgerListSerializer` na wierszach `.values()`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20_000, help="Liczba serializowanych wierszy.")
+        parser.add_argument('--repeat', type=int, default=5, help="Liczba powtórzeń (brany jest najlepszy wynik).")
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        user = seed_transactions(Expenses, ExpensesCategory, rows, users=1, stdout=self.stdout)[0]
+        queryset = Expenses.objects.filter(user=user).order_by('-date', '-id')[:rows]
+
+        def model_path():
+            instances = list(queryset.select_related('category'))
+            data = serializers.ListSerializer(instances, child=ExpensesSerializer()).data
+            return JSONRenderer().render(data)
+
+        def values_path():
+            data = ExpensesSerializer(list(queryset.values(*LEDGER_LIST_VALUES)), many=True).data
+            return JSONRenderer().render(data)
+
+        if model_path() != values_path():
+            self.stderr.write("Wyniki obu ścieżek różnią się!")
+            return
+
+        self.stdout.write(f"{'path':>24} {'rows/s':>12}")
+        for name, fn in (('ModelSerializer', model_path), ('values() fast path', values_path)):
+            best = min(self.measure(fn) for _ in range(options['repeat']))
+            self.stdout.write(f"{name:>24} {rows / best:>12,.0f}")
+
+    def measure(self, fn):
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
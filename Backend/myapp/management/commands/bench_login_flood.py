@@ -0,0 +1,135 @@
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myapp.models import Expenses, ExpensesCategory, MonthlyCategoryTotal
+from myapp.rollups import rebuild_user_rollups
+from ._seed import seed_transactions
+from .bench_gunicorn import Command as GunicornBenchCommand
+
+UNLIMITED_RATES = {
+    'LOGIN_IP_THROTTLE_RATE': '1000000/s',
+    'LOGIN_USERNAME_THROTTLE_RATE': '1000000/s',
+    'REGISTER_IP_THROTTLE_RATE': '1000000/s',
+}
+PHASES = (
+    ('baseline', False, {}),
+    ('flood, no limits', True, dict(UNLIMITED_RATES, PASSWORD_HASH_CONCURRENCY='0')),
+    ('flood, hash limit', True, UNLIMITED_RATES),
+    ('flood, defaults', True, {}),
+)
+
+
+class Command(GunicornBenchCommand):
+    help = (
+        "Test obciążeniowy logowania: mierzy p50/p95 odczytu wydatków z miesiąca przy "
+        "równoczesnym zalewie żądań POST /api/token/ (błędne hasła), bez ochrony, "
+        "z samym limitem haszowania (PASSWORD_HASH_CONCURRENCY) i z domyślnymi limitami."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000, help="Liczba wpisów wydatków.")
+        parser.add_argument('--readers', type=int, default=4, help="Liczba równoczesnych połączeń odczytu.")
+        parser.add_argument('--attackers', type=int, default=16, help="Liczba równoczesnych połączeń logowania.")
+        parser.add_argument('--duration', type=float, default=15.0, help="Czas pomiaru każdej fazy (s).")
+        parser.add_argument('--workers', type=int, default=None, help="GUNICORN_WORKERS (domyślnie z liczby CPU).")
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        user = seed_transactions(Expenses, ExpensesCategory, options['rows'], stdout=self.stderr)[0]
+        if not MonthlyCategoryTotal.objects.filter(user=user).exists():
+            rebuild_user_rollups(user)
+        latest = Expenses.objects.filter(user=user).latest('date').date
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        path = reverse('expenses-list-by-month', args=[latest.year, latest.month])
+
+        self.stdout.write(f"{'phase':>18} {'reads/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+                          f"{'logins/s':>9} {'429 %':>6}")
+        for name, flood, env in PHASES:
+            self.run_phase(name, flood, env, path, headers, options)
+
+    def run_phase(self, name, flood, extra_env, path, headers, options):
+        env = dict(
+            os.environ,
+            GUNICORN_PROFILE='gthread',
+            GUNICORN_BIND=f"127.0.0.1:{options['port']}",
+            GUNICORN_ACCESS_LOG='/dev/null',
+            GUNICORN_LOG_LEVEL='warning',
+            **extra_env,
+        )
+        if options['workers']:
+            env['GUNICORN_WORKERS'] = str(options['workers'])
+        log = tempfile.TemporaryFile()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', str(settings.BASE_DIR / 'gunicorn.conf.py')],
+            cwd=settings.BASE_DIR, env=env, stdout=log, stderr=log,
+        )
+        try:
+            self.wait_for_port(options['port'], server, log)
+            self.get(options['port'], path, headers)  # rozgrzewka
+            timings, logins = self.flood(path, headers, flood, options)
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+        if not timings:
+            raise CommandError(f"{name}: brak udanych odczytów")
+        attempts = sum(logins.values())
+        self.stdout.write(
+            f"{name:>18} {len(timings) / options['duration']:>8.1f} {statistics.median(timings):>8.1f} "
+            f"{statistics.quantiles(timings, n=20)[18]:>8.1f} {attempts / options['duration']:>9.1f} "
+            f"{100 * logins.get(429, 0) / attempts if attempts else 0:>6.1f}"
+        )
+
+    def flood(self, path, headers, flood, options):
+        timings, logins, lock = [], {}, threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def reader():
+            connection, local = None, []
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                try:
+                    connection = self.get(options['port'], path, headers, connection)
+                    local.append((time.perf_counter() - start) * 1000)
+                except (OSError, http.client.HTTPException, CommandError):
+                    connection = None
+            with lock:
+                timings.extend(local)
+
+        def attacker(n):
+            connection, local, i = None, {}, 0
+            while time.monotonic() < deadline:
+                body = json.dumps({'username': f'flood{n}-{i}', 'password': 'wrong-password'})
+                try:
+                    connection = connection or http.client.HTTPConnection('127.0.0.1', options['port'], timeout=60)
+                    connection.request('POST', reverse('get_token'), body=body,
+                                       headers={'Content-Type': 'application/json'})
+                    response = connection.getresponse()
+                    response.read()
+                    local[response.status] = local.get(response.status, 0) + 1
+                except (OSError, http.client.HTTPException):
+                    connection = None
+                i += 1
+            with lock:
+                for code, count in local.items():
+                    logins[code] = logins.get(code, 0) + count
+
+        threads = [threading.Thread(target=reader) for _ in range(options['readers'])]
+        if flood:
+            threads += [threading.Thread(target=attacker, args=(n,)) for n in range(options['attackers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return timings, logins
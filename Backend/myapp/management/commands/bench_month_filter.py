@@ -0,0 +1,82 @@
+import datetime
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from myapp.filters import filter_by_month
+from myapp.models import Expenses, ExpensesCategory
+from ._seed import is_bench_database, seed_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        "Porównuje plan zapytania i czas filtrowania miesiąca: stary warunek "
+        "date__year/date__month bez indeksu vs. zakres dat z indeksem (user, -date). "
+        "Na czas pomiaru usuwa indeks expenses_user_date_idx, więc uruchamia się tylko na "
+        "bazie benchmarkowej (wyłącznie użytkownicy `bench_user_*`) albo z `--i-know`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000, help="Liczba wierszy w tabeli wydatków.")
+        parser.add_argument('--users', type=int, default=1000, help="Liczba użytkowników benchmarkowych.")
+        parser.add_argument('--samples', type=int, default=50, help="Liczba losowych par (użytkownik, miesiąc).")
+        parser.add_argument('--i-know', action='store_true',
+                            help="Pozwala usunąć i odbudować indeks w bazie z innymi użytkownikami niż benchmarkowi.")
+
+    def handle(self, *args, **options):
+        # Usunięcie indeksu w działającej bazie spowalnia zapytania produkcyjne, a jego
+        # odbudowa blokuje tabelę - dlatego pomiar wymaga bazy benchmarkowej.
+        if not options['i_know'] and not is_bench_database():
+            raise CommandError(
+                "Baza zawiera użytkowników spoza benchmarku; benchmark usuwa indeks "
+                "expenses_user_date_idx. Użyj osobnej bazy albo flagi --i-know."
+            )
+        self.stdout.write(f"Seeding {options['rows']} rows...")
+        users = seed_transactions(Expenses, ExpensesCategory, options['rows'], users=options['users'],
+                                  stdout=self.stdout)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        rng = random.Random(1)
+        this_year = datetime.date.today().year
+        samples = [
+            (rng.choice(users), rng.randint(this_year - 4, this_year - 1), rng.randint(1, 12))
+            for _ in range(options['samples'])
+        ]
+
+        def legacy(user, year, month):
+            return Expenses.objects.filter(user=user, date__year=year, date__month=month).order_by('-date')
+
+        def ranged(user, year, month):
+            return filter_by_month(Expenses.objects.filter(user=user), year, month).order_by('-date')
+
+        index = next(i for i in Expenses._meta.indexes if i.name == 'expenses_user_date_idx')
+        with connection.schema_editor() as editor:
+            editor.remove_index(Expenses, index)
+        try:
+            self.report('before (date__year/date__month, no index)', legacy, samples)
+        finally:
+            with connection.schema_editor() as editor:
+                editor.add_index(Expenses, index)
+        self.report('after (half-open range, (user, -date) index)', ranged, samples)
+
+    def report(self, label, build, samples):
+        user, year, month = samples[0]
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        analyze = connection.vendor == 'postgresql'
+        self.stdout.write(build(user, year, month).explain(analyze=analyze) if analyze
+                          else build(user, year, month).explain())
+
+        timings = []
+        for user, year, month in samples:
+            start = time.perf_counter()
+            list(build(user, year, month))
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+        self.stdout.write(
+            f"  median {statistics.median(timings):.2f} ms, p95 {p95:.2f} ms over {len(timings)} queries"
+        )
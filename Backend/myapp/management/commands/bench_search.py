@@ -0,0 +1,95 @@
+import datetime
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Case, Value, When
+from django.db.models.functions import Mod
+from django.db.models.lookups import Exact
+
+from myapp.models import Incomes, IncomesCategory, Expenses, ExpensesCategory
+from myapp.search import result_position, parse_position, search_transactions
+from ._seed import BENCH_USER_PREFIX, seed_transactions
+
+# Słowa opisów z rozkładem zbliżonym do Zipfa: pierwsze są częste, ostatnie rzadkie.
+VOCABULARY = (
+    'zakupy', 'sklep', 'biedronka', 'lidl', 'paliwo', 'orlen', 'czynsz', 'prąd', 'gaz', 'internet',
+    'telefon', 'apteka', 'lekarz', 'restauracja', 'kawa', 'kino', 'bilet', 'pociąg', 'taxi', 'prezent',
+    'ubrania', 'buty', 'książki', 'kurs', 'siłownia', 'basen', 'fryzjer', 'weterynarz', 'ubezpieczenie', 'serwis',
+    'opony', 'parking', 'wakacje', 'hotel', 'lot', 'koncert', 'teatr', 'muzeum', 'zegarek', 'rower',
+)
+WEIGHTS = [1 / (n + 1) for n in range(len(VOCABULARY))]
+PHRASES = tuple(' '.join(VOCABULARY[(n * step) % len(VOCABULARY)] for step in (1, 7, 13)[:1 + n % 3])
+                for n in range(len(VOCABULARY) * 3))
+QUERIES = (
+    ('common word', 'zakupy', {}),
+    ('rare word', 'rower', {}),
+    ('two words', 'zakupy biedronka', {}),
+    ('prefix', 'rest', {}),
+    ('common + 90 days', 'zakupy', {'days': 90}),
+)
+
+
+def describe(rng):
+    return ' '.join(rng.choices(VOCABULARY, weights=WEIGHTS, k=rng.randint(1, 4)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Mierzy opóźnienie wyszukiwania pełnotekstowego w opisach (myapp.search) na dużym "
+        "zbiorze: pierwsza strona dla różnych zapytań i strona na głębokości `--depth` stron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000_000, help="Łączna liczba przychodów i wydatków.")
+        parser.add_argument('--users', type=int, default=100, help="Liczba użytkowników benchmarkowych.")
+        parser.add_argument('--page-size', type=int, default=50, help="Rozmiar strony.")
+        parser.add_argument('--depth', type=int, default=10, help="Numer strony mierzonej przez kursor.")
+        parser.add_argument('--sample', type=int, default=20, help="Liczba użytkowników w pomiarze.")
+
+    def handle(self, *args, **options):
+        for model, category_model in ((Expenses, ExpensesCategory), (Incomes, IncomesCategory)):
+            self.redescribe(model)
+            bench = seed_transactions(model, category_model, options['rows'] // 2, users=options['users'],
+                                      stdout=self.stderr, describe=describe)
+        users = bench[:options['sample']]
+        latest = Expenses.objects.filter(user=users[0]).latest('date').date
+
+        self.stdout.write(f"{connection.vendor}: {options['rows']} rows, {options['users']} users, "
+                          f"page {options['page_size']}")
+        self.stdout.write(f"{'query':>18} {'matches/user':>13} {'p50 ms':>8} {'p95 ms':>8} "
+                          f"{'page ' + str(options['depth']) + ' ms':>11}")
+        for name, text, extra in QUERIES:
+            date_from = latest - datetime.timedelta(days=extra['days']) if 'days' in extra else None
+            first, deep, matches = [], [], []
+            for user in users:
+                start = time.perf_counter()
+                page = search_transactions(user, text, date_from=date_from, limit=options['page_size'])
+                first.append((time.perf_counter() - start) * 1000)
+                matches.append(self.count_matches(user, text, date_from))
+
+                after = None
+                for _ in range(options['depth'] - 1):
+                    if len(page) <= options['page_size']:
+                        break
+                    after = parse_position(result_position(page[options['page_size'] - 1]))
+                    page = search_transactions(user, text, date_from=date_from, after=after,
+                                               limit=options['page_size'])
+                start = time.perf_counter()
+                search_transactions(user, text, date_from=date_from, after=after, limit=options['page_size'])
+                deep.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(
+                f"{name:>18} {statistics.median(matches):>13.0f} {statistics.median(first):>8.1f} "
+                f"{statistics.quantiles(first, n=20)[18]:>8.1f} {statistics.median(deep):>11.1f}"
+            )
+
+    def count_matches(self, user, text, date_from):
+        return len(search_transactions(user, text, date_from=date_from, limit=10 ** 9))
+
+    def redescribe(self, model):
+        # Wpisy z innych benchmarków mają stały opis `bench`; dostają opisy ze słownika.
+        rows = model.objects.filter(user__username__startswith=BENCH_USER_PREFIX, description='bench')
+        rows.update(description=Case(
+            *[When(Exact(Mod('id', len(PHRASES)), n), then=Value(phrase)) for n, phrase in enumerate(PHRASES)]
+        ))
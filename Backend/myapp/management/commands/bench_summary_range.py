@@ -0,0 +1,54 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIClient
+from django.urls import reverse
+
+from myapp.models import Incomes, Expenses, IncomesCategory, ExpensesCategory
+from myapp.rollups import rebuild_user_rollups
+from ._seed import seed_transactions
+
+
+class Command(BaseCommand):
+    help = (
+        "Porównuje pobranie podsumowania całego roku: 12 wywołań MonthlySummaryView "
+        "vs. jedno wywołanie endpointu /api/summary/?from=...&to=..."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000, help="Liczba wpisów każdego rodzaju.")
+        parser.add_argument('--year', type=int, default=None, help="Rok podsumowania (domyślnie poprzedni).")
+        parser.add_argument('--repeat', type=int, default=20, help="Liczba powtórzeń.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Seeding {options['rows']} incomes and expenses...")
+        user = seed_transactions(Incomes, IncomesCategory, options['rows'], stdout=self.stdout)[0]
+        seed_transactions(Expenses, ExpensesCategory, options['rows'], stdout=self.stdout)
+        rebuild_user_rollups(user)
+
+        year = options['year'] or time.localtime().tm_year - 1
+        client = APIClient()
+        client.force_authenticate(user=user)
+        month_urls = [reverse('categories_summary_by_month', args=[year, month]) for month in range(1, 13)]
+        range_url = reverse('summary-range')
+        range_params = {'from': f'{year}-01', 'to': f'{year}-12'}
+
+        def monthly():
+            for url in month_urls:
+                assert client.get(url).status_code == 200
+
+        def ranged():
+            assert client.get(range_url, range_params).status_code == 200
+
+        self.stdout.write(f"{'variant':>24} {'median ms':>12}")
+        self.stdout.write(f"{'12 x monthly summary':>24} {self.measure(monthly, options['repeat']):>12.2f}")
+        self.stdout.write(f"{'1 x range summary':>24} {self.measure(ranged, options['repeat']):>12.2f}")
+
+    def measure(self, fn, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,66 @@
+import csv
+import resource
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.importer import DEFAULT_COLUMNS, TransactionImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Importuje przychody i wydatki użytkownika z pliku CSV (np. wyciągu bankowego). "
+        "Plik jest czytany strumieniowo i zapisywany porcjami."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Ścieżka do pliku CSV.")
+        parser.add_argument('--user', required=True, help="Nazwa użytkownika, do którego trafią transakcje.")
+        parser.add_argument('--delimiter', default=',', help="Separator kolumn.")
+        parser.add_argument('--date-format', default='%Y-%m-%d', help="Format daty (strftime).")
+        parser.add_argument('--decimal-comma', action='store_true', help="Kwoty z przecinkiem dziesiętnym.")
+        parser.add_argument('--encoding', default='utf-8-sig', help="Kodowanie pliku.")
+        parser.add_argument('--batch-size', type=int, default=None, help="Rozmiar porcji zapisu.")
+        parser.add_argument('--column', action='append', default=[], metavar='POLE=NAZWA',
+                            help=f"Mapowanie kolumny, np. date='Data operacji'. Pola: {', '.join(DEFAULT_COLUMNS)}.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"Użytkownik '{options['user']}' nie istnieje.")
+
+        columns = {}
+        for mapping in options['column']:
+            key, _, name = mapping.partition('=')
+            if key not in DEFAULT_COLUMNS or not name:
+                raise CommandError(f"Niepoprawne mapowanie kolumny: '{mapping}'.")
+            columns[key] = name
+
+        importer = TransactionImporter(
+            user,
+            columns=columns,
+            delimiter=options['delimiter'],
+            date_format=options['date_format'],
+            decimal_comma=options['decimal_comma'],
+            batch_size=options['batch_size'],
+        )
+        try:
+            with open(options['path'], encoding=options['encoding'], newline='') as stream:
+                result = importer.run(stream)
+        except (OSError, ValueError, csv.Error) as exc:
+            raise CommandError(str(exc))
+
+        for error in result.errors:
+            self.stderr.write(f"  linia {error['line']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Zaimportowano {result.incomes} przychodów i {result.expenses} wydatków "
+            f"({result.categories_created} nowych kategorii, {result.skipped} pominiętych wierszy)."
+        ))
+        self.stdout.write(report_throughput(result))
+
+
+def report_throughput(result):
+    rate = result.rows / result.elapsed if result.elapsed else 0
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return f"{result.rows} wierszy w {result.elapsed:.1f} s ({rate:.0f} wierszy/s), szczytowe RSS {peak_rss_mb:.1f} MB"
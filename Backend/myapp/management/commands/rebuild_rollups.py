@@ -0,0 +1,54 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.jobs import enqueue
+from myapp.rollups import compute_rollups, rebuild_user_rollups, stored_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Przelicza od zera tabelę sum miesięcznych (MonthlyCategoryTotal) na podstawie "
+        "przychodów i wydatków. Z opcją --check tylko raportuje rozbieżności."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', default=[],
+                            help="Ogranicz przeliczenie do podanego użytkownika (można powtarzać).")
+        parser.add_argument('--check', action='store_true',
+                            help="Nie zapisuj zmian, zakończ z błędem, jeśli wykryto rozbieżności.")
+        parser.add_argument('--enqueue', action='store_true',
+                            help="Zamiast przeliczać od razu, dodaj zadania `rebuild_rollups` do kolejki (run_worker).")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        if options['enqueue']:
+            queued = 0
+            for user_id in users.values_list('pk', flat=True).iterator():
+                enqueue('rebuild_rollups', {'user_id': user_id})
+                queued += 1
+            self.stdout.write(self.style.SUCCESS(f"Dodano {queued} zadań do kolejki."))
+            return
+
+        drifted = 0
+        for user in users.iterator():
+            expected = compute_rollups(user)
+            stored = stored_rollups(user)
+            if expected == stored:
+                continue
+            drifted += 1
+            missing = expected.keys() - stored.keys()
+            extra = stored.keys() - expected.keys()
+            changed = [key for key in expected.keys() & stored.keys() if expected[key] != stored[key]]
+            self.stdout.write(
+                f"{user.username}: {len(missing)} missing, {len(extra)} extra, {len(changed)} changed"
+            )
+            if not options['check']:
+                rebuild_user_rollups(user, expected)
+
+        if options['check'] and drifted:
+            raise CommandError(f"Wykryto rozbieżności u {drifted} użytkowników.")
+        action = "Sprawdzono" if options['check'] else "Przeliczono"
+        self.stdout.write(self.style.SUCCESS(f"{action} sumy miesięczne ({drifted} z rozbieżnościami)."))
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myapp.jobs import default_worker_id, requeue_stale_jobs, run_next_job
+from myapp.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Proces roboczy wykonujący zadania w tle zapisane w tabeli Job "
+        "(SELECT ... FOR UPDATE SKIP LOCKED; w SQLite warunkowy UPDATE). "
+        "Można uruchomić wiele procesów równolegle."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Zakończ, gdy w kolejce nie ma gotowych zadań.")
+        parser.add_argument('--sleep', type=float, default=2.0, help="Przerwa (s) między sprawdzeniami pustej kolejki.")
+        parser.add_argument('--type', action='append', dest='types', default=[],
+                            help="Wykonuj tylko zadania podanego typu (można powtarzać).")
+        parser.add_argument('--worker-id', default=None, help="Identyfikator procesu zapisywany w Job.locked_by.")
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id'] or default_worker_id()
+        while True:
+            requeue_stale_jobs()
+            job = run_next_job(worker_id, options['types'] or None)
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['sleep'])
+                continue
+            if job.status == Job.STATUS_SUCCEEDED:
+                self.stdout.write(f"{job}")
+            else:
+                self.stderr.write(f"{job}: {job.error}")
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_delete_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expenses',
+            index=models.Index(fields=['user', '-date'], name='expenses_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomes',
+            index=models.Index(fields=['user', '-date'], name='incomes_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def backfill_rollups(apps, schema_editor):
+    MonthlyCategoryTotal = apps.get_model('myapp', 'MonthlyCategoryTotal')
+    for model_name, kind in (('Incomes', 'income'), ('Expenses', 'expense')):
+        model = apps.get_model('myapp', model_name)
+        rows = model.objects.annotate(
+            year=ExtractYear('date'), month=ExtractMonth('date')
+        ).values('user_id', 'year', 'month', 'category_id', 'category__category').annotate(
+            total=Sum('amount'), count=Count('id')
+        ).order_by()
+        MonthlyCategoryTotal.objects.bulk_create([
+            MonthlyCategoryTotal(
+                user_id=row['user_id'], kind=kind, year=row['year'], month=row['month'],
+                category_id=row['category_id'], category_name=row['category__category'],
+                total=row['total'], count=row['count'],
+            )
+            for row in rows.iterator()
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('myapp', '0010_incomes_expenses_user_date_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategoryTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('income', 'Przychód'), ('expense', 'Wydatek')], help_text='Rodzaj transakcji: przychód lub wydatek.', max_length=7)),
+                ('year', models.PositiveSmallIntegerField(help_text='Rok, którego dotyczy suma (np. 2024).')),
+                ('month', models.PositiveSmallIntegerField(help_text='Miesiąc (1-12), którego dotyczy suma.')),
+                ('category_id', models.BigIntegerField(help_text='ID kategorii przychodu lub wydatku.')),
+                ('category_name', models.CharField(help_text='Nazwa kategorii w chwili agregacji.', max_length=255)),
+                ('total', models.DecimalField(decimal_places=2, default=0, help_text='Suma kwot transakcji w danym miesiącu i kategorii.', max_digits=14)),
+                ('count', models.IntegerField(default=0, help_text='Liczba transakcji składających się na sumę.')),
+                ('user', models.ForeignKey(help_text='Użytkownik, do którego należy ta suma.', on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Suma Miesięczna Kategorii',
+                'verbose_name_plural': 'Sumy Miesięczne Kategorii',
+                'unique_together': {('user', 'year', 'month', 'kind', 'category_id')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 00:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0011_monthlycategorytotal'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='expenses',
+            name='expenses_user_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='incomes',
+            name='incomes_user_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='expenses',
+            index=models.Index(fields=['user', '-date', '-id'], name='expenses_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomes',
+            index=models.Index(fields=['user', '-date', '-id'], name='incomes_user_date_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('myapp', '0012_user_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerVersion',
+            fields=[
+                ('user', models.OneToOneField(help_text='Użytkownik, do którego należy wersja.', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ledger_version', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.BigIntegerField(default=0, help_text='Numer wersji, zwiększany przy każdej zmianie danych użytkownika.')),
+            ],
+            options={
+                'verbose_name': 'Wersja Danych',
+                'verbose_name_plural': 'Wersje Danych',
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0013_ledgerversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('incomes_category', 'Kategoria przychodów'), ('expenses_category', 'Kategoria wydatków'), ('user', 'Użytkownik')], help_text='Rodzaj usuwanego obiektu.', max_length=17)),
+                ('object_id', models.BigIntegerField(help_text='ID usuwanej kategorii lub użytkownika.')),
+                ('owner_id', models.BigIntegerField(help_text='ID użytkownika, który może śledzić postęp (właściciel kategorii lub administrator).')),
+                ('status', models.CharField(choices=[('pending', 'Oczekuje'), ('running', 'W trakcie'), ('done', 'Zakończone'), ('failed', 'Błąd')], default='pending', help_text='Stan usuwania.', max_length=7)),
+                ('total', models.IntegerField(default=0, help_text='Liczba wpisów do usunięcia.')),
+                ('deleted', models.IntegerField(default=0, help_text='Liczba już usuniętych wpisów.')),
+                ('error', models.TextField(blank=True, default='', help_text='Opis błędu, jeśli usuwanie się nie powiodło.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Data zlecenia usunięcia.')),
+                ('finished_at', models.DateTimeField(blank=True, help_text='Data zakończenia usuwania.', null=True)),
+            ],
+            options={
+                'verbose_name': 'Usuwanie w Tle',
+                'verbose_name_plural': 'Usuwanie w Tle',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='incomescategory',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='expensescategory',
+            name='is_deleted',
+            field=models.BooleanField(default=False, help_text='Kategoria oznaczona do usunięcia; jej wpisy są usuwane w tle.'),
+        ),
+        migrations.AddField(
+            model_name='incomescategory',
+            name='is_deleted',
+            field=models.BooleanField(default=False, help_text='Kategoria oznaczona do usunięcia; jej wpisy są usuwane w tle.'),
+        ),
+        migrations.AddConstraint(
+            model_name='incomescategory',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_deleted', False)), fields=('user', 'category'), name='incomes_category_unique_name'),
+        ),
+        migrations.AddIndex(
+            model_name='pendingdeletion',
+            index=models.Index(fields=['status', 'created_at'], name='pending_deletion_status_idx'),
+        ),
+    ]
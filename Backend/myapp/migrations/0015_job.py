@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_background_deletion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(help_text='Typ zadania (nazwa zarejestrowanej funkcji obsługującej).', max_length=64)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Parametry zadania.')),
+                ('status', models.CharField(choices=[('queued', 'W kolejce'), ('running', 'W trakcie'), ('succeeded', 'Zakończone'), ('failed', 'Błąd')], default='queued', help_text='Stan zadania.', max_length=9)),
+                ('owner_id', models.BigIntegerField(blank=True, help_text='ID użytkownika, który może sprawdzać stan zadania.', null=True)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Liczba dotychczasowych prób wykonania.')),
+                ('max_attempts', models.PositiveIntegerField(default=5, help_text='Maksymalna liczba prób wykonania.')),
+                ('run_after', models.DateTimeField(help_text='Najwcześniejszy moment kolejnego wykonania.')),
+                ('locked_at', models.DateTimeField(blank=True, help_text='Moment przejęcia zadania przez proces roboczy.', null=True)),
+                ('locked_by', models.CharField(blank=True, default='', help_text='Identyfikator procesu roboczego wykonującego zadanie.', max_length=128)),
+                ('result', models.JSONField(blank=True, help_text='Wynik zadania.', null=True)),
+                ('error', models.TextField(blank=True, default='', help_text='Opis ostatniego błędu.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Data dodania zadania.')),
+                ('finished_at', models.DateTimeField(blank=True, help_text='Data zakończenia zadania.', null=True)),
+            ],
+            options={
+                'verbose_name': 'Zadanie w Tle',
+                'verbose_name_plural': 'Zadania w Tle',
+                'indexes': [models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Indeksy pod wyszukiwanie prefiksowe `istartswith` na liście użytkowników
+# administratora (myapp.filters.search_users). Tabela auth_user należy do
+# django.contrib.auth, więc indeksy są tworzone SQL-em zależnie od bazy.
+INDEXES = {
+    # Django porównuje `UPPER("pole"::text) LIKE UPPER('prefiks%')`.
+    'postgresql': [
+        ('auth_user_upper_username_like', 'UPPER("username"::text) text_pattern_ops'),
+        ('auth_user_upper_email_like', 'UPPER("email"::text) text_pattern_ops'),
+    ],
+    # `LIKE` w SQLite nie rozróżnia wielkości liter i używa indeksu z COLLATE NOCASE.
+    'sqlite': [
+        ('auth_user_username_nocase', '"username" COLLATE NOCASE'),
+        ('auth_user_email_nocase', '"email" COLLATE NOCASE'),
+    ],
+}
+
+
+def create_indexes(apps, schema_editor):
+    for name, expression in INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "auth_user" ({expression})')
+
+
+def drop_indexes(apps, schema_editor):
+    for name, expression in INDEXES.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('myapp', '0015_job'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
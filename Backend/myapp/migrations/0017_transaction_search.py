@@ -0,0 +1,73 @@
+from django.db import migrations
+
+TABLES = ('myapp_incomes', 'myapp_expenses')
+
+
+def postgresql_statements(table):
+    # Wyrażenie musi być identyczne z SearchVector('description', config='simple')
+    # w myapp.search, inaczej planista nie użyje indeksu.
+    name = table.removeprefix('myapp_')
+    return [
+        f'CREATE INDEX IF NOT EXISTS "{name}_description_fts_idx" ON "{table}" '
+        f'USING GIN (to_tsvector(\'simple\'::regconfig, COALESCE("description", \'\')))',
+    ], [
+        f'DROP INDEX IF EXISTS "{name}_description_fts_idx"',
+    ]
+
+
+def sqlite_statements(table):
+    # Bezzawartościowa tabela FTS5 (opisy nie są kopiowane) utrzymywana triggerami.
+    # Kolumna `owner` (token `u<user_id>`) pozwala zawęzić dopasowanie do jednego
+    # użytkownika już w indeksie, zamiast filtrować dopasowania wszystkich użytkowników.
+    # Uwaga: SQLite przebudowuje tabelę przy części zmian schematu (ALTER w migracjach
+    # Django), co usuwa triggery - taka migracja musi je odtworzyć. Indeksy prefiksów
+    # (`prefix`) przyspieszają dopasowanie ostatniego, niedokończonego słowa.
+    fts = f'{table}_fts'
+    insert = f'INSERT INTO "{fts}"(rowid, description, owner) VALUES (new.id, new.description, \'u\' || new.user_id);'
+    delete = (f'INSERT INTO "{fts}"("{fts}", rowid, description, owner) '
+              f'VALUES (\'delete\', old.id, old.description, \'u\' || old.user_id);')
+    return [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS "{fts}" USING fts5('
+        f'description, owner, content=\'\', prefix=\'2 3 4 5 6\')',
+        f'CREATE TRIGGER IF NOT EXISTS "{fts}_ai" AFTER INSERT ON "{table}" BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS "{fts}_ad" AFTER DELETE ON "{table}" BEGIN {delete} END',
+        f'CREATE TRIGGER IF NOT EXISTS "{fts}_au" AFTER UPDATE OF description, user_id ON "{table}" '
+        f'BEGIN {delete} {insert} END',
+        f'INSERT INTO "{fts}"(rowid, description, owner) SELECT id, description, \'u\' || user_id FROM "{table}"',
+    ], [
+        f'DROP TRIGGER IF EXISTS "{fts}_ai"',
+        f'DROP TRIGGER IF EXISTS "{fts}_ad"',
+        f'DROP TRIGGER IF EXISTS "{fts}_au"',
+        f'DROP TABLE IF EXISTS "{fts}"',
+    ]
+
+
+STATEMENTS = {
+    'postgresql': postgresql_statements,
+    'sqlite': sqlite_statements,
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    for table in TABLES if statements else ():
+        for sql in statements(table)[0]:
+            schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    statements = STATEMENTS.get(schema_editor.connection.vendor)
+    for table in TABLES if statements else ():
+        for sql in statements(table)[1]:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0016_admin_user_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
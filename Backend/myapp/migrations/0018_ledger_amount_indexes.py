@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0017_transaction_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expenses',
+            index=models.Index(fields=['user', 'amount', 'id'], name='expenses_user_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incomes',
+            index=models.Index(fields=['user', 'amount', 'id'], name='incomes_user_amount_idx'),
+        ),
+    ]
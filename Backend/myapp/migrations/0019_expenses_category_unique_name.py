@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:34
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rename_duplicate_categories(apps, schema_editor):
+    # Dotąd nic nie chroniło przed dwiema aktywnymi kategoriami wydatków o tej samej
+    # nazwie (np. równoległe importy). Najstarsza zachowuje nazwę, pozostałe dostają
+    # przyrostek, tak aby nie tracić wpisów przed dodaniem ograniczenia.
+    ExpensesCategory = apps.get_model('myapp', 'ExpensesCategory')
+    MonthlyCategoryTotal = apps.get_model('myapp', 'MonthlyCategoryTotal')
+    duplicates = ExpensesCategory.objects.filter(is_deleted=False).values('user_id', 'category') \
+        .annotate(copies=Count('id')).filter(copies__gt=1).order_by()
+    for duplicate in duplicates:
+        live = ExpensesCategory.objects.filter(is_deleted=False, user_id=duplicate['user_id'])
+        taken = set(live.values_list('category', flat=True))
+        for category in live.filter(category=duplicate['category']).order_by('id')[1:]:
+            n = 2
+            while f"{category.category} ({n})"[:255] in taken:
+                n += 1
+            category.category = f"{category.category} ({n})"[:255]
+            taken.add(category.category)
+            category.save(update_fields=['category'])
+            MonthlyCategoryTotal.objects.filter(kind='expense', category_id=category.id) \
+                .update(category_name=category.category)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0018_ledger_amount_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_categories, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='expensescategory',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_deleted', False)), fields=('user', 'category'), name='expenses_category_unique_name'),
+        ),
+    ]
@@ -17,11 +17,20 @@ class IncomesCategory(models.Model):
         max_length=255,
         help_text="Nazwa kategorii przychodu (np. 'Wynagrodzenie', 'Premia')." 
     )
+    is_deleted = models.BooleanField(
+        default=False,
+        help_text="Kategoria oznaczona do usunięcia; jej wpisy są usuwane w tle."
+    )
 
     class Meta:
         verbose_name = "Kategoria Przychodu" 
         verbose_name_plural = "Kategorie Przychodów"
-        unique_together = ('user', 'category')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'category'], condition=models.Q(is_deleted=False),
+                name='incomes_category_unique_name',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.category}"
@@ -41,10 +50,20 @@ class ExpensesCategory(models.Model):
         max_length=255,
         help_text="Nazwa kategorii wydatku (np. 'Jedzenie', 'Transport', 'Rozrywka')." 
     )
+    is_deleted = models.BooleanField(
+        default=False,
+        help_text="Kategoria oznaczona do usunięcia; jej wpisy są usuwane w tle."
+    )
 
     class Meta:
         verbose_name = "Kategoria Wydatku"
         verbose_name_plural = "Kategorie Wydatków"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'category'], condition=models.Q(is_deleted=False),
+                name='expenses_category_unique_name',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.category}"
@@ -84,6 +103,10 @@ class Incomes(models.Model):
         verbose_name = "Przychód"
         verbose_name_plural = "Przychody"
         ordering = ['-date'] 
+        indexes = [
+            models.Index(fields=['user', '-date', '-id'], name='incomes_user_date_idx'),
+            models.Index(fields=['user', 'amount', 'id'], name='incomes_user_amount_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.category.category} - {self.amount} - {self.date}"
@@ -123,7 +146,261 @@ class Expenses(models.Model):
         verbose_name = "Wydatek"
         verbose_name_plural = "Wydatki"
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['user', '-date', '-id'], name='expenses_user_date_idx'),
+            models.Index(fields=['user', 'amount', 'id'], name='expenses_user_amount_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.category.category} - {self.amount} - {self.date}"
-    
\ No newline at end of file
+    
+class MonthlyCategoryTotal(models.Model):
+    """
+    **Model przechowujący zagregowaną sumę transakcji użytkownika w danym miesiącu i kategorii.**
+
+    Tabela jest aktualizowana przyrostowo przy każdym dodaniu lub usunięciu przychodu/wydatku,
+    dzięki czemu podsumowanie miesięczne nie musi agregować surowych wpisów.
+    """
+    KIND_INCOME = 'income'
+    KIND_EXPENSE = 'expense'
+    KIND_CHOICES = [
+        (KIND_INCOME, 'Przychód'),
+        (KIND_EXPENSE, 'Wydatek'),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='monthly_totals',
+        help_text="Użytkownik, do którego należy ta suma."
+    )
+    kind = models.CharField(
+        max_length=7,
+        choices=KIND_CHOICES,
+        help_text="Rodzaj transakcji: przychód lub wydatek."
+    )
+    year = models.PositiveSmallIntegerField(
+        help_text="Rok, którego dotyczy suma (np. 2024)."
+    )
+    month = models.PositiveSmallIntegerField(
+        help_text="Miesiąc (1-12), którego dotyczy suma."
+    )
+    category_id = models.BigIntegerField(
+        help_text="ID kategorii przychodu lub wydatku."
+    )
+    category_name = models.CharField(
+        max_length=255,
+        help_text="Nazwa kategorii w chwili agregacji."
+    )
+    total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Suma kwot transakcji w danym miesiącu i kategorii."
+    )
+    count = models.IntegerField(
+        default=0,
+        help_text="Liczba transakcji składających się na sumę."
+    )
+
+    class Meta:
+        verbose_name = "Suma Miesięczna Kategorii"
+        verbose_name_plural = "Sumy Miesięczne Kategorii"
+        unique_together = ('user', 'year', 'month', 'kind', 'category_id')
+
+    def __str__(self):
+        return f"{self.user.username} - {self.kind} - {self.year}/{self.month} - {self.category_name} - {self.total}"
+
+class LedgerVersion(models.Model):
+    """
+    **Model przechowujący numer wersji danych finansowych użytkownika.**
+
+    Numer jest zwiększany przy każdym zapisie przychodu, wydatku lub kategorii
+    i służy do wyznaczania nagłówków `ETag` odpowiedzi GET.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ledger_version',
+        help_text="Użytkownik, do którego należy wersja."
+    )
+    version = models.BigIntegerField(
+        default=0,
+        help_text="Numer wersji, zwiększany przy każdej zmianie danych użytkownika."
+    )
+
+    class Meta:
+        verbose_name = "Wersja Danych"
+        verbose_name_plural = "Wersje Danych"
+
+    def __str__(self):
+        return f"{self.user.username} - {self.version}"
+
+class PendingDeletion(models.Model):
+    """
+    **Model opisujący usuwanie kategorii lub użytkownika wykonywane w tle.**
+
+    Obiekt jest od razu oznaczany jako usunięty, a jego wpisy są usuwane porcjami
+    przez zadanie `purge_deletion` (polecenie `run_worker`). Pola `total` i `deleted` pozwalają śledzić postęp.
+    """
+    KIND_INCOMES_CATEGORY = 'incomes_category'
+    KIND_EXPENSES_CATEGORY = 'expenses_category'
+    KIND_USER = 'user'
+    KIND_CHOICES = [
+        (KIND_INCOMES_CATEGORY, 'Kategoria przychodów'),
+        (KIND_EXPENSES_CATEGORY, 'Kategoria wydatków'),
+        (KIND_USER, 'Użytkownik'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Oczekuje'),
+        (STATUS_RUNNING, 'W trakcie'),
+        (STATUS_DONE, 'Zakończone'),
+        (STATUS_FAILED, 'Błąd'),
+    ]
+
+    kind = models.CharField(
+        max_length=17,
+        choices=KIND_CHOICES,
+        help_text="Rodzaj usuwanego obiektu."
+    )
+    object_id = models.BigIntegerField(
+        help_text="ID usuwanej kategorii lub użytkownika."
+    )
+    owner_id = models.BigIntegerField(
+        help_text="ID użytkownika, który może śledzić postęp (właściciel kategorii lub administrator)."
+    )
+    status = models.CharField(
+        max_length=7,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        help_text="Stan usuwania."
+    )
+    total = models.IntegerField(
+        default=0,
+        help_text="Liczba wpisów do usunięcia."
+    )
+    deleted = models.IntegerField(
+        default=0,
+        help_text="Liczba już usuniętych wpisów."
+    )
+    error = models.TextField(
+        blank=True,
+        default='',
+        help_text="Opis błędu, jeśli usuwanie się nie powiodło."
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Data zlecenia usunięcia."
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Data zakończenia usuwania."
+    )
+
+    class Meta:
+        verbose_name = "Usuwanie w Tle"
+        verbose_name_plural = "Usuwanie w Tle"
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='pending_deletion_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} - {self.status} ({self.deleted}/{self.total})"
+
+class Job(models.Model):
+    """
+    **Model zadania wykonywanego w tle przez polecenie `run_worker`.**
+
+    Zadania są pobierane z bazy (`SELECT ... FOR UPDATE SKIP LOCKED`), ponawiane
+    z wykładniczym opóźnieniem po błędzie i ograniczane liczbą równoczesnych
+    wykonań na typ zadania.
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'W kolejce'),
+        (STATUS_RUNNING, 'W trakcie'),
+        (STATUS_SUCCEEDED, 'Zakończone'),
+        (STATUS_FAILED, 'Błąd'),
+    ]
+
+    type = models.CharField(
+        max_length=64,
+        help_text="Typ zadania (nazwa zarejestrowanej funkcji obsługującej)."
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Parametry zadania."
+    )
+    status = models.CharField(
+        max_length=9,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        help_text="Stan zadania."
+    )
+    owner_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="ID użytkownika, który może sprawdzać stan zadania."
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="Liczba dotychczasowych prób wykonania."
+    )
+    max_attempts = models.PositiveIntegerField(
+        default=5,
+        help_text="Maksymalna liczba prób wykonania."
+    )
+    run_after = models.DateTimeField(
+        help_text="Najwcześniejszy moment kolejnego wykonania."
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Moment przejęcia zadania przez proces roboczy."
+    )
+    locked_by = models.CharField(
+        max_length=128,
+        blank=True,
+        default='',
+        help_text="Identyfikator procesu roboczego wykonującego zadanie."
+    )
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Wynik zadania."
+    )
+    error = models.TextField(
+        blank=True,
+        default='',
+        help_text="Opis ostatniego błędu."
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Data dodania zadania."
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Data zakończenia zadania."
+    )
+
+    class Meta:
+        verbose_name = "Zadanie w Tle"
+        verbose_name_plural = "Zadania w Tle"
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.type} #{self.pk} - {self.status} ({self.attempts}/{self.max_attempts})"
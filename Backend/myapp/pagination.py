@@ -0,0 +1,152 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .search import parse_position, result_position
+
+
+class LedgerCursorPagination(CursorPagination):
+    """
+    **Paginacja kursorowa (keyset) list przychodów i wydatków.**
+
+    Kursor przechowuje wartość pola sortowania i `id` ostatniego wpisu na stronie,
+    więc każda kolejna strona to zapytanie `WHERE (date, id) < (...)` korzystające
+    z indeksu `(user, -date, -id)` - koszt nie rośnie wraz z głębokością.
+    """
+    ordering = ('-date', '-id')
+    page_size_query_param = 'page_size'
+    page_size_setting = 'LEDGER_PAGE_SIZE'
+    max_page_size_setting = 'LEDGER_MAX_PAGE_SIZE'
+
+    def get_page_size(self, request):
+        self.page_size = getattr(settings, self.page_size_setting)
+        self.max_page_size = getattr(settings, self.max_page_size_setting)
+        return super().get_page_size(request)
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, 'ledger_ordering', self.ordering))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.keyset_filter(queryset.model, position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def keyset_filter(self, model, position):
+        field, tiebreak = (name.lstrip('-') for name in self.ordering)
+        value, last_id = position
+        try:
+            value = model._meta.get_field(field).to_python(value)
+            last_id = int(last_id)
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        lookup = 'lt' if self.ordering[0].startswith('-') else 'gt'
+        id_lookup = 'lt' if self.ordering[1].startswith('-') else 'gt'
+        # Zewnętrzny warunek `<=`/`>=` daje bazie granicę zakresu w indeksie.
+        return Q(**{f'{field}__{lookup}e': value}) & (
+            Q(**{f'{field}__{lookup}': value})
+            | Q(**{field: value, f'{tiebreak}__{id_lookup}': last_id})
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            value, last_id = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return value, last_id
+
+    def encode_cursor(self, instance):
+        field, tiebreak = (name.lstrip('-') for name in self.ordering)
+        if isinstance(instance, dict):
+            position = [str(instance[field]), instance[tiebreak]]
+        else:
+            position = [str(getattr(instance, field)), getattr(instance, tiebreak)]
+        encoded = urlsafe_b64encode(json.dumps(position).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        return None
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        del response_schema['properties']['previous']
+        return response_schema
+
+
+class AdminUserCursorPagination(LedgerCursorPagination):
+    """
+    **Paginacja kursorowa listy użytkowników w panelu administratora.**
+
+    Sortowanie po `(username, id)`; kolejne strony korzystają z unikalnego indeksu
+    na `username`.
+    """
+    ordering = ('username', 'id')
+    page_size_setting = 'ADMIN_USER_PAGE_SIZE'
+    max_page_size_setting = 'ADMIN_USER_MAX_PAGE_SIZE'
+
+
+class TransactionSearchPagination(LedgerCursorPagination):
+    """
+    **Paginacja kursorowa wyników wyszukiwania pełnotekstowego.**
+
+    Kursor zawiera pozycję ostatniego wyniku (`rank`, data, rodzaj, `id`); kolejna strona
+    to wyniki leżące za nią w kolejności rankingu, bez `OFFSET`.
+    """
+    page_size_setting = 'SEARCH_PAGE_SIZE'
+    max_page_size_setting = 'SEARCH_MAX_PAGE_SIZE'
+
+    def paginate_search(self, request, search):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        results = search(after=self.decode_cursor(request), limit=self.page_size)
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            return parse_position(json.loads(urlsafe_b64decode(encoded.encode('ascii'))))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row):
+        encoded = urlsafe_b64encode(json.dumps(result_position(row)).encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
@@ -0,0 +1,203 @@
+import datetime
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from . import jobs
+from .models import Incomes, Expenses, MonthlyCategoryTotal
+from .summary import invalidate_month_summaries
+
+BULK_THRESHOLD = 8
+
+KIND_BY_MODEL = {
+    Incomes: MonthlyCategoryTotal.KIND_INCOME,
+    Expenses: MonthlyCategoryTotal.KIND_EXPENSE,
+}
+
+
+def _as_date(value):
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value)
+    return value
+
+
+def apply_rollup_delta(user_id, kind, year, month, category_id, category_name, amount, count):
+    """
+    **Dodaje `amount`/`count` do sumy miesięcznej kategorii (tworząc wiersz w razie potrzeby).**
+
+    Wiersze, których licznik spadnie do zera, są usuwane.
+    """
+    rows = MonthlyCategoryTotal.objects.filter(
+        user_id=user_id, year=year, month=month, kind=kind, category_id=category_id
+    )
+    if rows.update(total=F('total') + amount, count=F('count') + count):
+        if count < 0:
+            rows.filter(count__lte=0).delete()
+        return
+    if count <= 0:
+        return
+    try:
+        with transaction.atomic():
+            MonthlyCategoryTotal.objects.create(
+                user_id=user_id, year=year, month=month, kind=kind, category_id=category_id,
+                category_name=category_name, total=amount, count=count,
+            )
+    except IntegrityError:
+        rows.update(total=F('total') + amount, count=F('count') + count)
+
+
+def record_transactions(model, transactions, sign=1):
+    """
+    **Nanosi listę przychodów lub wydatków na tabelę sum miesięcznych.**
+
+    `sign=1` dla dodanych wpisów, `sign=-1` dla usuniętych. Wpisy z tego samego
+    miesiąca i kategorii są najpierw sumowane, więc każda para generuje jedno zapytanie.
+    """
+    kind = KIND_BY_MODEL[model]
+    deltas = {}
+    for transaction_ in transactions:
+        date = _as_date(transaction_.date)
+        key = (transaction_.user_id, date.year, date.month, transaction_.category_id)
+        if key not in deltas:
+            deltas[key] = [transaction_.category.category, Decimal('0.00'), 0]
+        deltas[key][1] += sign * Decimal(str(transaction_.amount))
+        deltas[key][2] += sign
+    invalidate_month_summaries((user_id, year, month) for user_id, year, month, _ in deltas)
+    if len(deltas) <= BULK_THRESHOLD:
+        for (user_id, year, month, category_id), (name, amount, count) in deltas.items():
+            apply_rollup_delta(user_id, kind, year, month, category_id, name, amount, count)
+    else:
+        _apply_rollup_deltas_in_bulk(kind, deltas)
+
+
+def _apply_rollup_deltas_in_bulk(kind, deltas):
+    # Zablokowane wiersze są usuwane i wstawiane ponownie z nowymi sumami: dwa zapytania
+    # zamiast UPDATE na każdą parę (miesiąc, kategoria).
+    existing = {}
+    candidates = MonthlyCategoryTotal.objects.select_for_update().filter(
+        kind=kind,
+        user_id__in={key[0] for key in deltas},
+        year__in={key[1] for key in deltas},
+        category_id__in={key[3] for key in deltas},
+    )
+    for row in candidates:
+        key = (row.user_id, row.year, row.month, row.category_id)
+        if key in deltas:
+            existing[key] = row
+
+    rows = []
+    for key, (name, amount, count) in deltas.items():
+        row = existing.get(key)
+        if row is not None:
+            amount += row.total
+            count += row.count
+            name = row.category_name
+        if count > 0:
+            user_id, year, month, category_id = key
+            rows.append(MonthlyCategoryTotal(
+                user_id=user_id, kind=kind, year=year, month=month, category_id=category_id,
+                category_name=name, total=amount, count=count,
+            ))
+
+    MonthlyCategoryTotal.objects.filter(pk__in=[row.pk for row in existing.values()]).delete()
+    try:
+        with transaction.atomic():
+            MonthlyCategoryTotal.objects.bulk_create(rows, batch_size=500)
+    except IntegrityError:
+        for row in rows:
+            apply_rollup_delta(row.user_id, kind, row.year, row.month, row.category_id,
+                               row.category_name, row.total, row.count)
+
+
+def forget_category(model, category_id):
+    """
+    **Usuwa wszystkie sumy miesięczne kategorii (np. przy jej usuwaniu).**
+
+    Z cache usuwane są podsumowania tylko tych miesięcy, w których kategoria miała wpisy.
+    """
+    rows = MonthlyCategoryTotal.objects.filter(kind=KIND_BY_MODEL[model], category_id=category_id)
+    invalidate_month_summaries(rows.values_list('user_id', 'year', 'month'))
+    rows.delete()
+
+
+def rename_category(model, category_id, name):
+    """
+    **Przepisuje nową nazwę kategorii do jej sum miesięcznych (`category_name` to kopia nazwy).**
+
+    Wiersze z aktualną nazwą nie są zmieniane, więc zapis bez zmiany nazwy nic nie aktualizuje.
+    Z cache usuwane są podsumowania miesięcy, w których nazwa została zmieniona.
+    """
+    rows = MonthlyCategoryTotal.objects.filter(
+        kind=KIND_BY_MODEL[model], category_id=category_id
+    ).exclude(category_name=name)
+    months = list(rows.values_list('user_id', 'year', 'month'))
+    if months:
+        invalidate_month_summaries(months)
+        rows.update(category_name=name)
+
+
+def compute_rollups(user):
+    """
+    **Oblicza od zera sumy miesięczne użytkownika na podstawie surowych wpisów.**
+
+    Zwraca słownik `{(kind, year, month, category_id): (category_name, total, count)}`.
+    """
+    expected = {}
+    for model, kind in KIND_BY_MODEL.items():
+        rows = model.objects.filter(user=user, category__is_deleted=False).annotate(
+            year=ExtractYear('date'), month=ExtractMonth('date')
+        ).values('year', 'month', 'category_id', 'category__category').annotate(
+            total=Sum('amount'), count=Count('id')
+        ).order_by()
+        for row in rows:
+            expected[(kind, row['year'], row['month'], row['category_id'])] = (
+                row['category__category'], row['total'], row['count']
+            )
+    return expected
+
+
+def stored_rollups(user):
+    """
+    **Zwraca zapisane sumy miesięczne użytkownika w formacie `compute_rollups`.**
+    """
+    return {
+        (row.kind, row.year, row.month, row.category_id): (row.category_name, row.total, row.count)
+        for row in MonthlyCategoryTotal.objects.filter(user=user)
+    }
+
+
+def rebuild_user_rollups(user, expected=None):
+    """
+    **Zastępuje sumy miesięczne użytkownika wartościami obliczonymi od zera.**
+    """
+    if expected is None:
+        expected = compute_rollups(user)
+    invalidate_month_summaries(
+        list(MonthlyCategoryTotal.objects.filter(user=user).values_list('user_id', 'year', 'month'))
+        + [(user.pk, year, month) for _, year, month, _ in expected]
+    )
+    with transaction.atomic():
+        MonthlyCategoryTotal.objects.filter(user=user).delete()
+        MonthlyCategoryTotal.objects.bulk_create([
+            MonthlyCategoryTotal(
+                user=user, kind=kind, year=year, month=month, category_id=category_id,
+                category_name=name, total=total, count=count,
+            )
+            for (kind, year, month, category_id), (name, total, count) in expected.items()
+        ], batch_size=1000)
+
+
+@jobs.job_handler('rebuild_rollups', concurrency=1)
+def rebuild_rollups_job(job):
+    """
+    **Zadanie w tle przeliczające sumy miesięczne użytkownika o ID `payload['user_id']`.**
+    """
+    user = User.objects.filter(pk=job.payload['user_id']).first()
+    if user is None:
+        return {'rows': 0}
+    expected = compute_rollups(user)
+    rebuild_user_rollups(user, expected)
+    return {'rows': len(expected)}
@@ -0,0 +1,132 @@
+import datetime
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Incomes, Expenses
+from .serializers import LEDGER_LIST_VALUES
+
+SEARCH_MODELS = {
+    'expense': Expenses,
+    'income': Incomes,
+}
+MAX_SEARCH_TERMS = 8
+
+
+def search_terms(text):
+    """
+    **Dzieli tekst wyszukiwania na słowa (litery i cyfry), pomijając znaki specjalne składni zapytań.**
+    """
+    return re.findall(r'\w+', text.lower())[:MAX_SEARCH_TERMS]
+
+
+def _search_postgresql(kind, user, terms, date_from, date_to, after, limit):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    queryset = SEARCH_MODELS[kind].objects.filter(user=user, category__is_deleted=False)
+    if date_from is not None:
+        queryset = queryset.filter(date__gte=date_from)
+    if date_to is not None:
+        queryset = queryset.filter(date__lte=date_to)
+    # To samo wyrażenie co w indeksach GIN `*_description_fts_idx` (migracja 0017).
+    vector = SearchVector('description', config='simple')
+    query = SearchQuery(' & '.join(terms) + ':*', config='simple', search_type='raw')
+    queryset = queryset.annotate(search=vector, rank=SearchRank(vector, query)).filter(search=query)
+    if after is not None:
+        queryset = queryset.filter(_after(kind, after))
+    queryset = queryset.order_by('-rank', '-date', '-id').values('rank', *LEDGER_LIST_VALUES)
+    return list(queryset[:limit + 1])
+
+
+def _search_sqlite(kind, user, terms, date_from, date_to, after, limit):
+    model = SEARCH_MODELS[kind]
+    table = model._meta.db_table
+    category_table = model._meta.get_field('category').related_model._meta.db_table
+    fts = f'{table}_fts'
+    # bm25() jest ujemne (mniejsze = lepsze dopasowanie); kolumna `owner` ma wagę 0.
+    rank = f'-bm25("{fts}", 1.0, 0.0)'
+    match = ' AND '.join([f'owner:"u{user.pk}"'] + [f'description:"{term}"' for term in terms]) + '*'
+    where, params = [f'"{fts}" MATCH %s', 'c.is_deleted = %s'], [match, False]
+    if date_from is not None:
+        where.append('t.date >= %s')
+        params.append(date_from)
+    if date_to is not None:
+        where.append('t.date <= %s')
+        params.append(date_to)
+    if after is not None:
+        after_rank, after_date, after_kind, last_id = after
+        condition = f'{rank} < %s OR ({rank} = %s AND t.date < %s)'
+        params += [after_rank, after_rank, after_date]
+        if kind > after_kind:
+            condition += f' OR ({rank} = %s AND t.date = %s)'
+            params += [after_rank, after_date]
+        elif kind == after_kind:
+            condition += f' OR ({rank} = %s AND t.date = %s AND t.id < %s)'
+            params += [after_rank, after_date, last_id]
+        where.append(f'({condition})')
+    rows = model.objects.raw(
+        f'SELECT t.*, c.category AS category_name, {rank} AS rank FROM "{fts}" '
+        f'JOIN "{table}" t ON t.id = "{fts}".rowid JOIN "{category_table}" c ON c.id = t.category_id '
+        f'WHERE {" AND ".join(where)} ORDER BY rank DESC, t.date DESC, t.id DESC LIMIT %s',
+        params + [limit + 1],
+    )
+    return [
+        {
+            'rank': row.rank, 'id': row.id, 'user_id': row.user_id, 'category_id': row.category_id,
+            'category__category': row.category_name, 'amount': row.amount,
+            'description': row.description, 'date': row.date,
+        }
+        for row in rows
+    ]
+
+
+def _after(kind, position):
+    # Kolejność wyników: rank malejąco, data malejąco, rodzaj rosnąco, id malejąco.
+    rank, date, after_kind, last_id = position
+    condition = Q(rank__lt=rank) | Q(rank=rank, date__lt=date)
+    if kind > after_kind:
+        condition |= Q(rank=rank, date=date)
+    elif kind == after_kind:
+        condition |= Q(rank=rank, date=date, id__lt=last_id)
+    return condition
+
+
+def result_position(row):
+    """
+    **Pozycja wyniku w kolejności wyszukiwania: `[rank, data, rodzaj, id]` (zapisywana w kursorze).**
+    """
+    return [row['rank'], row['date'].isoformat(), row['kind'], row['id']]
+
+
+def parse_position(position):
+    rank, date, kind, last_id = position
+    if kind not in SEARCH_MODELS:
+        raise ValueError(kind)
+    return float(rank), datetime.date.fromisoformat(date), kind, int(last_id)
+
+
+def search_transactions(user, text, kinds=tuple(SEARCH_MODELS), date_from=None, date_to=None,
+                        after=None, limit=50):
+    """
+    **Wyszukiwanie pełnotekstowe w opisach przychodów i wydatków użytkownika.**
+
+    Każde słowo zapytania musi wystąpić w opisie; ostatnie może być początkiem słowa
+    (wyszukiwanie w trakcie pisania). W PostgreSQL
+    używany jest `tsvector` z indeksem GIN i rankingiem `ts_rank`, w SQLite - tabele FTS5
+    (migracja 0017) z rankingiem `bm25`. Obie tabele są przeszukiwane osobno (po `limit + 1` wierszy od
+    pozycji `after`), a wyniki scalane według `result_position`. Zwraca do `limit + 1`
+    słowników z polami `LEDGER_LIST_VALUES`, `kind` i `rank` - nadmiarowy wiersz oznacza
+    kolejną stronę.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    search = _search_postgresql if connection.vendor == 'postgresql' else _search_sqlite
+    rows = [
+        dict(row, kind=kind)
+        for kind in kinds
+        for row in search(kind, user, terms, date_from, date_to, after, limit)
+    ]
+    rows.sort(key=lambda row: (-row['rank'], -row['date'].toordinal(), row['kind'], -row['id']))
+    return rows[:limit + 1]
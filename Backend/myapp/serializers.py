@@ -1,6 +1,15 @@
+import datetime
+from decimal import Decimal
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import models
 from rest_framework import serializers
-from .models import Incomes, Expenses, IncomesCategory, ExpensesCategory
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from .authentication import user_cache, user_claims
+from .filters import month_date_range, LEDGER_ORDERINGS
+from .models import Incomes, Expenses, IncomesCategory, ExpensesCategory, PendingDeletion, Job
 
 class UserSerializer(serializers.ModelSerializer):
     """
@@ -53,6 +62,45 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
 
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    **Serializator logowania dodający do tokenów claimy użytkownika i profilu.**
+
+    `username`, `is_staff` i `is_superuser` pozwalają na uwierzytelnianie bez zapytania
+    do bazy (`JWT_STATELESS_AUTH`), a `email`, `first_name`, `last_name` i `profile_version`
+    - na odczyt profilu bez osobnego żądania `/api/user-info/`.
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim, value in user_claims(user).items():
+            token[claim] = value
+        return token
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        # Użytkownik jest już pobrany przy logowaniu; kolejne żądania tej sesji go nie pobierają.
+        user_cache.set(self.user)
+        return data
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    **Serializator odświeżania tokenu, który odczytuje claimy użytkownika z bazy.**
+
+    simplejwt kopiuje do nowego tokenu dostępu wszystkie claimy tokenu odświeżania, więc
+    np. odebrane `is_staff` obowiązywałoby przez cały `REFRESH_TOKEN_LIFETIME`. Tutaj
+    claimy z `user_claims` są nadpisywane bieżącymi danymi użytkownika.
+    """
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data['access'])
+        user = User.objects.get(pk=access[api_settings.USER_ID_CLAIM])
+        for claim, value in user_claims(user).items():
+            access[claim] = value
+        data['access'] = str(access)
+        user_cache.set(user)
+        return data
+
 class UserProfileSerializer(serializers.ModelSerializer):
     """
     **Serializator dla profilu użytkownika.**
@@ -95,7 +143,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         instance.first_name = validated_data.get('first_name', instance.first_name)
         instance.last_name = validated_data.get('last_name', instance.last_name)
         instance.email = validated_data.get('email', instance.email)
-        instance.save()
+        instance.save(update_fields=['username', 'first_name', 'last_name', 'email'])
         return instance
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -122,7 +170,7 @@ class ChangePasswordSerializer(serializers.Serializer):
     def save(self):
         user = self.context.get('request').user
         user.set_password(self.validated_data['new_password'])
-        user.save()
+        user.save(update_fields=['password'])
         return user
 
 class UserAdminSerializer(serializers.ModelSerializer):
@@ -193,6 +241,39 @@ class UserAdminSerializer(serializers.ModelSerializer):
         return instance
 
 
+
+class UserAdminStatsSerializer(UserAdminSerializer):
+    """
+    **Użytkownik na liście administratora wraz ze statystykami aktywności (`?stats=1`).**
+
+    Pola statystyk pochodzą z adnotacji `annotate_user_stats` i są tylko do odczytu.
+    """
+    incomes_count = serializers.IntegerField(
+        read_only=True,
+        help_text="Liczba przychodów użytkownika."
+    )
+    expenses_count = serializers.IntegerField(
+        read_only=True,
+        help_text="Liczba wydatków użytkownika."
+    )
+    total_incomes = serializers.DecimalField(
+        max_digits=14, decimal_places=2, read_only=True,
+        help_text="Suma wszystkich przychodów użytkownika."
+    )
+    total_expenses = serializers.DecimalField(
+        max_digits=14, decimal_places=2, read_only=True,
+        help_text="Suma wszystkich wydatków użytkownika."
+    )
+    last_activity = serializers.DateField(
+        read_only=True, allow_null=True,
+        help_text="Data najnowszego przychodu lub wydatku (null, jeśli brak wpisów)."
+    )
+
+    class Meta(UserAdminSerializer.Meta):
+        fields = UserAdminSerializer.Meta.fields + [
+            'incomes_count', 'expenses_count', 'total_incomes', 'total_expenses', 'last_activity'
+        ]
+
 class IncomesCategorySerializer(serializers.ModelSerializer):
     """
     **Serializator dla kategorii przychodów.**
@@ -216,7 +297,7 @@ class IncomesCategorySerializer(serializers.ModelSerializer):
         user = validated_data['user']
         category = validated_data['category']
         
-        if IncomesCategory.objects.filter(user=user, category=category).exists():
+        if IncomesCategory.objects.filter(user=user, category=category, is_deleted=False).exists():
             raise serializers.ValidationError("Category already exists for this user.")
         
         instance = IncomesCategory.objects.create(user=user, category=category)
@@ -245,13 +326,79 @@ class ExpensesCategorySerializer(serializers.ModelSerializer):
         user = validated_data['user']
         category = validated_data['category']
 
-        if ExpensesCategory.objects.filter(user=user, category=category).exists():
+        if ExpensesCategory.objects.filter(user=user, category=category, is_deleted=False).exists():
             raise serializers.ValidationError("Category already exists for this user.")
         
         instance = ExpensesCategory.objects.create(user=user, category=category)
         return instance
     
 
+class UserCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    **Pole kategorii ograniczone do kategorii zalogowanego użytkownika.**
+
+    Kategorie użytkownika są wczytywane jednym zapytaniem i zapamiętywane w obiekcie
+    żądania, więc walidacja kolejnych wpisów w tym samym żądaniu nie odpytuje bazy.
+    ID kategorii innych użytkowników są odrzucane tak samo jak nieistniejące.
+    """
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        return super().get_queryset().filter(user=getattr(request, 'user', None), is_deleted=False)
+
+    def user_categories(self):
+        request = self.context.get('request')
+        if request is None or not request.user.is_authenticated:
+            return {}
+        cache = getattr(request, '_user_categories', None)
+        if cache is None:
+            cache = request._user_categories = {}
+        model = self.queryset.model
+        if model not in cache:
+            cache[model] = self.get_queryset().in_bulk()
+        return cache[model]
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        category = self.user_categories().get(pk)
+        if category is None:
+            self.fail('does_not_exist', pk_value=data)
+        return category
+
+class LedgerListSerializer(serializers.ListSerializer):
+    """
+    **Szybka serializacja list przychodów i wydatków z wierszy `.values()`.**
+
+    Gdy lista składa się ze słowników pobranych przez `.values(*LEDGER_LIST_VALUES)`,
+    odpowiedź budowana jest bezpośrednio, z pominięciem pętli po polach serializatora
+    dla każdego wiersza. Wynik jest identyczny jak dla `IncomesSerializer`/`ExpensesSerializer`,
+    które pozostają źródłem schematu OpenAPI. Listy obiektów modelu są obsługiwane standardowo.
+    """
+
+    def to_representation(self, data):
+        rows = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if rows and not isinstance(rows[0], dict):
+            return super().to_representation(rows)
+        return [
+            {
+                'id': row['id'],
+                'user': row['user_id'],
+                'category': row['category_id'],
+                'category_name': row['category__category'],
+                'amount': f"{row['amount']:.2f}",
+                'description': row['description'],
+                'date': row['date'].isoformat(),
+            }
+            for row in rows
+        ]
+
+LEDGER_LIST_VALUES = ('id', 'user_id', 'category_id', 'category__category', 'amount', 'description', 'date')
+
 class IncomesSerializer(serializers.ModelSerializer):
     """
     **Serializator dla pojedynczego przychodu.**
@@ -265,9 +412,9 @@ class IncomesSerializer(serializers.ModelSerializer):
         source='category.category', read_only=True,
         help_text="Nazwa kategorii przychodu, do której należy ten przychód (tylko do odczytu)."
     )
-    category = serializers.PrimaryKeyRelatedField(
+    category = UserCategoryField(
         queryset=IncomesCategory.objects.all(),
-        help_text="ID kategorii przychodu, do której przypisany jest ten przychód. Wymagane."
+        help_text="ID kategorii przychodu, do której przypisany jest ten przychód. Musi należeć do zalogowanego użytkownika. Wymagane."
     )
     amount = serializers.DecimalField(
         max_digits=10, decimal_places=2,
@@ -285,6 +432,7 @@ class IncomesSerializer(serializers.ModelSerializer):
         model = Incomes
         fields = ['id', 'user', 'category', 'category_name', 'amount', 'description', 'date']
         extra_kwargs = {'user': {'read_only': True}}
+        list_serializer_class = LedgerListSerializer
 
     def create(self, validated_data):
         user = validated_data['user']
@@ -312,9 +460,9 @@ class ExpensesSerializer(serializers.ModelSerializer):
         source='category.category', read_only=True,
         help_text="Nazwa kategorii wydatku, do której należy ten wydatek (tylko do odczytu)."
     )
-    category = serializers.PrimaryKeyRelatedField(
+    category = UserCategoryField(
         queryset=ExpensesCategory.objects.all(),
-        help_text="ID kategorii wydatku, do której przypisany jest ten wydatek. Wymagane."
+        help_text="ID kategorii wydatku, do której przypisany jest ten wydatek. Musi należeć do zalogowanego użytkownika. Wymagane."
     )
     amount = serializers.DecimalField(
         max_digits=10, decimal_places=2,
@@ -332,6 +480,7 @@ class ExpensesSerializer(serializers.ModelSerializer):
         model = Expenses
         fields = ['id', 'user', 'category', 'category_name', 'amount', 'description', 'date']
         extra_kwargs = {'user': {'read_only': True}}
+        list_serializer_class = LedgerListSerializer
 
     def create(self, validated_data):
         user = validated_data['user']
@@ -346,6 +495,318 @@ class ExpensesSerializer(serializers.ModelSerializer):
         instance = Expenses.objects.create(user=user, category=category, amount=amount, description=description, date=date)
         return instance
 
+class LedgerBulkItemSerializer(serializers.Serializer):
+    """
+    **Serializator pojedynczego wpisu w masowym dodawaniu przychodów lub wydatków.**
+
+    Kategoria jest walidowana zbiorczo (jednym zapytaniem) dla całej paczki,
+    dlatego tutaj przyjmowane jest tylko jej ID.
+    """
+    category = serializers.IntegerField(
+        help_text="ID kategorii należącej do zalogowanego użytkownika. Wymagane."
+    )
+    amount = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal('0'),
+        help_text="Kwota transakcji. Nie może być ujemna."
+    )
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True,
+        help_text="Opcjonalny szczegółowy opis transakcji."
+    )
+    date = serializers.DateField(
+        help_text="Data transakcji w formacie YYYY-MM-DD."
+    )
+
+class LedgerBulkCreateSerializer(serializers.Serializer):
+    """
+    **Serializator żądania masowego dodawania przychodów lub wydatków.**
+
+    Każdy element `items` ma strukturę `LedgerBulkItemSerializer` i jest walidowany osobno.
+    Przy `atomic=false` poprawne wpisy są zapisywane mimo błędów w pozostałych.
+    """
+    items = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=settings.LEDGER_BULK_MAX_ITEMS,
+        help_text="Lista wpisów (pola: `category`, `amount`, `description`, `date`)."
+    )
+    atomic = serializers.BooleanField(
+        default=False,
+        help_text="Jeśli `true`, żaden wpis nie zostanie zapisany, gdy choć jeden jest niepoprawny."
+    )
+
+class LedgerBulkErrorSerializer(serializers.Serializer):
+    """
+    **Serializator błędu walidacji pojedynczego wpisu w masowym dodawaniu.**
+    """
+    index = serializers.IntegerField(help_text="Pozycja wpisu w liście `items`.")
+    errors = serializers.DictField(
+        child=serializers.ListField(child=serializers.CharField()),
+        help_text="Błędy walidacji wpisu (nazwa pola: lista komunikatów)."
+    )
+
+class LedgerBulkResultSerializer(serializers.Serializer):
+    """
+    **Serializator odpowiedzi masowego dodawania przychodów lub wydatków.**
+    """
+    created = serializers.IntegerField(help_text="Liczba zapisanych wpisów.")
+    ids = serializers.ListField(child=serializers.IntegerField(), help_text="ID zapisanych wpisów, w kolejności z żądania.")
+    errors = LedgerBulkErrorSerializer(many=True, help_text="Błędy niepoprawnych wpisów.")
+
+class TransactionImportSerializer(serializers.Serializer):
+    """
+    **Serializator żądania importu transakcji z pliku CSV.**
+
+    Plik musi mieć nagłówek. Domyślne nazwy kolumn to `date`, `amount`, `category`,
+    `description` i `type`; każdą z nich można zmienić parametrem `*_column`.
+    """
+    file = serializers.FileField(
+        help_text="Plik CSV z transakcjami (UTF-8), najwyżej `LEDGER_IMPORT_MAX_BYTES` bajtów "
+                  "i `LEDGER_IMPORT_MAX_ROWS` wierszy."
+    )
+    delimiter = serializers.CharField(
+        default=',', max_length=1, trim_whitespace=False,
+        help_text="Separator kolumn (np. `,` lub `;`)."
+    )
+    date_format = serializers.CharField(
+        default='%Y-%m-%d',
+        help_text="Format daty w notacji `strftime` (np. `%d.%m.%Y`)."
+    )
+    decimal_comma = serializers.BooleanField(
+        default=False,
+        help_text="Czy kwoty używają przecinka dziesiętnego (np. `1 234,56`)."
+    )
+    date_column = serializers.CharField(required=False, help_text="Nazwa kolumny z datą.")
+    amount_column = serializers.CharField(required=False, help_text="Nazwa kolumny z kwotą.")
+    category_column = serializers.CharField(required=False, help_text="Nazwa kolumny z kategorią.")
+    description_column = serializers.CharField(required=False, help_text="Nazwa kolumny z opisem.")
+    type_column = serializers.CharField(
+        required=False,
+        help_text="Nazwa kolumny z typem (`income`/`expense`). Bez niej kwoty ujemne są wydatkami."
+    )
+
+    def validate_file(self, value):
+        if value.size > settings.LEDGER_IMPORT_MAX_BYTES:
+            raise serializers.ValidationError(
+                f"Plik jest za duży (limit {settings.LEDGER_IMPORT_MAX_BYTES // 1024} KiB). "
+                "Podziel go na mniejsze części."
+            )
+        return value
+
+    def get_columns(self):
+        return {
+            key: self.validated_data[f'{key}_column']
+            for key in ('date', 'amount', 'category', 'description', 'type')
+            if f'{key}_column' in self.validated_data
+        }
+
+class TransactionImportResultSerializer(serializers.Serializer):
+    """
+    **Serializator podsumowania importu transakcji.**
+    """
+    rows = serializers.IntegerField(help_text="Liczba przetworzonych wierszy danych.")
+    incomes = serializers.IntegerField(help_text="Liczba zapisanych przychodów.")
+    expenses = serializers.IntegerField(help_text="Liczba zapisanych wydatków.")
+    categories_created = serializers.IntegerField(help_text="Liczba utworzonych kategorii.")
+    skipped = serializers.IntegerField(help_text="Liczba pominiętych, niepoprawnych wierszy.")
+    errors = serializers.ListField(
+        child=serializers.DictField(),
+        help_text="Pierwsze błędy (numer linii i komunikat)."
+    )
+
+class LedgerFilterSerializer(serializers.Serializer):
+    """
+    **Serializator filtrów przychodów i wydatków (kategorie, kwoty, daty).**
+
+    Zweryfikowane dane są przekazywane do `myapp.filters.filter_ledger` - ten sam zestaw
+    filtrów obsługują listy, eksport i podsumowanie zakresu miesięcy.
+    """
+    category = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, max_length=50,
+        help_text="ID kategorii; parametr można powtórzyć (`?category=1&category=2`)."
+    )
+    amount_min = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False,
+        help_text="Minimalna kwota (włącznie)."
+    )
+    amount_max = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False,
+        help_text="Maksymalna kwota (włącznie)."
+    )
+    date_from = serializers.DateField(required=False, help_text="Data początkowa (włącznie), YYYY-MM-DD.")
+    date_to = serializers.DateField(required=False, help_text="Data końcowa (włącznie), YYYY-MM-DD.")
+
+    def validate(self, data):
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError({"date_to": "Data końcowa musi być późniejsza niż początkowa."})
+        if data.get('amount_min') is not None and data.get('amount_max') is not None \
+                and data['amount_min'] > data['amount_max']:
+            raise serializers.ValidationError({"amount_max": "Kwota maksymalna nie może być mniejsza niż minimalna."})
+        if data.get('category') and data.get('kind') == 'all':
+            raise serializers.ValidationError(
+                {"category": "Filtr kategorii wymaga wyboru rodzaju transakcji (`kind`)."}
+            )
+        return data
+
+class LedgerListFilterSerializer(LedgerFilterSerializer):
+    """
+    **Serializator filtrów i sortowania list przychodów lub wydatków.**
+    """
+    ordering = serializers.ChoiceField(
+        choices=list(LEDGER_ORDERINGS), default='-date',
+        help_text="Sortowanie: `-date` (domyślnie), `date`, `-amount` lub `amount`."
+    )
+
+class LedgerExportSerializer(LedgerFilterSerializer):
+    """
+    **Serializator parametrów eksportu przychodów i wydatków.**
+    """
+    output = serializers.ChoiceField(
+        choices=['csv', 'json'], default='csv',
+        help_text="Format pliku: `csv` lub `json`."
+    )
+    kind = serializers.ChoiceField(
+        choices=['all', 'incomes', 'expenses'], default='all',
+        help_text="Zakres eksportu: wszystko, tylko przychody lub tylko wydatki."
+    )
+    compress = serializers.ChoiceField(
+        choices=['none', 'gzip'], default='none',
+        help_text="Kompresja pliku w locie: `none` lub `gzip`."
+    )
+
+class TransactionSearchSerializer(serializers.Serializer):
+    """
+    **Serializator parametrów wyszukiwania pełnotekstowego w opisach transakcji.**
+    """
+    q = serializers.CharField(
+        max_length=200,
+        help_text="Szukane słowa; każde musi wystąpić w opisie, ostatnie może być początkiem słowa."
+    )
+    kind = serializers.ChoiceField(
+        choices=['all', 'incomes', 'expenses'], default='all',
+        help_text="Zakres wyszukiwania: wszystko, tylko przychody lub tylko wydatki."
+    )
+    date_from = serializers.DateField(required=False, help_text="Data początkowa (włącznie), YYYY-MM-DD.")
+    date_to = serializers.DateField(required=False, help_text="Data końcowa (włącznie), YYYY-MM-DD.")
+
+    def validate(self, data):
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError({"date_to": "Data końcowa musi być późniejsza niż początkowa."})
+        return data
+
+class TransactionSearchResultSerializer(serializers.Serializer):
+    """
+    **Serializator pojedynczego wyniku wyszukiwania (przychód lub wydatek).**
+    """
+    kind = serializers.ChoiceField(choices=['income', 'expense'], help_text="Rodzaj transakcji.")
+    id = serializers.IntegerField(help_text="ID przychodu lub wydatku.")
+    category = serializers.IntegerField(source='category_id', help_text="ID kategorii.")
+    category_name = serializers.CharField(source='category__category', help_text="Nazwa kategorii.")
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, help_text="Kwota transakcji.")
+    description = serializers.CharField(allow_null=True, help_text="Opis transakcji.")
+    date = serializers.DateField(help_text="Data transakcji.")
+    rank = serializers.FloatField(help_text="Trafność dopasowania (większa = lepsza).")
+
+class TransactionSearchPageSerializer(serializers.Serializer):
+    """
+    **Serializator strony wyników wyszukiwania.**
+    """
+    next = serializers.URLField(allow_null=True, help_text="Adres kolejnej strony wyników (null na ostatniej stronie).")
+    results = TransactionSearchResultSerializer(many=True, help_text="Wyniki na bieżącej stronie.")
+
+class DashboardSerializer(serializers.Serializer):
+    """
+    **Serializator danych ekranu głównego dla jednego miesiąca.**
+
+    Łączy w jednej odpowiedzi przychody i wydatki z miesiąca, obie listy kategorii
+    oraz sumy miesięczne.
+    """
+    year = serializers.IntegerField(help_text="Rok.")
+    month = serializers.IntegerField(help_text="Miesiąc.")
+    total_income = serializers.DecimalField(max_digits=14, decimal_places=2, help_text="Suma przychodów w miesiącu.")
+    total_expense = serializers.DecimalField(max_digits=14, decimal_places=2, help_text="Suma wydatków w miesiącu.")
+    balance = serializers.DecimalField(max_digits=14, decimal_places=2, help_text="Bilans miesiąca (przychody - wydatki).")
+    incomes = IncomesSerializer(many=True, help_text="Przychody z miesiąca, od najnowszych.")
+    expenses = ExpensesSerializer(many=True, help_text="Wydatki z miesiąca, od najnowszych.")
+    incomes_categories = IncomesCategorySerializer(many=True, help_text="Kategorie przychodów użytkownika.")
+    expenses_categories = ExpensesCategorySerializer(many=True, help_text="Kategorie wydatków użytkownika.")
+
+class PendingDeletionSerializer(serializers.ModelSerializer):
+    """
+    **Serializator postępu usuwania w tle.**
+    """
+    progress = serializers.SerializerMethodField(help_text="Postęp usuwania w procentach (0-100).")
+
+    class Meta:
+        model = PendingDeletion
+        fields = ['id', 'kind', 'object_id', 'status', 'total', 'deleted', 'progress', 'error', 'created_at', 'finished_at']
+        read_only_fields = fields
+
+    def get_progress(self, obj) -> float:
+        if obj.status == PendingDeletion.STATUS_DONE:
+            return 100.0
+        if not obj.total:
+            return 0.0
+        return round(min(obj.deleted, obj.total) * 100 / obj.total, 1)
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    **Serializator stanu zadania w tle.**
+    """
+    class Meta:
+        model = Job
+        fields = ['id', 'type', 'status', 'attempts', 'max_attempts', 'run_after', 'result', 'error', 'created_at', 'finished_at']
+        read_only_fields = fields
+
+class MonthField(serializers.CharField):
+    """
+    **Pole przyjmujące miesiąc w formacie `YYYY-MM` i zwracające pierwszy dzień tego miesiąca.**
+
+    Odrzucany jest też miesiąc, dla którego nie da się wyznaczyć zakresu dat (`9999-12`).
+    """
+    default_error_messages = {
+        'invalid': "Niepoprawny miesiąc. Oczekiwany format: YYYY-MM.",
+    }
+
+    def to_internal_value(self, data):
+        try:
+            year, month = (int(part) for part in super().to_internal_value(data).split('-'))
+            start, end = month_date_range(year, month)
+            return start
+        except (TypeError, ValueError):
+            self.fail('invalid')
+
+    def to_representation(self, value):
+        return value.strftime('%Y-%m')
+
+class SummaryRangeSerializer(LedgerFilterSerializer):
+    """
+    **Serializator parametrów podsumowania wielomiesięcznego (`from`, `to`).**
+
+    Oba końce zakresu są włączne; zakres nie może przekraczać `SUMMARY_MAX_MONTHS` miesięcy.
+    Pozostałe parametry to filtry `LedgerFilterSerializer` i rodzaj transakcji (`kind`).
+    """
+
+    def get_fields(self):
+        return {
+            'from': MonthField(help_text="Pierwszy miesiąc zakresu (włącznie), YYYY-MM."),
+            'to': MonthField(help_text="Ostatni miesiąc zakresu (włącznie), YYYY-MM."),
+            'kind': serializers.ChoiceField(
+                choices=['all', 'incomes', 'expenses'], default='all',
+                help_text="Zakres podsumowania: wszystko, tylko przychody lub tylko wydatki."
+            ),
+            **super().get_fields(),
+        }
+
+    def validate(self, data):
+        data = super().validate(data)
+        months = (data['to'].year - data['from'].year) * 12 + data['to'].month - data['from'].month + 1
+        if months < 1:
+            raise serializers.ValidationError({"to": "Miesiąc końcowy nie może być wcześniejszy niż początkowy."})
+        if months > settings.SUMMARY_MAX_MONTHS:
+            raise serializers.ValidationError(
+                {"to": f"Zakres może obejmować najwyżej {settings.SUMMARY_MAX_MONTHS} miesięcy."}
+            )
+        return data
+
 class ErrorSerializer(serializers.Serializer):
     """
     **Serializator dla ogólnych odpowiedzi błędów API.**
@@ -0,0 +1,76 @@
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import rollups
+from .authentication import user_cache
+from .conditional import bump_ledger_version
+from .models import Incomes, Expenses, IncomesCategory, ExpensesCategory
+
+CATEGORY_MODELS = {
+    IncomesCategory: Incomes,
+    ExpensesCategory: Expenses,
+}
+
+
+def _is_direct_delete(sender, instance, origin):
+    # Kaskady z kategorii i użytkowników czyszczą sumy hurtowo w swoich własnych handlerach.
+    if origin is instance:
+        return True
+    return isinstance(origin, QuerySet) and origin.model is sender
+
+
+@receiver(pre_save, sender=Incomes)
+@receiver(pre_save, sender=Expenses)
+def remember_previous_transaction(sender, instance, **kwargs):
+    instance._rollup_previous = None
+    if instance.pk and not instance._state.adding:
+        instance._rollup_previous = sender.objects.select_related('category').filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Incomes)
+@receiver(post_save, sender=Expenses)
+def update_rollups_on_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous is not None:
+        rollups.record_transactions(sender, [previous], sign=-1)
+    rollups.record_transactions(sender, [instance])
+    bump_ledger_version(instance.user_id)
+
+
+@receiver(post_delete, sender=Incomes)
+@receiver(post_delete, sender=Expenses)
+def update_rollups_on_delete(sender, instance, origin=None, **kwargs):
+    if _is_direct_delete(sender, instance, origin):
+        rollups.record_transactions(sender, [instance], sign=-1)
+        bump_ledger_version(instance.user_id)
+
+
+@receiver(pre_delete, sender=IncomesCategory)
+def forget_incomes_category(sender, instance, origin=None, **kwargs):
+    rollups.forget_category(Incomes, instance.pk)
+    if _is_direct_delete(sender, instance, origin):
+        bump_ledger_version(instance.user_id)
+
+
+@receiver(pre_delete, sender=ExpensesCategory)
+def forget_expenses_category(sender, instance, origin=None, **kwargs):
+    rollups.forget_category(Expenses, instance.pk)
+    if _is_direct_delete(sender, instance, origin):
+        bump_ledger_version(instance.user_id)
+
+
+@receiver(post_save, sender=IncomesCategory)
+@receiver(post_save, sender=ExpensesCategory)
+def bump_version_on_category_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and (update_fields is None or 'category' in update_fields):
+        rollups.rename_category(CATEGORY_MODELS[sender], instance.pk, instance.category)
+    bump_ledger_version(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Obejmuje zmiany profilu, hasła, uprawnień i dezaktywację przed usunięciem w tle.
+    user_cache.invalidate(instance.pk)
@@ -0,0 +1,84 @@
+import hashlib
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    **Łączy równoczesne wywołania o tym samym kluczu w jedno obliczenie (w obrębie procesu).**
+
+    Pierwszy wątek z danym kluczem wykonuje funkcję, a pozostałe czekają na jej
+    zakończenie i otrzymują ten sam wynik (lub ten sam wyjątek).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        **Wykonuje `fn()` albo dołącza do trwającego wywołania z tym samym kluczem.**
+
+        Zwraca parę `(wynik, współdzielony)`, gdzie `współdzielony` mówi, czy wynik
+        pochodzi z wywołania rozpoczętego przez inny wątek.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+single_flight = SingleFlight()
+
+
+def _lock_id(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+@contextmanager
+def advisory_lock(key):
+    """
+    **Blokada doradcza PostgreSQL (`pg_advisory_lock`) dla danego klucza, wspólna dla wszystkich procesów.**
+
+    Działa tylko przy włączonym `SINGLE_FLIGHT_ADVISORY_LOCK` i bazie PostgreSQL;
+    w pozostałych przypadkach nic nie robi.
+    """
+    if not settings.SINGLE_FLIGHT_ADVISORY_LOCK or connection.vendor != 'postgresql':
+        yield
+        return
+    lock_id = _lock_id(key)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_lock(%s)', [lock_id])
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_unlock(%s)', [lock_id])
@@ -0,0 +1,209 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from .filters import filter_ledger
+from .models import Incomes, Expenses, MonthlyCategoryTotal
+from .singleflight import advisory_lock, single_flight
+
+SUMMARY_CACHE_PREFIX = 'summary'
+HITS_KEY = f'{SUMMARY_CACHE_PREFIX}:hits'
+MISSES_KEY = f'{SUMMARY_CACHE_PREFIX}:misses'
+
+LEDGER_MODELS = {
+    MonthlyCategoryTotal.KIND_INCOME: Incomes,
+    MonthlyCategoryTotal.KIND_EXPENSE: Expenses,
+}
+
+
+def _sorted_by_total(totals):
+    return dict(sorted(totals.items(), key=lambda x: x[1], reverse=True))
+
+
+def month_summary(user_id, year, month):
+    """
+    **Oblicza podsumowanie jednego miesiąca na podstawie tabeli sum miesięcznych.**
+    """
+    by_category = {
+        MonthlyCategoryTotal.KIND_INCOME: {},
+        MonthlyCategoryTotal.KIND_EXPENSE: {},
+    }
+    rows = MonthlyCategoryTotal.objects.filter(
+        user_id=user_id, year=year, month=month
+    ).values_list('kind', 'category_name', 'total')
+    for kind, category_name, total in rows:
+        totals = by_category[kind]
+        totals[category_name] = totals.get(category_name, Decimal('0.00')) + total
+
+    income_by_category = by_category[MonthlyCategoryTotal.KIND_INCOME]
+    expense_by_category = by_category[MonthlyCategoryTotal.KIND_EXPENSE]
+    total_income = sum(income_by_category.values(), Decimal('0.00'))
+    total_expense = sum(expense_by_category.values(), Decimal('0.00'))
+
+    return {
+        'year': year,
+        'month': month,
+        'total_income': f"{total_income:.2f}",
+        'total_expense': f"{total_expense:.2f}",
+        'balance': f"{total_income - total_expense:.2f}",
+        'income_by_category': _sorted_by_total(income_by_category),
+        'expense_by_category': _sorted_by_total(expense_by_category),
+    }
+
+
+def summary_cache_key(user_id, year, month):
+    return f'{SUMMARY_CACHE_PREFIX}:{user_id}:{year}:{month}'
+
+
+def _count(key):
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def cached_month_summary(user_id, year, month, version):
+    """
+    **Zwraca podsumowanie miesiąca z cache (obliczając je przy braku aktualnego wpisu).**
+
+    `version` to numer wersji danych użytkownika (`LedgerVersion`) odczytany przed
+    obliczeniem. Wpis w cache przechowuje wersję, z którą go obliczono, i jest używany
+    tylko przy zgodnej wersji - każdy zapis zwiększa wersję w tej samej transakcji,
+    więc nieaktualnego wpisu nie zwróci ani inny proces (cache `LocMemCache` jest osobny
+    w każdym workerze), ani obliczenie, które zapisało cache już po zatwierdzeniu zapisu.
+    Równoczesne chybienia dla tego samego klucza i wersji są łączone przez `single_flight`,
+    więc agregacja wykonuje się raz. Przy `SINGLE_FLIGHT_ADVISORY_LOCK` obliczenie
+    odbywa się pod blokadą doradczą, a cache jest sprawdzany ponownie po jej
+    uzyskaniu (ma to sens przy cache współdzielonym przez procesy, np. plikowym).
+    Zwraca parę `(podsumowanie, trafienie)`, gdzie `trafienie` mówi, czy dane pochodziły z cache.
+    """
+    key = summary_cache_key(user_id, year, month)
+    cached = cache.get(key)
+    if cached is not None and cached[0] == version:
+        _count(HITS_KEY)
+        return cached[1], True
+
+    def compute():
+        with advisory_lock(key):
+            cached = cache.get(key)
+            if cached is not None and cached[0] == version:
+                _count(HITS_KEY)
+                return cached[1]
+            _count(MISSES_KEY)
+            summary = month_summary(user_id, year, month)
+            cache.set(key, (version, summary), timeout=settings.SUMMARY_CACHE_TIMEOUT)
+            return summary
+
+    summary, shared = single_flight.do(f'{key}:{version}', compute)
+    if shared:
+        _count(HITS_KEY)
+    return summary, shared
+
+
+def invalidate_month_summaries(months):
+    """
+    **Usuwa z cache bieżącego procesu podsumowania podanych miesięcy `(user_id, year, month)`.**
+
+    Poprawność zapewnia wersja danych zapisana we wpisie (`cached_month_summary`);
+    usunięcie jedynie zwalnia miejsce po wpisach, które i tak nie zostałyby już użyte.
+    """
+    keys = [summary_cache_key(user_id, year, month) for user_id, year, month in set(months)]
+    if keys:
+        cache.delete_many(keys)
+
+
+def summary_cache_stats():
+    """
+    **Zwraca liczniki trafień i chybień cache podsumowań.**
+    """
+    counters = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+    }
+
+
+def _month_totals(user, start, end, kinds, filters):
+    # Jedno zapytanie do sum miesięcznych dla całego zakresu `[start, end)`.
+    rows = MonthlyCategoryTotal.objects.filter(user=user, kind__in=kinds).filter(
+        Q(year__gt=start.year) | Q(year=start.year, month__gte=start.month),
+        Q(year__lt=end.year) | Q(year=end.year, month__lt=end.month),
+    )
+    if filters.get('category'):
+        rows = rows.filter(category_id__in=filters['category'])
+    return _group_totals(rows.values_list('year', 'month', 'kind', 'category_name', 'total'))
+
+
+def _ledger_month_totals(user, start, end, kinds, filters):
+    # Filtrów kwot i dat nie da się zastosować do sum miesięcznych - agregowane są
+    # surowe wpisy, zawężone przez `filter_ledger` i zakres `[start, end)`.
+    rows = []
+    for kind in kinds:
+        model = LEDGER_MODELS[kind]
+        queryset = filter_ledger(
+            model.objects.filter(user=user, category__is_deleted=False, date__gte=start, date__lt=end), filters
+        )
+        grouped = queryset.order_by().values(
+            year=ExtractYear('date'), month=ExtractMonth('date'), name=F('category__category'),
+        ).annotate(total=Sum('amount')).values_list('year', 'month', 'name', 'total')
+        rows += [(year, month, kind, name, total) for year, month, name, total in grouped]
+    return _group_totals(rows)
+
+
+def _group_totals(rows):
+    totals = {}
+    for year, month, kind, name, total in rows:
+        month_totals = totals.setdefault((year, month, kind), {})
+        month_totals[name] = month_totals.get(name, Decimal('0.00')) + total
+    return totals
+
+
+def range_summary(user, start, end, kinds=tuple(LEDGER_MODELS), filters=None):
+    """
+    **Oblicza podsumowanie przychodów i wydatków dla każdego miesiąca z zakresu `[start, end)`.**
+
+    `start` i `end` to pierwsze dni miesięcy. Zwraca słownik z sumami całego zakresu
+    i listą `months`, zawierającą także miesiące bez transakcji. `kinds` ogranicza
+    rodzaje transakcji, a `filters` to filtry `LedgerFilterSerializer`: sam filtr kategorii
+    korzysta z sum miesięcznych, filtry kwot i dat wymagają agregacji surowych wpisów.
+    """
+    filters = filters or {}
+    if any(filters.get(key) is not None for key in ('amount_min', 'amount_max', 'date_from', 'date_to')):
+        totals = _ledger_month_totals(user, start, end, kinds, filters)
+    else:
+        totals = _month_totals(user, start, end, kinds, filters)
+
+    months = []
+    total_income = total_expense = Decimal('0.00')
+    year, month = start.year, start.month
+    while (year, month) < (end.year, end.month):
+        income_by_category = totals.get((year, month, MonthlyCategoryTotal.KIND_INCOME), {})
+        expense_by_category = totals.get((year, month, MonthlyCategoryTotal.KIND_EXPENSE), {})
+        month_income = sum(income_by_category.values(), Decimal('0.00'))
+        month_expense = sum(expense_by_category.values(), Decimal('0.00'))
+        total_income += month_income
+        total_expense += month_expense
+        months.append({
+            'year': year,
+            'month': month,
+            'total_income': f"{month_income:.2f}",
+            'total_expense': f"{month_expense:.2f}",
+            'balance': f"{month_income - month_expense:.2f}",
+            'income_by_category': _sorted_by_total(income_by_category),
+            'expense_by_category': _sorted_by_total(expense_by_category),
+        })
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    return {
+        'total_income': f"{total_income:.2f}",
+        'total_expense': f"{total_expense:.2f}",
+        'balance': f"{total_income - total_expense:.2f}",
+        'months': months,
+    }
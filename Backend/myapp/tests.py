@@ -1,8 +1,13 @@
 from rest_framework.test import APITestCase
+from django.test import TransactionTestCase
 from rest_framework import status
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.core.cache import cache, caches
 from decimal import Decimal 
+import datetime
+import io
+import os
 from myapp.models import *
 
 class IncomesCategoryTests(APITestCase):
@@ -43,7 +48,10 @@ class IncomesCategoryTests(APITestCase):
         category = IncomesCategory.objects.create(user=self.user, category='Freelance')
         delete_url = reverse('delete-incomes-category', args=[category.id])
         response = self.client.delete(delete_url)
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(self.client.get(self.category_url).data)
+        from django.core.management import call_command
+        call_command('run_worker', once=True, stdout=io.StringIO())
         self.assertEqual(IncomesCategory.objects.count(), 0)
 
     def test_delete_non_existent_category(self):
@@ -116,7 +124,10 @@ class ExpensesCategoryTests(APITestCase):
         category = ExpensesCategory.objects.create(user=self.user, category='Food')
         delete_url = reverse('delete-expenses-category', args=[category.id])
         response = self.client.delete(delete_url)
-        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(self.client.get(self.category_url).data)
+        from django.core.management import call_command
+        call_command('run_worker', once=True, stdout=io.StringIO())
         self.assertEqual(ExpensesCategory.objects.count(), 0)
 
     def test_delete_non_existent_category(self):
@@ -200,7 +211,7 @@ class ExpensesTests(APITestCase):
         )
         response = self.client.get(self.expense_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
     def test_delete_expense(self):
         expense = Expenses.objects.create(
@@ -289,7 +300,7 @@ class IncomesTests(APITestCase):
         )
         response = self.client.get(self.income_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
     def test_delete_income(self):
         income = Incomes.objects.create(
@@ -324,6 +335,7 @@ class IncomesTests(APITestCase):
 
 class MonthlySummaryTests(APITestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username='testuser', password='testpassword')
         self.client.force_authenticate(user=self.user) 
         self.income_category = IncomesCategory.objects.create(user=self.user, category='Salary')
@@ -441,9 +453,45 @@ class AdminUserTests(APITestCase):
     def test_list_users(self):
         response = self.client.get(self.user_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
-        self.assertEqual(response.data[0]['username'], 'admin')
-        self.assertEqual(response.data[1]['username'], 'testuser')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(response.data['results'][0]['username'], 'admin')
+        self.assertEqual(response.data['results'][1]['username'], 'testuser')
+        self.assertIsNone(response.data['next'])
+        self.assertNotIn('incomes_count', response.data['results'][0])
+
+    def test_list_users_pages(self):
+        User.objects.bulk_create([User(username=f'user{n:02}') for n in range(5)])
+        url, seen = self.user_url + '?page_size=3', []
+        while url:
+            response = self.client.get(url)
+            seen.extend(user['username'] for user in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, ['admin', 'testuser', 'user00', 'user01', 'user02', 'user03', 'user04'])
+
+    def test_search_users_by_prefix(self):
+        User.objects.create_user(username='Tester2', email='other@example.com')
+        User.objects.create_user(username='jan', email='TEST@example.com')
+        response = self.client.get(self.user_url, {'search': 'test'})
+        self.assertEqual([u['username'] for u in response.data['results']], ['Tester2', 'jan', 'testuser'])
+        response = self.client.get(self.user_url, {'search': 'example'})
+        self.assertEqual(response.data['results'], [])
+
+    def test_list_users_with_stats(self):
+        income_category = IncomesCategory.objects.create(user=self.user, category='Salary')
+        expense_category = ExpensesCategory.objects.create(user=self.user, category='Food')
+        Incomes.objects.create(user=self.user, category=income_category, amount=Decimal('100.00'),
+                               date=datetime.date(2024, 1, 5))
+        Incomes.objects.create(user=self.user, category=income_category, amount=Decimal('50.50'),
+                               date=datetime.date(2024, 2, 5))
+        Expenses.objects.create(user=self.user, category=expense_category, amount=Decimal('20.00'),
+                                date=datetime.date(2024, 3, 1))
+        with self.assertNumQueries(1):
+            response = self.client.get(self.user_url, {'stats': '1'})
+        admin, user = response.data['results']
+        self.assertEqual((admin['incomes_count'], admin['total_expenses'], admin['last_activity']), (0, '0.00', None))
+        self.assertEqual((user['incomes_count'], user['expenses_count']), (2, 1))
+        self.assertEqual((user['total_incomes'], user['total_expenses']), ('150.50', '20.00'))
+        self.assertEqual(user['last_activity'], '2024-03-01')
 
     def test_create_user(self):
         data = {'username': 'newuser', 'password': 'newpassword', 'email': 'newuser@example.com'}
@@ -511,6 +559,7 @@ class UserChangePasswordTests(APITestCase):
 
 class TokenTests(APITestCase):
     def setUp(self):
+        caches['throttle'].clear()
         self.user = User.objects.create_user(username='testuser', password='testpassword')
         self.token_url = reverse('get_token')
         self.refresh_url = reverse('refresh')
@@ -545,8 +594,205 @@ class TokenTests(APITestCase):
         response = self.client.post(self.refresh_url, data)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+class JwtUserCacheTests(APITestCase):
+    def setUp(self):
+        from myapp.authentication import user_cache
+        user_cache.clear()
+        caches['throttle'].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='t@example.com')
+        response = self.client.post(reverse('get_token'), {'username': 'testuser', 'password': 'testpassword'})
+        self.access = response.data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access}')
+
+    def test_user_row_is_fetched_once(self):
+        from myapp.authentication import user_cache
+        user_cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(reverse('user_info')).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('user_info')).data['email'], 't@example.com')
+
+    def test_cache_can_be_disabled(self):
+        from django.test import override_settings
+        from myapp.authentication import user_cache
+        user_cache.clear()
+        with override_settings(JWT_USER_CACHE_TTL=0):
+            self.client.get(reverse('user_info'))
+            with self.assertNumQueries(1):
+                self.client.get(reverse('user_info'))
+
+    def test_profile_update_invalidates_cache(self):
+        self.client.get(reverse('user_info'))
+        response = self.client.patch(reverse('user_info'), {'email': 'new@example.com'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(reverse('user_info')).data['email'], 'new@example.com')
+
+    def test_password_change_invalidates_cache(self):
+        self.client.get(reverse('user_info'))
+        self.client.post(reverse('change_password'), {'new_password': 'n3w-Passw0rd', 'confirm_password': 'n3w-Passw0rd'})
+        with self.assertNumQueries(1):
+            self.client.get(reverse('user_info'))
+
+    def test_writes_keep_changes_made_by_other_processes(self):
+        self.client.get(reverse('user_info'))
+        # zmiana z innego procesu: lokalny `user_cache` nie jest unieważniany
+        User.objects.filter(pk=self.user.pk).update(is_staff=True, is_active=False)
+        response = self.client.patch(reverse('user_info'), {'email': 'new@example.com'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.email, self.user.is_staff, self.user.is_active), ('new@example.com', True, False))
+
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.client.get(reverse('user_info'))
+        User.objects.filter(pk=self.user.pk).update(is_staff=False, is_active=False)
+        self.client.post(reverse('change_password'), {'new_password': 'n3w-Passw0rd', 'confirm_password': 'n3w-Passw0rd'})
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('n3w-Passw0rd'))
+        self.assertEqual((self.user.is_staff, self.user.is_active), (False, False))
+
+    def test_admin_deactivation_and_deletion_invalidate_cache(self):
+        self.client.get(reverse('user_info'))
+        admin = User.objects.create_superuser(username='admin', password='adminpassword')
+        admin_client = self.client_class()
+        admin_client.force_authenticate(user=admin)
+        admin_client.patch(reverse('admin-user-detail', args=[self.user.id]), {'is_active': False})
+        self.assertEqual(self.client.get(reverse('user_info')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=True)
+        self.client.get(reverse('user_info'))
+        admin_client.delete(reverse('admin-user-detail', args=[self.user.id]))
+        self.assertEqual(self.client.get(reverse('user_info')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_carries_user_claims(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        token = AccessToken(self.access)
+        self.assertEqual((token['username'], token['is_staff'], token['is_superuser']), ('testuser', False, False))
+        self.assertEqual((token['email'], token['first_name'], token['last_name']), ('t@example.com', '', ''))
+        self.assertIn('profile_version', token)
+
+    def test_refresh_reads_user_claims_from_database(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        from myapp.authentication import profile_version
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        response = self.client.post(reverse('get_token'), {'username': 'testuser', 'password': 'testpassword'})
+        self.assertTrue(AccessToken(response.data['access'])['is_staff'])
+        User.objects.filter(pk=self.user.pk).update(is_staff=False, first_name='Jan')
+        refreshed = self.client.post(reverse('refresh'), {'refresh': response.data['refresh']})
+        self.assertEqual(refreshed.status_code, status.HTTP_200_OK)
+        token = AccessToken(refreshed.data['access'])
+        self.user.refresh_from_db()
+        self.assertEqual((token['is_staff'], token['first_name']), (False, 'Jan'))
+        self.assertEqual(token['profile_version'], profile_version(self.user))
+
+    def test_user_info_served_from_fresh_claims(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('user_info'))
+        self.assertEqual(response.data, {
+            'id': self.user.id, 'username': 'testuser', 'is_staff': False, 'is_superuser': False,
+            'email': 't@example.com', 'first_name': '', 'last_name': '',
+        })
+
+    def test_stale_claims_fall_back_to_database(self):
+        from unittest import mock
+        from myapp.authentication import StatelessJWTAuthentication, user_cache
+        from myapp.views import UserInfoView
+        User.objects.filter(pk=self.user.pk).update(first_name='Jan')
+        user_cache.clear()
+        with mock.patch.object(UserInfoView, 'authentication_classes', [StatelessJWTAuthentication]):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.client.get(reverse('user_info')).data['first_name'], 'Jan')
+            # wersja z tokenu nie zgadza się z użytkownikiem w cache - nadal dane z bazy
+            self.assertEqual(self.client.get(reverse('user_info')).data['first_name'], 'Jan')
+            self.client.patch(reverse('user_info'), {'email': 'new@example.com'})
+            self.assertEqual(self.client.get(reverse('user_info')).data['email'], 'new@example.com')
+
+    def test_tokens_without_profile_claims_still_work(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(self.client.get(reverse('user_info')).data['email'], 't@example.com')
+
+    def test_stateless_mode_builds_user_from_claims(self):
+        from unittest import mock
+        from myapp.authentication import StatelessJWTAuthentication
+        from myapp.views import UserInfoView, ChangePasswordView, IncomesCategoryView
+        stateless = [StatelessJWTAuthentication]
+        with mock.patch.object(IncomesCategoryView, 'authentication_classes', stateless), \
+                mock.patch.object(UserInfoView, 'authentication_classes', stateless), \
+                mock.patch.object(ChangePasswordView, 'authentication_classes', stateless):
+            IncomesCategory.objects.create(user=self.user, category='Salary')
+            with self.assertNumQueries(2):
+                # wersja danych (ETag) + lista kategorii; bez zapytania o użytkownika
+                response = self.client.get(reverse('incomes-categories'))
+            self.assertEqual(len(response.data), 1)
+
+            self.assertEqual(self.client.get(reverse('user_info')).data['email'], 't@example.com')
+            response = self.client.post(reverse('change_password'),
+                                        {'new_password': 'n3w-Passw0rd', 'confirm_password': 'n3w-Passw0rd'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('n3w-Passw0rd'))
+        self.assertEqual(self.user.email, 't@example.com')
+
+class LoginThrottleTests(APITestCase):
+    def setUp(self):
+        caches['throttle'].clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+
+    def login(self, username='testuser', password='wrong', **extra):
+        return self.client.post(reverse('get_token'), {'username': username, 'password': password}, **extra)
+
+    def test_username_throttle_applies_across_ips(self):
+        from myapp.throttling import LoginUsernameThrottle
+        limit = LoginUsernameThrottle().num_requests
+        for n in range(limit):
+            self.assertEqual(self.login(REMOTE_ADDR=f'10.0.0.{n}').status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.login(password='testpassword', REMOTE_ADDR='10.0.1.1')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(self.login(username='other', REMOTE_ADDR='10.0.1.1').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_ip_throttle_ignores_forwarded_for(self):
+        from myapp.throttling import LoginIPThrottle
+        limit = LoginIPThrottle().num_requests
+        for n in range(limit):
+            self.login(username=f'user{n}', HTTP_X_FORWARDED_FOR=f'10.0.0.{n}')
+        self.assertEqual(self.login(username='fresh', HTTP_X_FORWARDED_FOR='10.9.9.9').status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_register_throttle(self):
+        from myapp.throttling import RegisterIPThrottle
+        limit = RegisterIPThrottle().num_requests
+        for n in range(limit):
+            self.client.post(reverse('register'), {'username': f'new{n}', 'password': 'x'})
+        response = self.client.post(reverse('register'), {'username': 'late', 'password': 'x'})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_busy_hashing_slots_shed_load(self):
+        import threading
+        from django.test import override_settings
+        from myapp.throttling import password_hash_slot
+        with override_settings(PASSWORD_HASH_CONCURRENCY=1, PASSWORD_HASH_WAIT=0.01):
+            holding, release = threading.Event(), threading.Event()
+
+            def hold():
+                with password_hash_slot():
+                    holding.set()
+                    release.wait(5)
+
+            worker = threading.Thread(target=hold)
+            worker.start()
+            holding.wait(5)
+            try:
+                busy = self.login(password='testpassword')
+            finally:
+                release.set()
+                worker.join()
+            self.assertEqual(busy.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertEqual(self.login(password='testpassword').status_code, status.HTTP_200_OK)
+
 class UserRegistrationTests(APITestCase):
     def setUp(self):
+        caches['throttle'].clear()
         self.registration_url = reverse('register')
 
     def test_user_registration(self):
@@ -582,3 +828,1386 @@ class UserRegistrationTests(APITestCase):
         self.assertEqual(User.objects.count(), 0)
 
 
+
+class MonthFilterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.category = ExpensesCategory.objects.create(user=self.user, category='Food')
+        for date in ['2023-11-30', '2023-12-01', '2023-12-31', '2024-01-01']:
+            Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('10.00'), date=date)
+
+    def test_month_date_range_is_half_open(self):
+        from myapp.filters import month_date_range
+        self.assertEqual(month_date_range(2023, 12), (datetime.date(2023, 12, 1), datetime.date(2024, 1, 1)))
+        self.assertEqual(month_date_range(2024, 2), (datetime.date(2024, 2, 1), datetime.date(2024, 3, 1)))
+
+    def test_list_includes_only_month_boundaries(self):
+        response = self.client.get(reverse('expenses-list-by-month', args=[2023, 12]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['date'] for item in response.data], ['2023-12-31', '2023-12-01'])
+
+    def test_list_with_invalid_month_is_empty(self):
+        response = self.client.get(reverse('expenses-list-by-month', args=[2023, 13]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 0)
+
+    def test_summary_uses_month_range(self):
+        response = self.client.get(reverse('categories_summary_by_month', args=[2023, 12]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_expense'], '20.00')
+
+class DashboardTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.salary = IncomesCategory.objects.create(user=self.user, category='Salary')
+        self.food = ExpensesCategory.objects.create(user=self.user, category='Food')
+        Incomes.objects.create(user=self.user, category=self.salary, amount=Decimal('1000.00'), date='2024-01-31')
+        Expenses.objects.create(user=self.user, category=self.food, amount=Decimal('20.00'), date='2024-01-01')
+        Expenses.objects.create(user=self.user, category=self.food, amount=Decimal('30.50'), date='2024-01-15')
+        Expenses.objects.create(user=self.user, category=self.food, amount=Decimal('99.00'), date='2024-02-01')
+        self.url = reverse('dashboard', args=[2024, 1])
+
+    def test_dashboard_returns_month_data(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_income'], '1000.00')
+        self.assertEqual(response.data['total_expense'], '50.50')
+        self.assertEqual(response.data['balance'], '949.50')
+        self.assertEqual([item['date'] for item in response.data['expenses']], ['2024-01-15', '2024-01-01'])
+        self.assertEqual(response.data['expenses'][0]['category_name'], 'Food')
+        self.assertEqual(len(response.data['incomes']), 1)
+        self.assertEqual([c['category'] for c in response.data['incomes_categories']], ['Salary'])
+        self.assertEqual([c['category'] for c in response.data['expenses_categories']], ['Food'])
+
+    def test_dashboard_matches_separate_endpoints(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['expenses'], self.client.get(reverse('expenses-list-by-month', args=[2024, 1])).data)
+        self.assertEqual(response.data['incomes'], self.client.get(reverse('incomes-list-by-month', args=[2024, 1])).data)
+        summary = self.client.get(reverse('categories_summary_by_month', args=[2024, 1])).data
+        for key in ('total_income', 'total_expense', 'balance'):
+            self.assertEqual(response.data[key], summary[key])
+
+    def test_dashboard_excludes_other_users(self):
+        other = User.objects.create_user(username='other', password='otherpassword')
+        ExpensesCategory.objects.create(user=other, category='Foreign')
+        response = self.client.get(self.url)
+        self.assertEqual([c['category'] for c in response.data['expenses_categories']], ['Food'])
+
+    def test_dashboard_with_invalid_month(self):
+        response = self.client.get(reverse('dashboard', args=[2024, 13]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.category = ExpensesCategory.objects.create(user=self.user, category='Food')
+        Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('10.00'), date='2024-01-05')
+        self.urls = [
+            reverse('expenses'),
+            reverse('incomes'),
+            reverse('expenses-list-by-month', args=[2024, 1]),
+            reverse('expenses-categories'),
+            reverse('incomes-categories'),
+            reverse('categories_summary_by_month', args=[2024, 1]),
+            reverse('dashboard', args=[2024, 1]),
+        ]
+
+    def assert_still_fresh(self, url, etag, fresh):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED if fresh else status.HTTP_200_OK)
+
+    def test_matching_etag_returns_304_without_main_query(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                etag = response['ETag']
+                with self.assertNumQueries(1):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(response['ETag'], etag)
+                self.assertFalse(response.content)
+
+    def test_writes_change_etag(self):
+        url = reverse('expenses-list-by-month', args=[2024, 1])
+        writes = [
+            lambda: self.client.post(reverse('expenses'), {
+                'category': self.category.id, 'amount': '5.00', 'description': '', 'date': '2024-01-06'}),
+            lambda: self.client.delete(reverse('delete-expenses', args=[Expenses.objects.first().id])),
+            lambda: self.client.post(reverse('expenses-bulk'), {'items': [{
+                'category': self.category.id, 'amount': '1.00', 'date': '2024-01-07'}]}, format='json'),
+            lambda: self.client.post(reverse('incomes-categories'), {'category': 'Salary'}),
+            lambda: self.client.delete(reverse('delete-expenses-category', args=[self.category.id])),
+        ]
+        for write in writes:
+            etag = self.client.get(url)['ETag']
+            self.assert_still_fresh(url, etag, True)
+            self.assertLess(write().status_code, 400)
+            self.assert_still_fresh(url, etag, False)
+
+    def test_other_users_writes_keep_etag(self):
+        url = reverse('expenses')
+        etag = self.client.get(url)['ETag']
+        other = User.objects.create_user(username='other', password='otherpassword')
+        category = ExpensesCategory.objects.create(user=other, category='Food')
+        Expenses.objects.create(user=other, category=category, amount=Decimal('1.00'), date='2024-01-05')
+        self.assert_still_fresh(url, etag, True)
+
+        self.client.force_authenticate(user=other)
+        self.assert_still_fresh(url, etag, False)
+
+    def test_stale_etag_returns_full_response(self):
+        response = self.client.get(reverse('expenses'), HTTP_IF_NONE_MATCH='"0.0.json"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+class RangeSummaryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        salary = IncomesCategory.objects.create(user=self.user, category='Salary')
+        food = ExpensesCategory.objects.create(user=self.user, category='Food')
+        rent = ExpensesCategory.objects.create(user=self.user, category='Rent')
+        Incomes.objects.create(user=self.user, category=salary, amount=Decimal('1000.00'), date='2024-01-31')
+        Incomes.objects.create(user=self.user, category=salary, amount=Decimal('1000.00'), date='2024-03-01')
+        Expenses.objects.create(user=self.user, category=food, amount=Decimal('20.00'), date='2024-01-01')
+        Expenses.objects.create(user=self.user, category=rent, amount=Decimal('500.00'), date='2024-01-15')
+        Expenses.objects.create(user=self.user, category=food, amount=Decimal('30.00'), date='2024-04-01')
+        self.url = reverse('summary-range')
+
+    def test_range_summary_groups_by_month_and_category(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'from': '2024-01', 'to': '2024-03'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_income'], '2000.00')
+        self.assertEqual(response.data['total_expense'], '520.00')
+        self.assertEqual(response.data['balance'], '1480.00')
+        self.assertEqual([(m['year'], m['month']) for m in response.data['months']], [(2024, 1), (2024, 2), (2024, 3)])
+        january = response.data['months'][0]
+        self.assertEqual(january['expense_by_category'], {'Rent': Decimal('500.00'), 'Food': Decimal('20.00')})
+        self.assertEqual(january['balance'], '480.00')
+        self.assertEqual(response.data['months'][1]['total_income'], '0.00')
+
+    def test_range_summary_matches_monthly_summary(self):
+        response = self.client.get(self.url, {'from': '2024-01', 'to': '2024-04'})
+        for month in response.data['months']:
+            monthly = self.client.get(reverse('categories_summary_by_month', args=[month['year'], month['month']]))
+            for key in ('total_income', 'total_expense', 'balance', 'income_by_category', 'expense_by_category'):
+                self.assertEqual(month[key], monthly.data[key])
+
+    def test_range_summary_across_years(self):
+        response = self.client.get(self.url, {'from': '2023-12', 'to': '2024-01'})
+        self.assertEqual([(m['year'], m['month']) for m in response.data['months']], [(2023, 12), (2024, 1)])
+
+    def test_range_summary_rejects_invalid_ranges(self):
+        for params in ({'from': '2024-05', 'to': '2024-01'}, {'from': '2024-13', 'to': '2024-12'},
+                       {'from': '2024-01'}, {'from': '1900-01', 'to': '2024-12'}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_range_summary_rejects_month_without_end_date(self):
+        response = self.client.get(self.url, {'from': '9999-11', 'to': '9999-12'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('to', response.data)
+        response = self.client.get(self.url, {'from': '9999-10', 'to': '9999-11'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_range_summary_with_filters(self):
+        food = ExpensesCategory.objects.get(category='Food')
+        response = self.client.get(self.url, {'from': '2024-01', 'to': '2024-04', 'kind': 'expenses',
+                                              'category': food.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_income'], '0.00')
+        self.assertEqual(response.data['total_expense'], '50.00')
+
+        response = self.client.get(self.url, {'from': '2024-01', 'to': '2024-04', 'amount_min': '25'})
+        self.assertEqual(response.data['total_income'], '2000.00')
+        self.assertEqual(response.data['total_expense'], '530.00')
+        self.assertEqual(response.data['months'][0]['expense_by_category'], {'Rent': Decimal('500.00')})
+
+        response = self.client.get(self.url, {'from': '2024-01', 'to': '2024-04', 'category': food.id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_range_summary_without_authentication(self):
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, {'from': '2024-01', 'to': '2024-12'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class SummaryCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.category = ExpensesCategory.objects.create(user=self.user, category='Food')
+        self.expense = Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('10.00'), date='2024-01-05')
+        Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('7.00'), date='2024-02-05')
+
+    def summary(self, year=2024, month=1):
+        return self.client.get(reverse('categories_summary_by_month', args=[year, month]))
+
+    def assert_cached(self, year, month, cached):
+        from myapp.summary import summary_cache_key
+        self.assertEqual(cache.get(summary_cache_key(self.user.id, year, month)) is not None, cached)
+
+    def test_second_request_is_served_from_cache(self):
+        first = self.summary()
+        self.assertEqual(first['X-Summary-Cache'], 'miss')
+        with self.assertNumQueries(1):
+            second = self.summary()
+        self.assertEqual(second['X-Summary-Cache'], 'hit')
+        self.assertEqual(first.data, second.data)
+
+    def test_write_invalidates_only_its_month(self):
+        self.summary(2024, 1)
+        self.summary(2024, 2)
+        Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('5.00'), date='2024-01-20')
+        self.assert_cached(2024, 1, False)
+        self.assert_cached(2024, 2, True)
+        self.assertEqual(self.summary().data['total_expense'], '15.00')
+
+    def test_write_during_compute_does_not_leave_stale_entry(self):
+        from unittest import mock
+        from myapp import summary as summary_module
+        compute = summary_module.month_summary
+
+        def racing_compute(*args):
+            # Zapis zatwierdzony po odczycie sum, ale przed zapisem wyniku do cache.
+            result = compute(*args)
+            Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('5.00'), date='2024-01-20')
+            return result
+
+        with mock.patch.object(summary_module, 'month_summary', racing_compute):
+            self.assertEqual(self.summary().data['total_expense'], '10.00')
+        self.assertEqual(self.summary().data['total_expense'], '15.00')
+
+    def test_write_in_another_process_is_not_served_from_cache(self):
+        from unittest import mock
+        self.summary()
+        # Inny worker ma własny cache, więc usunięcie wpisów do niego nie dociera.
+        with mock.patch('myapp.rollups.invalidate_month_summaries'):
+            Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('5.00'), date='2024-01-20')
+        response = self.summary()
+        self.assertEqual(response['X-Summary-Cache'], 'miss')
+        self.assertEqual(response.data['total_expense'], '15.00')
+
+    def test_category_rename_invalidates_its_months(self):
+        self.summary(2024, 1)
+        self.summary(2024, 2)
+        self.category.category = 'Groceries'
+        self.category.save()
+        self.assert_cached(2024, 1, False)
+        self.assert_cached(2024, 2, False)
+        self.assertEqual(self.summary().data['expense_by_category'], {'Groceries': Decimal('10.00')})
+
+    def test_moving_a_transaction_invalidates_both_months(self):
+        self.summary(2024, 1)
+        self.summary(2024, 2)
+        self.expense.date = datetime.date(2024, 2, 1)
+        self.expense.save()
+        self.assert_cached(2024, 1, False)
+        self.assert_cached(2024, 2, False)
+        self.assertEqual(self.summary(2024, 2).data['total_expense'], '17.00')
+
+    def test_delete_invalidates_month(self):
+        self.summary()
+        self.client.delete(reverse('delete-expenses', args=[self.expense.id]))
+        self.assertEqual(self.summary().data['total_expense'], '0.00')
+
+    def test_category_delete_invalidates_cascaded_months(self):
+        other = ExpensesCategory.objects.create(user=self.user, category='Rent')
+        Expenses.objects.create(user=self.user, category=other, amount=Decimal('1.00'), date='2024-03-05')
+        for month in (1, 2, 3):
+            self.summary(2024, month)
+        self.client.delete(reverse('delete-expenses-category', args=[self.category.id]))
+        self.assert_cached(2024, 1, False)
+        self.assert_cached(2024, 2, False)
+        self.assert_cached(2024, 3, True)
+        self.assertEqual(self.summary(2024, 2).data['expense_by_category'], {})
+
+    def test_bulk_create_invalidates_month(self):
+        self.summary()
+        self.client.post(reverse('expenses-bulk'), {'items': [
+            {'category': self.category.id, 'amount': '2.00', 'date': '2024-01-06'}]}, format='json')
+        self.assertEqual(self.summary().data['total_expense'], '12.00')
+
+    def test_stats_count_hits_and_misses(self):
+        self.summary()
+        self.summary()
+        self.summary()
+        admin = User.objects.create_superuser(username='admin', password='adminpassword')
+        self.client.force_authenticate(user=admin)
+        response = self.client.get(reverse('summary-cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'hits': 2, 'misses': 1, 'hit_ratio': 0.6667})
+
+    def test_stats_require_admin(self):
+        response = self.client.get(reverse('summary-cache-stats'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+class SingleFlightTests(APITestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        import threading
+        import time
+        from myapp.singleflight import SingleFlight
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 42
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do('key', compute))) for _ in range(8)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [(42, False)] + [(42, True)] * 7)
+        self.assertEqual(flight._calls, {})
+
+    def test_error_is_shared_and_not_cached(self):
+        from myapp.singleflight import SingleFlight
+        flight = SingleFlight()
+        with self.assertRaises(ZeroDivisionError):
+            flight.do('key', lambda: 1 / 0)
+        self.assertEqual(flight.do('key', lambda: 'ok'), ('ok', False))
+
+class SummaryConcurrencyTests(TransactionTestCase):
+    REQUESTS = 8
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        category = ExpensesCategory.objects.create(user=self.user, category='Food')
+        Expenses.objects.create(user=self.user, category=category, amount=Decimal('10.00'), date='2024-01-05')
+        cache.clear()
+
+    def test_simultaneous_summary_requests_run_one_aggregation(self):
+        import threading
+        import time
+        from unittest import mock
+        from django.db import connection
+        from rest_framework.test import APIClient
+        from myapp import summary
+
+        real_month_summary = summary.month_summary
+        executions = []
+
+        def slow_month_summary(*args):
+            executions.append(args)
+            time.sleep(0.3)
+            return real_month_summary(*args)
+
+        barrier = threading.Barrier(self.REQUESTS)
+        responses = []
+
+        def request():
+            client = APIClient()
+            client.force_authenticate(user=self.user)
+            barrier.wait()
+            try:
+                responses.append(client.get(reverse('categories_summary_by_month', args=[2024, 1])))
+            finally:
+                connection.close()
+
+        with mock.patch.object(summary, 'month_summary', side_effect=slow_month_summary):
+            threads = [threading.Thread(target=request) for _ in range(self.REQUESTS)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+
+        self.assertEqual(len(executions), 1)
+        self.assertEqual([response.status_code for response in responses], [status.HTTP_200_OK] * self.REQUESTS)
+        self.assertEqual({response.data['total_expense'] for response in responses}, {'10.00'})
+
+class MonthlyRollupTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.category = ExpensesCategory.objects.create(user=self.user, category='Food')
+
+    def rollup(self):
+        return MonthlyCategoryTotal.objects.get(user=self.user, kind='expense', year=2024, month=1)
+
+    def test_create_and_delete_update_rollup(self):
+        data = {'category': self.category.id, 'amount': '50.00', 'description': '', 'date': '2024-01-05'}
+        first = self.client.post(reverse('expenses'), data)
+        self.client.post(reverse('expenses'), data)
+        self.assertEqual(self.rollup().total, Decimal('100.00'))
+        self.assertEqual(self.rollup().count, 2)
+
+        self.client.delete(reverse('delete-expenses', args=[first.data['id']]))
+        self.assertEqual(self.rollup().total, Decimal('50.00'))
+        self.assertEqual(self.rollup().count, 1)
+
+    def test_last_delete_removes_rollup_row(self):
+        expense = Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('5.00'), date='2024-01-05')
+        self.client.delete(reverse('delete-expenses', args=[expense.id]))
+        self.assertFalse(MonthlyCategoryTotal.objects.exists())
+
+    def test_update_moves_amount_between_months(self):
+        expense = Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('5.00'), date='2024-01-05')
+        expense.date = datetime.date(2024, 2, 1)
+        expense.save()
+        self.assertFalse(MonthlyCategoryTotal.objects.filter(month=1).exists())
+        self.assertEqual(MonthlyCategoryTotal.objects.get(month=2).total, Decimal('5.00'))
+
+    def test_category_delete_cascades_to_rollup(self):
+        Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('5.00'), date='2024-01-05')
+        self.client.delete(reverse('delete-expenses-category', args=[self.category.id]))
+        self.assertFalse(MonthlyCategoryTotal.objects.exists())
+
+    def test_category_rename_updates_rollup_name(self):
+        Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('5.00'), date='2024-01-05')
+        self.category.category = 'Groceries'
+        self.category.save()
+        self.assertEqual(self.rollup().category_name, 'Groceries')
+        Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('1.00'), date='2024-01-06')
+        self.assertEqual(self.rollup().category_name, 'Groceries')
+        self.assertEqual(self.rollup().total, Decimal('6.00'))
+
+    def test_summary_reads_from_rollup(self):
+        Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('5.00'), date='2024-01-05')
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('categories_summary_by_month', args=[2024, 1]))
+        self.assertEqual(response.data['expense_by_category'], {'Food': Decimal('5.00')})
+        self.assertEqual(response.data['balance'], '-5.00')
+
+    def test_rebuild_rollups_detects_and_repairs_drift(self):
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        Expenses.objects.create(user=self.user, category=self.category, amount=Decimal('5.00'), date='2024-01-05')
+        MonthlyCategoryTotal.objects.update(total=Decimal('99.00'))
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_rollups', check=True, stdout=io.StringIO())
+        call_command('rebuild_rollups', stdout=io.StringIO())
+        self.assertEqual(self.rollup().total, Decimal('5.00'))
+        call_command('rebuild_rollups', check=True, stdout=io.StringIO())
+
+class LedgerPaginationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.category = IncomesCategory.objects.create(user=self.user, category='Salary')
+        Incomes.objects.bulk_create([
+            Incomes(user=self.user, category=self.category, amount=Decimal('1.00'),
+                    date=datetime.date(2024, 1, 1) + datetime.timedelta(days=i // 2))
+            for i in range(7)
+        ])
+
+    def test_pages_cover_all_rows_once_in_order(self):
+        url = reverse('incomes') + '?page_size=3'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 3)
+            seen.extend((item['date'], item['id']) for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_month_list_is_not_paginated(self):
+        response = self.client.get(reverse('incomes-list-by-month', args=[2024, 1]))
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('incomes') + '?cursor=garbage')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class LedgerFilterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.food = ExpensesCategory.objects.create(user=self.user, category='Food')
+        self.rent = ExpensesCategory.objects.create(user=self.user, category='Rent')
+        self.fuel = ExpensesCategory.objects.create(user=self.user, category='Fuel')
+        for day, category, amount in ((1, self.food, '20.00'), (2, self.rent, '500.00'), (3, self.fuel, '80.00'),
+                                      (4, self.food, '35.00'), (5, self.food, '20.00'), (6, self.rent, '510.00')):
+            Expenses.objects.create(user=self.user, category=category, amount=Decimal(amount),
+                                    date=datetime.date(2024, 1, day))
+        other = User.objects.create_user(username='other', password='otherpassword')
+        other_food = ExpensesCategory.objects.create(user=other, category='Food')
+        Expenses.objects.create(user=other, category=other_food, amount=Decimal('30.00'), date='2024-01-03')
+
+    def amounts(self, params, url=None):
+        response = self.client.get(url or reverse('expenses'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = response.data if isinstance(response.data, list) else response.data['results']
+        return [row['amount'] for row in rows]
+
+    def test_filters_combine(self):
+        self.assertEqual(self.amounts({'category': [self.food.id, self.fuel.id]}),
+                         ['20.00', '35.00', '80.00', '20.00'])
+        self.assertEqual(self.amounts({'amount_min': '30', 'amount_max': '500'}), ['35.00', '80.00', '500.00'])
+        self.assertEqual(self.amounts({'date_from': '2024-01-02', 'date_to': '2024-01-04'}),
+                         ['35.00', '80.00', '500.00'])
+        self.assertEqual(self.amounts({'category': self.food.id, 'amount_min': '25'}), ['35.00'])
+        self.assertEqual(self.amounts({'category': self.rent.id},
+                                      reverse('expenses-list-by-month', args=[2024, 1])), ['510.00', '500.00'])
+
+    def test_ordering(self):
+        self.assertEqual(self.amounts({'ordering': 'date'}), ['20.00', '500.00', '80.00', '35.00', '20.00', '510.00'])
+        self.assertEqual(self.amounts({'ordering': '-amount'}), ['510.00', '500.00', '80.00', '35.00', '20.00', '20.00'])
+        self.assertEqual(self.amounts({'ordering': 'amount', 'amount_min': '30'}), ['35.00', '80.00', '500.00', '510.00'])
+
+    def test_amount_ordering_pages_cover_all_rows_once(self):
+        url = reverse('expenses') + '?ordering=amount&page_size=2'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend((Decimal(item['amount']), item['id']) for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_invalid_filters(self):
+        for params in ({'category': 'abc'}, {'amount_min': 'x'}, {'amount_min': '10', 'amount_max': '5'},
+                       {'date_from': '2024-02-01', 'date_to': '2024-01-01'}, {'ordering': 'description'}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('incomes'), params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class QueryBudgetTests(APITestCase):
+    """
+    Każdy endpoint z `myapp/urls.py` ma zadeklarowany maksymalny budżet zapytań SQL
+    na żądanie. Budżet jest sprawdzany przy różnej liczbie wierszy, więc zapytania
+    wykonywane per wiersz (N+1) przekraczają go niezależnie od rozmiaru danych.
+    """
+    ROW_COUNTS = (1, 25)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser(username='admin', password='adminpassword')
+        self.client.force_authenticate(user=self.user)
+        self.income_category = IncomesCategory.objects.create(user=self.user, category='Salary')
+        self.expense_category = ExpensesCategory.objects.create(user=self.user, category='Food')
+
+    def populate(self, rows):
+        for day in range(rows):
+            date = datetime.date(2024, 1, 1 + day % 28)
+            Incomes.objects.create(user=self.user, category=self.income_category, amount=Decimal('10.00'), date=date)
+            Expenses.objects.create(user=self.user, category=self.expense_category, amount=Decimal('5.00'), date=date)
+
+    def csv_upload(self, content):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        return SimpleUploadedFile('import.csv', content.encode('utf-8'), content_type='text/csv')
+
+    def new_income_category(self):
+        category = IncomesCategory.objects.create(user=self.user, category=f'Temp {IncomesCategory.objects.count()}')
+        Incomes.objects.create(user=self.user, category=category, amount=Decimal('1.00'), date='2024-01-01')
+        return [category.id]
+
+    def new_expense_category(self):
+        category = ExpensesCategory.objects.create(user=self.user, category=f'Temp {ExpensesCategory.objects.count()}')
+        Expenses.objects.create(user=self.user, category=category, amount=Decimal('1.00'), date='2024-01-01')
+        return [category.id]
+
+    def new_user(self):
+        user = User.objects.create(username=f'victim{User.objects.count()}')
+        category = ExpensesCategory.objects.create(user=user, category='Food')
+        Expenses.objects.create(user=user, category=category, amount=Decimal('1.00'), date='2024-01-01')
+        return [user.id]
+
+    def budgets(self):
+        month = lambda: [2024, 1]
+        no_args = lambda: []
+        income = lambda: {'category': self.income_category.id, 'amount': '1.00', 'description': '', 'date': '2024-01-01'}
+        expense = lambda: {'category': self.expense_category.id, 'amount': '1.00', 'description': '', 'date': '2024-01-01'}
+        return {
+            'incomes': [('get', 2, no_args, None), ('get', 2, no_args, lambda: {
+                'category': self.income_category.id, 'amount_min': '5', 'ordering': '-amount'}),
+                ('post', 6, no_args, income)],
+            'expenses': [('get', 2, no_args, None), ('get', 2, no_args, lambda: {
+                'category': self.expense_category.id, 'amount_min': '5', 'ordering': '-amount'}),
+                ('post', 6, no_args, expense)],
+            'incomes-bulk': [('post', 6, no_args, lambda: {'items': [income() for _ in range(30)]})],
+            'expenses-bulk': [('post', 6, no_args, lambda: {'items': [expense() for _ in range(30)]})],
+            'transactions-import': [('post', 18, no_args, lambda: {'file': self.csv_upload(
+                'date,amount,category\n' + '2024-01-02,-5.00,Food\n2024-01-03,7.00,Bonus\n' * 20)})],
+            'ledger-export': [('get', 2, no_args, None)],
+            'transactions-search': [('get', 2, no_args, lambda: {'q': 'bench'})],
+            'incomes-list-by-month': [('get', 2, month, None)],
+            'expenses-list-by-month': [('get', 2, month, None)],
+            'delete-incomes': [('delete', 7, lambda: [Incomes.objects.create(
+                user=self.user, category=self.income_category, amount=Decimal('1.00'), date='2024-01-01').id], None)],
+            'delete-expenses': [('delete', 7, lambda: [Expenses.objects.create(
+                user=self.user, category=self.expense_category, amount=Decimal('1.00'), date='2024-01-01').id], None)],
+            'delete-incomes-category': [('delete', 10, self.new_income_category, None)],
+            'delete-expenses-category': [('delete', 10, self.new_expense_category, None)],
+            'incomes-categories': [('get', 2, no_args, None), ('post', 3, no_args, lambda: {
+                'category': f'New {IncomesCategory.objects.count()}'})],
+            'expenses-categories': [('get', 2, no_args, None), ('post', 3, no_args, lambda: {
+                'category': f'New {ExpensesCategory.objects.count()}'})],
+            'categories_summary_by_month': [('get', 2, month, None)],
+            'dashboard': [('get', 5, month, None)],
+            'summary-range': [('get', 2, no_args, lambda: {'from': '2023-11', 'to': '2024-12'}),
+                              ('get', 3, no_args, lambda: {'from': '2023-11', 'to': '2024-12', 'amount_min': '5'})],
+            'admin-user-list-create': [('get', 1, no_args, None), ('get', 1, no_args, lambda: {'stats': '1'}), ('post', 2, no_args, lambda: {
+                'username': f'user{User.objects.count()}', 'password': 'pass12345', 'email': 'x@example.com'})],
+            'admin-user-detail': [
+                ('get', 1, lambda: [self.user.id], None),
+                ('patch', 2, lambda: [self.user.id], lambda: {'first_name': 'Admin'}),
+                ('delete', 9, self.new_user, None),
+            ],
+            'summary-cache-stats': [('get', 0, no_args, None)],
+            'deletion-detail': [('get', 1, lambda: [PendingDeletion.objects.create(
+                kind=PendingDeletion.KIND_USER, object_id=0, owner_id=self.user.id).id], None)],
+            'job-detail': [('get', 1, lambda: [Job.objects.create(
+                type='rebuild_rollups', owner_id=self.user.id, run_after=datetime.datetime.now(datetime.timezone.utc)).id], None)],
+            'schema': [('get', 0, no_args, None)],
+            'swagger-ui': [('get', 0, no_args, None)],
+            'redoc': [('get', 0, no_args, None)],
+        }
+
+    def test_every_endpoint_has_a_budget(self):
+        from myapp.urls import urlpatterns
+        names = {pattern.name for pattern in urlpatterns}
+        self.assertEqual(names, set(self.budgets()))
+
+    def test_endpoints_stay_within_budget(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        populated = 0
+        for rows in self.ROW_COUNTS:
+            self.populate(rows - populated)
+            populated = rows
+            for name, calls in self.budgets().items():
+                for method, budget, make_args, make_data in calls:
+                    url = reverse(name, args=make_args())
+                    data = make_data() if make_data else None
+                    uploads = data and any(hasattr(value, 'read') for value in data.values())
+                    with self.subTest(endpoint=name, method=method, rows=rows):
+                        with CaptureQueriesContext(connection) as queries:
+                            response = getattr(self.client, method)(url, data, format='multipart' if uploads else 'json')
+                            if response.streaming:
+                                b''.join(response.streaming_content)
+                        self.assertLess(response.status_code, 400, getattr(response, 'data', None))
+                        self.assertLessEqual(
+                            len(queries), budget,
+                            '\n'.join(query['sql'] for query in queries.captured_queries)
+                        )
+
+class LedgerListSerializerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        category = IncomesCategory.objects.create(user=self.user, category='Wynagrodzenie "główne"')
+        for amount, description in [('0.10', None), ('1234567.89', ''), ('5.00', 'Zażółć gęślą jaźń'), ('99999999.99', 'x')]:
+            Incomes.objects.create(user=self.user, category=category, amount=Decimal(amount),
+                                   description=description, date='2024-01-05')
+
+    def test_values_path_is_byte_identical(self):
+        from rest_framework import serializers
+        from rest_framework.renderers import JSONRenderer
+        from myapp.serializers import IncomesSerializer, LEDGER_LIST_VALUES
+        queryset = Incomes.objects.order_by('-date', '-id')
+        expected = serializers.ListSerializer(list(queryset.select_related('category')), child=IncomesSerializer()).data
+        fast = IncomesSerializer(list(queryset.values(*LEDGER_LIST_VALUES)), many=True).data
+        self.assertEqual(JSONRenderer().render(fast), JSONRenderer().render(expected))
+
+    def test_list_endpoints_use_values_rows(self):
+        for url in (reverse('incomes'), reverse('incomes-list-by-month', args=[2024, 1])):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                items = response.data['results'] if 'results' in response.data else response.data
+                self.assertEqual(items[0]['category_name'], 'Wynagrodzenie "główne"')
+                self.assertEqual(sorted(item['amount'] for item in items), ['0.10', '1234567.89', '5.00', '99999999.99'])
+                self.assertIn(None, [item['description'] for item in items])
+
+class CategoryValidationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.category = ExpensesCategory.objects.create(user=self.user, category='Food')
+        other = User.objects.create_user(username='other', password='otherpassword')
+        self.foreign_category = ExpensesCategory.objects.create(user=other, category='Food')
+
+    def data(self, category):
+        return {'category': category, 'amount': '10.00', 'description': '', 'date': '2024-01-05'}
+
+    def test_foreign_category_is_rejected(self):
+        response = self.client.post(reverse('expenses'), self.data(self.foreign_category.id))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('category', response.data)
+        self.assertFalse(Expenses.objects.exists())
+
+    def test_own_category_is_accepted(self):
+        response = self.client.post(reverse('expenses'), self.data(self.category.id))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Expenses.objects.get().category, self.category)
+
+    def test_categories_are_loaded_once_per_request(self):
+        from rest_framework.request import Request
+        from rest_framework.test import APIRequestFactory
+        from myapp.serializers import ExpensesSerializer
+        request = Request(APIRequestFactory().post('/'))
+        request.user = self.user
+        items = [self.data(self.category.id)] * 10 + [self.data(self.foreign_category.id), self.data('x')]
+        with self.assertNumQueries(1):
+            results = [ExpensesSerializer(data=item, context={'request': request}).is_valid() for item in items]
+        self.assertEqual(results, [True] * 10 + [False, False])
+
+class BackgroundDeletionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.category = IncomesCategory.objects.create(user=self.user, category='Salary')
+        Incomes.objects.bulk_create([
+            Incomes(user=self.user, category=self.category, amount=Decimal('10.00'), date=f'2024-01-{day:02d}')
+            for day in range(1, 6)
+        ])
+        from myapp.rollups import rebuild_user_rollups
+        rebuild_user_rollups(self.user)
+
+    def purge(self, batch_size=2):
+        from django.test import override_settings
+        from myapp.jobs import run_next_job
+        with override_settings(DELETION_BATCH_SIZE=batch_size):
+            job = run_next_job()
+        return PendingDeletion.objects.get(pk=job.payload['deletion_id'])
+
+    def test_category_delete_hides_data_immediately(self):
+        response = self.client.delete(reverse('delete-incomes-category', args=[self.category.id]))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], PendingDeletion.STATUS_PENDING)
+        self.assertEqual(response.data['total'], 5)
+        self.assertEqual(response['Location'], reverse('deletion-detail', args=[response.data['id']]))
+
+        self.assertEqual(self.client.get(reverse('incomes-categories')).data, [])
+        self.assertEqual(self.client.get(reverse('incomes-list-by-month', args=[2024, 1])).data, [])
+        self.assertEqual(self.client.get(reverse('categories_summary_by_month', args=[2024, 1])).data['total_income'], '0.00')
+        self.assertEqual(Incomes.objects.count(), 5)
+
+        again = self.client.delete(reverse('delete-incomes-category', args=[self.category.id]))
+        self.assertEqual(again.status_code, status.HTTP_404_NOT_FOUND)
+        recreated = self.client.post(reverse('incomes-categories'), {'category': 'Salary'})
+        self.assertEqual(recreated.status_code, status.HTTP_201_CREATED)
+
+    def test_purge_deletes_in_batches_and_reports_progress(self):
+        response = self.client.delete(reverse('delete-incomes-category', args=[self.category.id]))
+        progress_url = response['Location']
+
+        pending = self.purge(batch_size=2)
+        self.assertEqual(pending.status, PendingDeletion.STATUS_DONE)
+        self.assertEqual(pending.deleted, 5)
+        self.assertFalse(Incomes.objects.exists())
+        self.assertFalse(IncomesCategory.objects.exists())
+        self.assertFalse(MonthlyCategoryTotal.objects.exists())
+
+        progress = self.client.get(progress_url)
+        self.assertEqual(progress.status_code, status.HTTP_200_OK)
+        self.assertEqual(progress.data['status'], PendingDeletion.STATUS_DONE)
+        self.assertEqual(progress.data['progress'], 100.0)
+
+    def test_purge_failure_is_recorded_and_retried(self):
+        from unittest import mock
+        self.client.delete(reverse('delete-incomes-category', args=[self.category.id]))
+        with mock.patch('myapp.deletion._delete', side_effect=RuntimeError('boom')):
+            pending = self.purge()
+        self.assertEqual(pending.status, PendingDeletion.STATUS_FAILED)
+        self.assertEqual(pending.error, 'boom')
+        self.assertEqual(Incomes.objects.count(), 5)
+
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertIn('boom', job.error)
+        Job.objects.update(run_after=job.created_at)
+        self.assertEqual(self.purge().status, PendingDeletion.STATUS_DONE)
+        self.assertEqual(Job.objects.get().status, Job.STATUS_SUCCEEDED)
+        self.assertFalse(Incomes.objects.exists())
+
+    def test_progress_is_private(self):
+        response = self.client.delete(reverse('delete-incomes-category', args=[self.category.id]))
+        other = User.objects.create_user(username='other', password='otherpassword')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(response['Location']).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_user_delete_deactivates_and_purges(self):
+        admin = User.objects.create_superuser(username='admin', password='adminpassword')
+        self.client.force_authenticate(user=admin)
+        response = self.client.delete(reverse('admin-user-detail', args=[self.user.id]))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+
+        repeated = self.client.delete(reverse('admin-user-detail', args=[self.user.id]))
+        self.assertEqual(repeated.data['id'], response.data['id'])
+
+        self.purge(batch_size=3)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Incomes.objects.exists())
+        self.assertFalse(IncomesCategory.objects.exists())
+        self.assertEqual(self.client.get(response['Location']).data['deleted'], 5)
+
+from myapp import jobs as job_queue
+
+
+@job_queue.job_handler('test_echo')
+def _echo_job(job):
+    return {'echo': job.payload.get('value')}
+
+
+_flaky_failures = {'remaining': 0}
+
+
+@job_queue.job_handler('test_flaky', max_attempts=3)
+def _flaky_job(job):
+    if _flaky_failures['remaining'] > 0:
+        _flaky_failures['remaining'] -= 1
+        raise RuntimeError('flaky')
+    return {'attempts': job.attempts}
+
+
+@job_queue.job_handler('test_limited', concurrency=1)
+def _limited_job(job):
+    return None
+
+
+class JobQueueTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+
+    def make_ready(self):
+        Job.objects.filter(status=Job.STATUS_QUEUED).update(run_after=datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc))
+
+    def test_worker_runs_job_and_status_api_reports_result(self):
+        job = job_queue.enqueue('test_echo', {'value': 42}, owner_id=self.user.id)
+        from django.core.management import call_command
+        call_command('run_worker', once=True, stdout=io.StringIO())
+
+        response = self.client.get(reverse('job-detail', args=[job.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], Job.STATUS_SUCCEEDED)
+        self.assertEqual(response.data['result'], {'echo': 42})
+        self.assertEqual(response.data['attempts'], 1)
+
+        other = User.objects.create_user(username='other', password='otherpassword')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(reverse('job-detail', args=[job.id])).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        _flaky_failures['remaining'] = 1
+        job = job_queue.enqueue('test_flaky')
+        before = datetime.datetime.now(datetime.timezone.utc)
+        job_queue.run_next_job()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('flaky', job.error)
+        self.assertGreaterEqual(job.run_after, before + datetime.timedelta(seconds=job_queue.retry_delay(1)))
+        self.assertIsNone(job_queue.run_next_job())
+
+        self.make_ready()
+        job_queue.run_next_job()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.result, {'attempts': 2})
+        self.assertEqual(job.error, '')
+
+    def test_job_fails_after_max_attempts(self):
+        _flaky_failures['remaining'] = 10
+        job = job_queue.enqueue('test_flaky')
+        for _ in range(3):
+            self.make_ready()
+            job_queue.run_next_job()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertIsNotNone(job.finished_at)
+        self.make_ready()
+        self.assertIsNone(job_queue.run_next_job())
+
+    def test_retry_delay_grows_exponentially(self):
+        from django.test import override_settings
+        with override_settings(JOB_RETRY_BASE_DELAY=10, JOB_RETRY_MAX_DELAY=100):
+            self.assertEqual([job_queue.retry_delay(n) for n in range(1, 6)], [10, 20, 40, 80, 100])
+
+    def test_concurrency_limit_per_type(self):
+        first = job_queue.enqueue('test_limited')
+        second = job_queue.enqueue('test_limited')
+        echo = job_queue.enqueue('test_echo')
+
+        self.assertEqual(job_queue.claim_next_job('worker-1').id, first.id)
+        self.assertEqual(job_queue.claim_next_job('worker-2').id, echo.id)
+        self.assertIsNone(job_queue.claim_next_job('worker-3'))
+
+        from django.test import override_settings
+        with override_settings(JOB_CONCURRENCY={'test_limited': 2}):
+            self.assertEqual(job_queue.claim_next_job('worker-3').id, second.id)
+
+    def test_stale_running_job_is_requeued(self):
+        job = job_queue.enqueue('test_echo')
+        claimed = job_queue.claim_next_job('crashed-worker')
+        Job.objects.filter(pk=claimed.pk).update(locked_at=datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc))
+        self.assertEqual(job_queue.requeue_stale_jobs(), 1)
+        job_queue.run_next_job('worker-2')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_rebuild_rollups_can_be_enqueued(self):
+        category = IncomesCategory.objects.create(user=self.user, category='Salary')
+        Incomes.objects.bulk_create([Incomes(user=self.user, category=category, amount=Decimal('5.00'), date='2024-03-01')])
+        from django.core.management import call_command
+        call_command('rebuild_rollups', enqueue=True, stdout=io.StringIO())
+        self.assertFalse(MonthlyCategoryTotal.objects.exists())
+        job = job_queue.run_next_job()
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(MonthlyCategoryTotal.objects.get().total, Decimal('5.00'))
+
+class AsyncReadViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        from rest_framework_simplejwt.tokens import AccessToken
+        self.user = User.objects.create_user(username='testuser', password='testpassword', email='t@example.com')
+        self.auth = f'Bearer {AccessToken.for_user(self.user)}'
+        self.client.credentials(headers={'Authorization': self.auth})
+        income_category = IncomesCategory.objects.create(user=self.user, category='Salary')
+        expense_category = ExpensesCategory.objects.create(user=self.user, category='Food')
+        Incomes.objects.create(user=self.user, category=income_category, amount=Decimal('1000.00'), date='2024-01-10')
+        Expenses.objects.create(user=self.user, category=expense_category, amount=Decimal('12.50'),
+                                description='Obiad', date='2024-01-11')
+
+    def async_view(self, name):
+        from myapp import async_views, views
+        return {
+            'incomes-list-by-month': (views.IncomesView.as_view(), async_views.incomes_by_month, True),
+            'expenses-list-by-month': (views.ExpensesView.as_view(), async_views.expenses_by_month, True),
+            'incomes-categories': (views.IncomesCategoryView.as_view(), async_views.incomes_categories, True),
+            'expenses-categories': (views.ExpensesCategoryView.as_view(), async_views.expenses_categories, True),
+            'categories_summary_by_month': (views.MonthlySummaryView.as_view(), async_views.monthly_summary, True),
+            'user_info': (views.UserInfoView.as_view(), async_views.user_info, False),
+        }[name]
+
+    async def call(self, name, method='get', data=None, headers=None, **kwargs):
+        from django.test import AsyncRequestFactory
+        from myapp.async_views import async_read_view
+        sync_view, handler, ledger_etag = self.async_view(name)
+        view = async_read_view(sync_view, handler, ledger_etag=ledger_etag)
+        if 'month' in name and not kwargs:
+            kwargs = {'year': 2024, 'month': 1}
+        request = getattr(AsyncRequestFactory(), method)('/', data, content_type='application/json', headers=headers)
+        return await view(request, **kwargs)
+
+    async def test_responses_match_sync_views(self):
+        import json
+        from asgiref.sync import sync_to_async
+        for name in ('incomes-list-by-month', 'expenses-list-by-month', 'incomes-categories',
+                     'expenses-categories', 'categories_summary_by_month', 'user_info'):
+            with self.subTest(name=name):
+                args = [2024, 1] if 'month' in name else []
+                expected = await sync_to_async(self.client.get)(reverse(name, args=args), HTTP_AUTHORIZATION=self.auth)
+                response = await self.call(name, headers={'Authorization': self.auth})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(json.loads(response.content), json.loads(expected.content))
+                self.assertEqual(response.get('ETag'), expected.get('ETag'))
+
+    async def test_month_lists_apply_filters_with_async_read_views(self):
+        import importlib
+        import json
+        from asgiref.sync import sync_to_async
+        from django.urls import clear_url_caches, resolve
+        import django_project.urls
+        import myapp.urls
+        food = await ExpensesCategory.objects.aget(category='Food')
+        fuel = await ExpensesCategory.objects.acreate(user=self.user, category='Fuel')
+        await Expenses.objects.acreate(user=self.user, category=fuel, amount=Decimal('80.00'), date='2024-01-05')
+        await Expenses.objects.acreate(user=self.user, category=food, amount=Decimal('30.00'), date='2024-01-20')
+        url = reverse('expenses-list-by-month', args=[2024, 1])
+        cases = [
+            {}, {'category': food.id}, {'amount_min': '20', 'amount_max': '50'},
+            {'date_from': '2024-01-10', 'ordering': 'date'}, {'ordering': '-amount'},
+        ]
+        expected = [await sync_to_async(self.client.get)(url, params, HTTP_AUTHORIZATION=self.auth) for params in cases]
+        invalid = {'amount_min': 'x', 'ordering': 'description'}
+        expected_invalid = await sync_to_async(self.client.get)(url, invalid, HTTP_AUTHORIZATION=self.auth)
+
+        def reload_urls():
+            # Trasy są wybierane przy imporcie URLconf na podstawie ASYNC_READ_VIEWS.
+            importlib.reload(myapp.urls)
+            importlib.reload(django_project.urls)
+            clear_url_caches()
+
+        try:
+            with self.settings(ASYNC_READ_VIEWS=True):
+                reload_urls()
+                headers = {'Authorization': self.auth}
+                self.assertIn('async_read_view', resolve(url).func.__qualname__)
+                for params, sync_response in zip(cases, expected):
+                    with self.subTest(params=params):
+                        response = await self.async_client.get(url, params, headers=headers)
+                        self.assertEqual(response.status_code, status.HTTP_200_OK)
+                        self.assertEqual(json.loads(response.content), json.loads(sync_response.content))
+                response = await self.async_client.get(url, invalid, headers=headers)
+        finally:
+            reload_urls()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(json.loads(response.content), json.loads(expected_invalid.content))
+
+    async def test_conditional_get_returns_304(self):
+        first = await self.call('incomes-categories', headers={'Authorization': self.auth})
+        second = await self.call('incomes-categories', headers={'Authorization': self.auth, 'If-None-Match': first['ETag']})
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_summary_reports_cache_and_validates_month(self):
+        first = await self.call('categories_summary_by_month', headers={'Authorization': self.auth})
+        second = await self.call('categories_summary_by_month', headers={'Authorization': self.auth})
+        self.assertEqual((first['X-Summary-Cache'], second['X-Summary-Cache']), ('miss', 'hit'))
+
+        from myapp.async_views import async_read_view, monthly_summary
+        from myapp.views import MonthlySummaryView
+        from django.test import AsyncRequestFactory
+        view = async_read_view(MonthlySummaryView.as_view(), monthly_summary, ledger_etag=True)
+        invalid = await view(AsyncRequestFactory().get('/', headers={'Authorization': self.auth}), year=2024, month=13)
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_requires_valid_token(self):
+        import json
+        missing = await self.call('user_info')
+        self.assertEqual(missing.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('Bearer', missing['WWW-Authenticate'])
+        invalid = await self.call('user_info', headers={'Authorization': 'Bearer nope'})
+        self.assertEqual(invalid.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(json.loads(invalid.content)['code'], 'token_not_valid')
+
+    async def test_other_methods_use_sync_view(self):
+        response = await self.call('incomes-categories', method='post', data={'category': 'Bonus'},
+                                   headers={'Authorization': self.auth})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(await IncomesCategory.objects.filter(category='Bonus').aexists())
+
+class DatabaseUrlTests(APITestCase):
+    def test_defaults_enable_persistent_connections(self):
+        from django_project.database import database_from_url
+        config = database_from_url('postgres://user:secret@db:5432/budget', {})
+        self.assertEqual(
+            (config['NAME'], config['USER'], config['PASSWORD'], config['HOST'], config['PORT']),
+            ('budget', 'user', 'secret', 'db', 5432),
+        )
+        self.assertEqual(config['CONN_MAX_AGE'], 60)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertFalse(config['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertEqual(config['OPTIONS'], {})
+
+    def test_url_options(self):
+        from django_project.database import database_from_url
+        config = database_from_url(
+            'postgres://u:p@db/budget?conn_max_age=none&conn_health_checks=false'
+            '&statement_timeout=5000&sslmode=require', {}
+        )
+        self.assertIsNone(config['CONN_MAX_AGE'])
+        self.assertFalse(config['CONN_HEALTH_CHECKS'])
+        self.assertEqual(config['OPTIONS'], {'sslmode': 'require', 'options': '-c statement_timeout=5000'})
+
+    def test_environment_overrides_url_and_pgbouncer_mode(self):
+        from django_project.database import database_from_url
+        config = database_from_url(
+            'postgres://u:p@pgbouncer:6432/budget?conn_max_age=600&statement_timeout=5000',
+            {'DB_CONN_MAX_AGE': '0', 'DB_PGBOUNCER': 'true'},
+        )
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertTrue(config['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertNotIn('options', config['OPTIONS'])
+
+class LedgerBulkCreateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.category = ExpensesCategory.objects.create(user=self.user, category='Food')
+        other = User.objects.create_user(username='other', password='otherpassword')
+        self.foreign_category = ExpensesCategory.objects.create(user=other, category='Food')
+        self.url = reverse('expenses-bulk')
+
+    def item(self, **overrides):
+        item = {'category': self.category.id, 'amount': '10.00', 'description': 'Bulk', 'date': '2024-01-05'}
+        item.update(overrides)
+        return item
+
+    def test_bulk_create_all_valid(self):
+        response = self.client.post(self.url, {'items': [self.item() for _ in range(3)]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(sorted(response.data['ids']), sorted(Expenses.objects.values_list('id', flat=True)))
+        self.assertEqual(MonthlyCategoryTotal.objects.get(user=self.user).total, Decimal('30.00'))
+
+    def test_bulk_create_reports_per_item_errors(self):
+        items = [self.item(), self.item(amount='-1'), self.item(category=self.foreign_category.id), self.item()]
+        response = self.client.post(self.url, {'items': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertIn('amount', response.data['errors'][0]['errors'])
+        self.assertIn('category', response.data['errors'][1]['errors'])
+        self.assertEqual(Expenses.objects.count(), 2)
+
+    def test_bulk_create_atomic_mode(self):
+        items = [self.item(), self.item(date='not-a-date')]
+        response = self.client.post(self.url, {'items': items, 'atomic': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(Expenses.objects.count(), 0)
+
+    def test_bulk_create_rejects_empty_payload(self):
+        response = self.client.post(self.url, {'items': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class TransactionImportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('transactions-import')
+
+    def upload(self, content, **params):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        data = {'file': SimpleUploadedFile('import.csv', content.encode('utf-8'), content_type='text/csv')}
+        data.update(params)
+        return self.client.post(self.url, data, format='multipart')
+
+    def test_import_splits_by_sign_and_creates_categories(self):
+        ExpensesCategory.objects.create(user=self.user, category='Food')
+        response = self.upload(
+            'date,amount,category,description\n'
+            '2024-01-02,-12.50,Food,Lunch\n'
+            '2024-01-03,3000.00,Salary,January\n'
+            '2024-01-04,-40.00,Fuel,\n'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['incomes'], 1)
+        self.assertEqual(response.data['expenses'], 2)
+        self.assertEqual(ExpensesCategory.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(Expenses.objects.get(description='Lunch').amount, Decimal('12.50'))
+        self.assertEqual(MonthlyCategoryTotal.objects.get(kind='income').total, Decimal('3000.00'))
+
+    def test_import_over_limits_is_rejected_before_writing(self):
+        content = 'date,amount,category\n' + '2024-01-02,-5.00,Food\n' * 4
+        with self.settings(LEDGER_IMPORT_MAX_ROWS=3):
+            response = self.upload(content)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Expenses.objects.exists())
+        with self.settings(LEDGER_IMPORT_MAX_ROWS=4):
+            self.assertEqual(self.upload(content).status_code, status.HTTP_201_CREATED)
+        with self.settings(LEDGER_IMPORT_MAX_BYTES=len(content) - 1):
+            response = self.upload(content)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('file', response.data)
+
+    def test_categories_created_elsewhere_are_not_counted(self):
+        from myapp.importer import TransactionImporter
+        importer = TransactionImporter(self.user)
+        # Kategoria utworzona po starcie importu (np. przez równoległy import).
+        ExpensesCategory.objects.create(user=self.user, category='Food')
+        result = importer.run(io.StringIO('date,amount,category\n2024-01-02,-5.00,Food\n2024-01-03,-7.00,Fuel\n'))
+        self.assertEqual(result.categories_created, 1)
+        self.assertEqual(ExpensesCategory.objects.filter(user=self.user, category='Food').count(), 1)
+
+    def test_expense_category_names_are_unique_per_user(self):
+        from django.db import IntegrityError, transaction
+        ExpensesCategory.objects.create(user=self.user, category='Food')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ExpensesCategory.objects.create(user=self.user, category='Food')
+        ExpensesCategory.objects.filter(user=self.user).update(is_deleted=True)
+        ExpensesCategory.objects.create(user=self.user, category='Food')
+
+    def test_import_with_column_mapping_and_type_column(self):
+        response = self.upload(
+            'Data;Kwota;Rodzaj\n'
+            '02.01.2024;1 234,56;wydatek\n',
+            delimiter=';', date_format='%d.%m.%Y', decimal_comma=True,
+            date_column='Data', amount_column='Kwota', type_column='Rodzaj',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        expense = Expenses.objects.get()
+        self.assertEqual(expense.amount, Decimal('1234.56'))
+        self.assertEqual(expense.date, datetime.date(2024, 1, 2))
+        self.assertEqual(expense.category.category, 'Import')
+
+    def test_import_reports_invalid_rows(self):
+        response = self.upload('date,amount\n2024-01-02,abc\nyesterday,5\n2024-01-03,5\n')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['skipped'], 2)
+        self.assertEqual([error['line'] for error in response.data['errors']], [2, 3])
+
+    def test_import_without_required_column(self):
+        response = self.upload('when,amount\n2024-01-02,5\n')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_transactions_command(self):
+        import tempfile
+        from django.core.management import call_command
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write('date,amount,type\n2024-01-02,5.00,income\n2024-01-03,6.00,expense\n')
+        self.addCleanup(os.remove, handle.name)
+        out = io.StringIO()
+        call_command('import_transactions', handle.name, user='testuser', stdout=out)
+        self.assertEqual(Incomes.objects.count(), 1)
+        self.assertEqual(Expenses.objects.count(), 1)
+        self.assertIn('wierszy/s', out.getvalue())
+
+class LedgerExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        income_category = IncomesCategory.objects.create(user=self.user, category='Salary')
+        expense_category = ExpensesCategory.objects.create(user=self.user, category='Food')
+        Incomes.objects.create(user=self.user, category=income_category, amount=Decimal('1000.00'),
+                               description='Pensja', date='2024-01-01')
+        Expenses.objects.create(user=self.user, category=expense_category, amount=Decimal('12.50'),
+                                description='Obiad, "duży"', date='2024-02-01')
+        self.url = reverse('ledger-export')
+
+    def content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_export_csv(self):
+        import csv
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(io.StringIO(self.content(response).decode('utf-8'))))
+        self.assertEqual(rows[0], ['type', 'id', 'date', 'category', 'amount', 'description'])
+        self.assertEqual([row[0] for row in rows[1:]], ['income', 'expense'])
+        self.assertEqual(rows[2][4:], ['12.50', 'Obiad, "duży"'])
+
+    def test_export_json_with_filters(self):
+        import json
+        response = self.client.get(self.url, {'output': 'json', 'kind': 'expenses', 'date_from': '2024-02-01'})
+        data = json.loads(self.content(response))
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]['amount'], '12.50')
+        self.assertEqual(data[0]['category'], 'Food')
+
+    def test_export_gzip(self):
+        import gzip
+        response = self.client.get(self.url, {'compress': 'gzip'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.csv.gz', response['Content-Disposition'])
+        self.assertTrue(gzip.decompress(self.content(response)).startswith(b'type,id,date'))
+
+    def test_export_is_scoped_to_user(self):
+        other = User.objects.create_user(username='other', password='otherpassword')
+        self.client.force_authenticate(user=other)
+        response = self.client.get(self.url, {'output': 'json'})
+        self.assertEqual(self.content(response), b'[]')
+
+    def test_export_with_amount_and_category_filters(self):
+        import json
+        food = ExpensesCategory.objects.get(user=self.user, category='Food')
+        response = self.client.get(self.url, {'output': 'json', 'amount_max': '100'})
+        self.assertEqual([row['type'] for row in json.loads(self.content(response))], ['expense'])
+        response = self.client.get(self.url, {'output': 'json', 'kind': 'expenses', 'category': food.id})
+        self.assertEqual([row['category'] for row in json.loads(self.content(response))], ['Food'])
+        response = self.client.get(self.url, {'output': 'json', 'kind': 'expenses', 'category': food.id + 1})
+        self.assertEqual(json.loads(self.content(response)), [])
+        response = self.client.get(self.url, {'category': food.id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_with_invalid_range(self):
+        response = self.client.get(self.url, {'date_from': '2024-02-01', 'date_to': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class TransactionSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.force_authenticate(user=self.user)
+        self.income_category = IncomesCategory.objects.create(user=self.user, category='Salary')
+        self.expense_category = ExpensesCategory.objects.create(user=self.user, category='Food')
+        self.url = reverse('transactions-search')
+
+    def income(self, description, date='2024-01-01'):
+        return Incomes.objects.create(user=self.user, category=self.income_category, amount=Decimal('10.00'),
+                                      description=description, date=date)
+
+    def expense(self, description, date='2024-01-01'):
+        return Expenses.objects.create(user=self.user, category=self.expense_category, amount=Decimal('5.00'),
+                                       description=description, date=date)
+
+    def test_search_both_tables_by_word_prefix(self):
+        self.expense('Zakupy w Biedronce', '2024-02-01')
+        self.income('Zwrot za zakupy', '2024-03-01')
+        self.expense('Kino')
+        response = self.client.get(self.url, {'q': 'zakup'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({(r['kind'], r['description']) for r in response.data['results']},
+                         {('expense', 'Zakupy w Biedronce'), ('income', 'Zwrot za zakupy')})
+        self.assertEqual(response.data['results'][0]['category_name'],
+                         {'expense': 'Food', 'income': 'Salary'}[response.data['results'][0]['kind']])
+        self.assertEqual([r['description'] for r in self.client.get(self.url, {'q': 'zakupy biedr'}).data['results']],
+                         ['Zakupy w Biedronce'])
+
+    def test_better_matches_rank_first(self):
+        self.expense('paliwo')
+        self.expense('paliwo paliwo paliwo')
+        results = self.client.get(self.url, {'q': 'paliwo'}).data['results']
+        self.assertEqual(results[0]['description'], 'paliwo paliwo paliwo')
+        self.assertGreater(results[0]['rank'], results[1]['rank'])
+
+    def test_filters_and_isolation(self):
+        self.expense('prąd', '2024-01-10')
+        self.expense('prąd', '2024-03-10')
+        self.income('prąd', '2024-02-10')
+        other = User.objects.create_user(username='other', password='x')
+        Expenses.objects.create(user=other, category=ExpensesCategory.objects.create(user=other, category='Food'),
+                                amount=Decimal('1.00'), description='prąd', date='2024-02-01')
+        response = self.client.get(self.url, {'q': 'prąd', 'date_from': '2024-02-01', 'date_to': '2024-03-31'})
+        self.assertEqual([(r['kind'], r['date']) for r in response.data['results']],
+                         [('expense', '2024-03-10'), ('income', '2024-02-10')])
+        response = self.client.get(self.url, {'q': 'prąd', 'kind': 'incomes'})
+        self.assertEqual([r['kind'] for r in response.data['results']], ['income'])
+
+    def test_pages_cover_all_results_once(self):
+        for day in range(1, 8):
+            self.expense('czynsz', f'2024-01-{day:02}')
+            self.income('czynsz', f'2024-01-{day:02}')
+        url, seen = self.url + '?q=czynsz&page_size=3', []
+        while url:
+            response = self.client.get(url)
+            self.assertLessEqual(len(response.data['results']), 3)
+            seen.extend((r['kind'], r['id']) for r in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 14)
+        self.assertEqual(len(set(seen)), 14)
+
+    def test_index_follows_updates_and_deletes(self):
+        expense = self.expense('stary opis')
+        expense.description = 'nowy opis'
+        expense.save()
+        self.assertEqual(self.client.get(self.url, {'q': 'stary'}).data['results'], [])
+        self.assertEqual(len(self.client.get(self.url, {'q': 'nowy'}).data['results']), 1)
+        expense.delete()
+        self.assertEqual(self.client.get(self.url, {'q': 'nowy'}).data['results'], [])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {'q': 'x', 'date_from': '2024-02-01', 'date_to': '2024-01-01'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'q': 'x', 'cursor': 'garbage'}).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(self.url, {'q': '"*:'}).data['results'], [])
+
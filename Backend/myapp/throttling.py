@@ -0,0 +1,93 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class _LocalRateThrottle(SimpleRateThrottle):
+    # Liczniki w lokalnej pamięci procesu (alias cache `throttle`), niezależnie od
+    # cache podsumowań.
+    cache = caches['throttle']
+
+
+class LoginIPThrottle(_LocalRateThrottle):
+    """
+    **Limit prób logowania z jednego adresu IP (`login_ip`).**
+    """
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginUsernameThrottle(_LocalRateThrottle):
+    """
+    **Limit prób logowania na jedną nazwę użytkownika, niezależnie od adresu IP (`login_username`).**
+    """
+    scope = 'login_username'
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not username or not isinstance(username, str):
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': username.strip().lower()}
+
+
+class RegisterIPThrottle(_LocalRateThrottle):
+    """
+    **Limit rejestracji nowych kont z jednego adresu IP (`register_ip`).**
+    """
+    scope = 'register_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+_hash_slots = None
+_hash_slots_lock = threading.Lock()
+
+
+def _slots():
+    global _hash_slots
+    with _hash_slots_lock:
+        if _hash_slots is None or _hash_slots[0] != settings.PASSWORD_HASH_CONCURRENCY:
+            _hash_slots = (settings.PASSWORD_HASH_CONCURRENCY,
+                           threading.BoundedSemaphore(max(settings.PASSWORD_HASH_CONCURRENCY, 1)))
+        return _hash_slots[1]
+
+
+@contextmanager
+def password_hash_slot():
+    """
+    **Ogranicza liczbę równoczesnych operacji haszowania hasła w procesie (`PASSWORD_HASH_CONCURRENCY`).**
+
+    Gdy wszystkie miejsca są zajęte dłużej niż `PASSWORD_HASH_WAIT` sekund, żądanie
+    kończy się odpowiedzią 429 zamiast czekać na procesor. `PASSWORD_HASH_CONCURRENCY = 0`
+    wyłącza limit.
+    """
+    if settings.PASSWORD_HASH_CONCURRENCY <= 0:
+        yield
+        return
+    slots = _slots()
+    if not slots.acquire(timeout=settings.PASSWORD_HASH_WAIT):
+        raise Throttled(wait=1, detail="Serwer jest przeciążony. Spróbuj ponownie za chwilę.")
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+class PasswordHashLimitMixin:
+    """
+    **Mixin dla widoków haszujących hasło w `POST` (logowanie, rejestracja).**
+
+    Limity liczby żądań (`throttle_classes`) są sprawdzane wcześniej, więc odrzucone
+    żądania nie zajmują miejsca w `password_hash_slot`.
+    """
+
+    def post(self, request, *args, **kwargs):
+        with password_hash_slot():
+            return super().post(request, *args, **kwargs)
@@ -1,28 +1,50 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 from myapp.views import AdminUserListView, AdminUserDetailView
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+
+
+def read_view(sync_view, handler, ledger_etag=True):
+    # Przy ASYNC_READ_VIEWS żądania GET obsługują widoki asynchroniczne (serwer ASGI).
+    if settings.ASYNC_READ_VIEWS:
+        return async_views.async_read_view(sync_view, handler, ledger_etag=ledger_etag)
+    return sync_view
+
+
 urlpatterns = [
     path("incomes/", views.IncomesView.as_view(), name="incomes"),
     path("expenses/", views.ExpensesView.as_view(), name="expenses"),
 
-    path("incomes/<int:year>/<int:month>/", views.IncomesView.as_view(), name="incomes-list-by-month"),
-    path("expenses/<int:year>/<int:month>/", views.ExpensesView.as_view(), name="expenses-list-by-month"),
+    path("incomes/<int:year>/<int:month>/", read_view(views.IncomesView.as_view(), async_views.incomes_by_month), name="incomes-list-by-month"),
+    path("expenses/<int:year>/<int:month>/", read_view(views.ExpensesView.as_view(), async_views.expenses_by_month), name="expenses-list-by-month"),
+
+    path("incomes/bulk/", views.IncomesBulkView.as_view(), name="incomes-bulk"),
+    path("expenses/bulk/", views.ExpensesBulkView.as_view(), name="expenses-bulk"),
 
     path("incomes/delete/<int:pk>/", views.IncomesDelete.as_view(), name="delete-incomes"),
     path("incomes/categories/delete/<int:pk>/", views.IncomesCategoryDelete.as_view(), name="delete-incomes-category"),
     path("expenses/delete/<int:pk>/", views.ExpensesDelete.as_view(), name="delete-expenses"),
     path("expenses/categories/delete/<int:pk>/", views.ExpensesCategoryDelete.as_view(), name="delete-expenses-category"),
     
-    path("incomes/categories/", views.IncomesCategoryView.as_view(), name="incomes-categories"),
-    path("expenses/categories/", views.ExpensesCategoryView.as_view(), name="expenses-categories"),
+    path("incomes/categories/", read_view(views.IncomesCategoryView.as_view(), async_views.incomes_categories), name="incomes-categories"),
+    path("expenses/categories/", read_view(views.ExpensesCategoryView.as_view(), async_views.expenses_categories), name="expenses-categories"),
     
-    path("categories/summary/<int:year>/<int:month>/", views.MonthlySummaryView.as_view(), name="categories_summary_by_month"),
+    path("import/", views.TransactionImportView.as_view(), name="transactions-import"),
+    path("export/", views.LedgerExportView.as_view(), name="ledger-export"),
+    path("search/", views.TransactionSearchView.as_view(), name="transactions-search"),
+
+    path("categories/summary/<int:year>/<int:month>/", read_view(views.MonthlySummaryView.as_view(), async_views.monthly_summary), name="categories_summary_by_month"),
+    path("summary/", views.RangeSummaryView.as_view(), name="summary-range"),
+    path("dashboard/<int:year>/<int:month>/", views.DashboardView.as_view(), name="dashboard"),
+    path("deletions/<int:pk>/", views.DeletionStatusView.as_view(), name="deletion-detail"),
+    path("jobs/<int:pk>/", views.JobStatusView.as_view(), name="job-detail"),
 
 
     path('admin/users/', AdminUserListView.as_view(), name='admin-user-list-create'),
     path('admin/users/<int:pk>/', AdminUserDetailView.as_view(), name='admin-user-detail'),
+    path('admin/cache/summary/', views.SummaryCacheStatsView.as_view(), name='summary-cache-stats'),
 
     path('docs/', SpectacularAPIView.as_view(), name='schema'),
     path('docs/swagger-ui/', SpectacularSwaggerView.as_view(), name='swagger-ui'),
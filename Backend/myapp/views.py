@@ -4,16 +4,44 @@ from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
-from django.db.models import Sum
-from django.db.models.functions import Coalesce 
+from rest_framework.parsers import MultiPartParser
+from rest_framework_simplejwt.views import TokenObtainPairView
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from decimal import Decimal
+import csv
 import datetime
+import io
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
 from .serializers import UserSerializer, IncomesCategorySerializer, ExpensesCategorySerializer, \
-    IncomesSerializer, ExpensesSerializer, UserProfileSerializer, ChangePasswordSerializer, UserAdminSerializer, ValidationErrorSerializer, ErrorSerializer
+    IncomesSerializer, ExpensesSerializer, UserProfileSerializer, ChangePasswordSerializer, UserAdminSerializer, UserAdminStatsSerializer, ValidationErrorSerializer, ErrorSerializer, \
+    LedgerBulkCreateSerializer, LedgerBulkResultSerializer, TransactionImportSerializer, TransactionImportResultSerializer, \
+    LedgerExportSerializer, SummaryRangeSerializer, DashboardSerializer, LEDGER_LIST_VALUES, PendingDeletionSerializer, \
+    JobSerializer, TransactionSearchSerializer, TransactionSearchResultSerializer, \
+    TransactionSearchPageSerializer, LedgerListFilterSerializer
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
-from .models import Incomes, Expenses, IncomesCategory, ExpensesCategory
+from .models import Incomes, Expenses, IncomesCategory, ExpensesCategory, PendingDeletion, Job, MonthlyCategoryTotal
+from .filters import filter_by_month, month_date_range, search_users, annotate_user_stats, filter_ledger, \
+    LEDGER_ORDERINGS
+from .pagination import LedgerCursorPagination, AdminUserCursorPagination, TransactionSearchPagination
+from .search import search_transactions
+from .ledger import bulk_create_transactions
+from .importer import TransactionImporter
+from .export import ledger_rows, stream_csv, stream_json, gzip_stream
+from .summary import range_summary, cached_month_summary, summary_cache_stats
+from .conditional import LedgerETagMixin
+from .singleflight import single_flight
+from .deletion import schedule_category_deletion, schedule_user_deletion
+from .authentication import database_user, token_profile
+from .throttling import LoginIPThrottle, LoginUsernameThrottle, RegisterIPThrottle, PasswordHashLimitMixin
+
+def deletion_accepted_response(pending):
+    response = Response(PendingDeletionSerializer(pending).data, status=status.HTTP_202_ACCEPTED)
+    response['Location'] = reverse('deletion-detail', args=[pending.pk])
+    return response
 
 class UserInfoView(APIView):
     """
@@ -26,14 +54,20 @@ class UserInfoView(APIView):
 
     @extend_schema(
         summary="Pobierz informacje o profilu zalogowanego użytkownika",
-        description="Zwraca szczegółowe dane profilowe aktualnie zalogowanego użytkownika.",
+        description="Zwraca szczegółowe dane profilowe aktualnie zalogowanego użytkownika. "
+                    "Dane są brane z claimów tokenu, jeśli ich `profile_version` jest aktualna.",
         responses={
             200: UserProfileSerializer,
             401: {'description': 'Brak autoryzacji: użytkownik nie jest zalogowany.'},
         }
     )
     def get(self, request):
+        profile = token_profile(request.user, request.auth)
+        if profile is not None:
+            return Response(profile)
         user = request.user
+        if getattr(user, 'from_token', False):
+            user = database_user(user)
         return Response({
             "id": user.id,
             "username": user.username,
@@ -56,7 +90,7 @@ class UserInfoView(APIView):
         }
     )
     def patch(self, request):
-        user = request.user
+        user = database_user(request.user)
         serializer = UserProfileSerializer(user, data=request.data, partial=True)
         if serializer.is_valid(raise_exception=True): 
             serializer.save()
@@ -81,20 +115,33 @@ class ChangePasswordView(APIView):
         }
     )
     def post(self, request):
+        request.user = database_user(request.user)
         serializer = ChangePasswordSerializer(data=request.data, context={'request': request})
         if serializer.is_valid(raise_exception=True): 
             serializer.save()
             return Response({"message": "Hasło zostało pomyślnie zmienione."}, status=status.HTTP_200_OK)
 
-class CreateUserView(generics.CreateAPIView):
+class TokenObtainView(PasswordHashLimitMixin, TokenObtainPairView):
+    """
+    **Logowanie (pobranie pary tokenów JWT).**
+
+    Liczba prób jest ograniczona dla adresu IP i dla nazwy użytkownika, a liczba
+    równoczesnych weryfikacji hasła w procesie - przez `PASSWORD_HASH_CONCURRENCY`.
+    Po przekroczeniu limitów zwracany jest kod 429.
+    """
+    throttle_classes = [LoginIPThrottle, LoginUsernameThrottle]
+
+class CreateUserView(PasswordHashLimitMixin, generics.CreateAPIView):
     """
     **Rejestracja nowego użytkownika.**
 
     Ten endpoint pozwala na stworzenie nowego konta użytkownika w systemie.
+    Liczba rejestracji z jednego adresu IP jest ograniczona (kod 429).
     """
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [RegisterIPThrottle]
 
     @extend_schema(
         summary="Zarejestruj nowego użytkownika",
@@ -102,6 +149,7 @@ class CreateUserView(generics.CreateAPIView):
         responses={
             201: UserSerializer,
             400: ValidationErrorSerializer,
+            429: {'description': 'Zbyt wiele prób rejestracji lub serwer przeciążony.'},
         }
     )
     def post(self, request, *args, **kwargs):
@@ -112,20 +160,46 @@ class AdminUserListView(generics.ListCreateAPIView):
     """
     **Zarządzanie użytkownikami (tylko dla administratorów).**
 
-    Ten endpoint pozwala administratorom na pobranie listy wszystkich użytkowników
-    w systemie oraz na tworzenie nowych kont użytkowników.
+    Ten endpoint pozwala administratorom na pobranie stronicowanej listy użytkowników
+    w systemie (z wyszukiwaniem i opcjonalnymi statystykami) oraz na tworzenie nowych kont użytkowników.
     """
     queryset = User.objects.all().order_by('username')
     permission_classes = [IsAuthenticated, IsAdminUser] 
+    pagination_class = AdminUserCursorPagination
+
+    def include_stats(self):
+        return self.request.query_params.get('stats') in ('1', 'true')
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return UserSerializer 
+        if self.include_stats():
+            return UserAdminStatsSerializer
         return UserAdminSerializer 
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != 'GET':
+            return queryset
+        queryset = search_users(queryset, self.request.query_params.get('search'))
+        if self.include_stats():
+            queryset = annotate_user_stats(queryset)
+        return queryset
+
     @extend_schema(
-        summary="Pobierz listę wszystkich użytkowników (admin)",
-        description="Zwraca listę wszystkich użytkowników w systemie, dostępną tylko dla administratorów.",
+        summary="Pobierz listę użytkowników (admin)",
+        description="Zwraca listę użytkowników w systemie, dostępną tylko dla administratorów. "
+                    "Wyniki są sortowane po nazwie użytkownika i stronicowane kursorem "
+                    "(parametry `cursor` i `page_size`). Z `stats=1` każdy użytkownik ma dodatkowo pola "
+                    "`incomes_count`, `expenses_count`, `total_incomes`, `total_expenses` i `last_activity`.",
+        parameters=[
+            OpenApiParameter(name='search', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY,
+                             description='Początek nazwy użytkownika lub adresu e-mail (bez rozróżniania wielkości liter).',
+                             required=False),
+            OpenApiParameter(name='stats', type=OpenApiTypes.BOOL, location=OpenApiParameter.QUERY,
+                             description='Dołącz liczby i sumy transakcji oraz datę ostatniej aktywności.',
+                             required=False),
+        ],
         responses={
             200: UserAdminSerializer(many=True),
             401: {'description': 'Brak autoryzacji.'},
@@ -149,6 +223,87 @@ class AdminUserListView(generics.ListCreateAPIView):
     def post(self, request, *args, **kwargs):
         return super().post(request, *args, **kwargs)
 
+class DeletionStatusView(generics.RetrieveAPIView):
+    """
+    **Postęp usuwania w tle.**
+
+    Ten endpoint zwraca stan zlecenia usunięcia kategorii lub użytkownika.
+    Użytkownik widzi tylko swoje zlecenia, administrator - wszystkie.
+    """
+    serializer_class = PendingDeletionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return PendingDeletion.objects.all()
+        return PendingDeletion.objects.filter(owner_id=self.request.user.id)
+
+    @extend_schema(
+        summary="Pobierz postęp usuwania w tle",
+        description="Zwraca stan zlecenia usunięcia (oczekuje, w trakcie, zakończone, błąd) "
+                    "oraz liczbę usuniętych wpisów.",
+        responses={
+            200: PendingDeletionSerializer,
+            401: {'description': 'Brak autoryzacji.'},
+            404: {'description': 'Zlecenie nie znalezione lub nie należy do użytkownika.'},
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+class JobStatusView(generics.RetrieveAPIView):
+    """
+    **Stan zadania w tle.**
+
+    Ten endpoint zwraca stan zadania wykonywanego przez `run_worker`, liczbę prób
+    i wynik lub opis ostatniego błędu. Użytkownik widzi tylko swoje zadania, administrator - wszystkie.
+    """
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return Job.objects.all()
+        return Job.objects.filter(owner_id=self.request.user.id)
+
+    @extend_schema(
+        summary="Pobierz stan zadania w tle",
+        description="Zwraca stan zadania (w kolejce, w trakcie, zakończone, błąd), liczbę prób "
+                    "oraz wynik lub opis ostatniego błędu.",
+        responses={
+            200: JobSerializer,
+            401: {'description': 'Brak autoryzacji.'},
+            404: {'description': 'Zadanie nie znalezione lub nie należy do użytkownika.'},
+        }
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+class SummaryCacheStatsView(APIView):
+    """
+    **Statystyki cache podsumowań miesięcznych (tylko dla administratorów).**
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @extend_schema(
+        summary="Pobierz liczniki trafień i chybień cache podsumowań (admin)",
+        description="Zwraca liczbę trafień i chybień cache podsumowań miesięcznych oraz odsetek trafień.",
+        responses={
+            200: {
+                'type': 'object',
+                'properties': {
+                    'hits': {'type': 'integer', 'description': 'Liczba odpowiedzi obsłużonych z cache.'},
+                    'misses': {'type': 'integer', 'description': 'Liczba odpowiedzi obliczonych od nowa.'},
+                    'hit_ratio': {'type': 'number', 'description': 'Odsetek trafień (0-1).'},
+                },
+            },
+            401: {'description': 'Brak autoryzacji.'},
+            403: {'description': 'Brak uprawnień administratora.'},
+        }
+    )
+    def get(self, request):
+        return Response(summary_cache_stats(), status=status.HTTP_200_OK)
+
 class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
     """
     **Szczegóły użytkownika (tylko dla administratorów).**
@@ -206,18 +361,20 @@ class AdminUserDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     @extend_schema(
         summary="Usuń użytkownika po ID (admin)",
-        description="Usuwa konto użytkownika. Dostępne tylko dla administratorów.",
+        description="Dezaktywuje konto użytkownika i zleca usunięcie jego danych w tle. "
+                    "Postęp można sprawdzić pod adresem z nagłówka `Location`. Dostępne tylko dla administratorów.",
         responses={
-            204: {'description': 'Użytkownik został pomyślnie usunięty.'},
+            202: PendingDeletionSerializer,
             401: {'description': 'Brak autoryzacji.'},
             403: {'description': 'Brak uprawnień administratora.'},
             404: {'description': 'Użytkownik o podanym ID nie znaleziony.'},
         }
     )
     def delete(self, request, *args, **kwargs):
-        return super().delete(request, *args, **kwargs)
+        pending = schedule_user_deletion(self.get_object(), requested_by=request.user)
+        return deletion_accepted_response(pending)
 
-class IncomesCategoryView(generics.ListCreateAPIView):
+class IncomesCategoryView(LedgerETagMixin, generics.ListCreateAPIView):
     """
     **Zarządzanie kategoriami przychodów.**
 
@@ -229,7 +386,7 @@ class IncomesCategoryView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return IncomesCategory.objects.filter(user=user).order_by('category')
+        return IncomesCategory.objects.filter(user=user, is_deleted=False).order_by('category')
     
     @extend_schema(
         summary="Pobierz listę kategorii przychodów użytkownika",
@@ -240,6 +397,9 @@ class IncomesCategoryView(generics.ListCreateAPIView):
         }
     )
     def get(self, request, *args, **kwargs):
+        not_modified = self.ledger_not_modified(request)
+        if not_modified is not None:
+            return not_modified
         return super().get(request, *args, **kwargs)
 
     @extend_schema(
@@ -265,33 +425,37 @@ class IncomesCategoryDelete(generics.DestroyAPIView):
     **Usuwanie kategorii przychodów.**
 
     Ten endpoint pozwala na usunięcie konkretnej kategorii przychodów
-    należącej do zalogowanego użytkownika po jej ID.
+    należącej do zalogowanego użytkownika po jej ID. Kategoria znika od razu,
+    a jej przychody są usuwane w tle (odpowiedź 202).
     """
     serializer_class = IncomesCategorySerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
-        return IncomesCategory.objects.filter(user=user)
+        return IncomesCategory.objects.filter(user=user, is_deleted=False)
     
     @extend_schema(
         summary="Usuń kategorię przychodów",
-        description="Usuwa kategorię przychodów. Kategoria musi należeć do zalogowanego użytkownika.",
+        description="Oznacza kategorię przychodów jako usuniętą i zleca usunięcie jej wpisów w tle. "
+                    "Kategoria musi należeć do zalogowanego użytkownika. "
+                    "Postęp można sprawdzić pod adresem z nagłówka `Location`.",
         parameters=[
             OpenApiParameter(name='pk', type=OpenApiTypes.INT, location=OpenApiParameter.PATH,
                              description='**ID kategorii** przychodów do usunięcia.', required=True),
         ],
         responses={
-            204: {'description': 'Kategoria została pomyślnie usunięta.'},
+            202: PendingDeletionSerializer,
             401: {'description': 'Brak autoryzacji.'},
             404: {'description': 'Kategoria nie znaleziona lub nie należy do użytkownika.'},
         }
     )
     def delete(self, request, *args, **kwargs):
-        return super().delete(request, *args, **kwargs)
+        pending = schedule_category_deletion(self.get_object())
+        return deletion_accepted_response(pending)
 
 
-class ExpensesCategoryView(generics.ListCreateAPIView):
+class ExpensesCategoryView(LedgerETagMixin, generics.ListCreateAPIView):
     """
     **Zarządzanie kategoriami wydatków.**
 
@@ -303,7 +467,7 @@ class ExpensesCategoryView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return ExpensesCategory.objects.filter(user=user).order_by('category')
+        return ExpensesCategory.objects.filter(user=user, is_deleted=False).order_by('category')
 
     @extend_schema(
         summary="Pobierz listę kategorii wydatków użytkownika",
@@ -314,6 +478,9 @@ class ExpensesCategoryView(generics.ListCreateAPIView):
         }
     )
     def get(self, request, *args, **kwargs):
+        not_modified = self.ledger_not_modified(request)
+        if not_modified is not None:
+            return not_modified
         return super().get(request, *args, **kwargs)
 
     @extend_schema(
@@ -339,60 +506,90 @@ class ExpensesCategoryDelete(generics.DestroyAPIView):
     **Usuwanie kategorii wydatków.**
 
     Ten endpoint pozwala na usunięcie konkretnej kategorii wydatków
-    należącej do zalogowanego użytkownika po jej ID.
+    należącej do zalogowanego użytkownika po jej ID. Kategoria znika od razu,
+    a jej wydatki są usuwane w tle (odpowiedź 202).
     """
     serializer_class = ExpensesCategorySerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         user = self.request.user
-        return ExpensesCategory.objects.filter(user=user)
+        return ExpensesCategory.objects.filter(user=user, is_deleted=False)
 
     @extend_schema(
         summary="Usuń kategorię wydatków",
-        description="Usuwa kategorię wydatków. Kategoria musi należeć do zalogowanego użytkownika.",
+        description="Oznacza kategorię wydatków jako usuniętą i zleca usunięcie jej wpisów w tle. "
+                    "Kategoria musi należeć do zalogowanego użytkownika. "
+                    "Postęp można sprawdzić pod adresem z nagłówka `Location`.",
         parameters=[
             OpenApiParameter(name='pk', type=OpenApiTypes.INT, location=OpenApiParameter.PATH,
                              description='**ID kategorii** wydatków do usunięcia.', required=True),
         ],
         responses={
-            204: {'description': 'Kategoria została pomyślnie usunięta.'},
+            202: PendingDeletionSerializer,
             401: {'description': 'Brak autoryzacji.'},
             404: {'description': 'Kategoria nie znaleziona lub nie należy do użytkownika.'},
         }
     )
     def delete(self, request, *args, **kwargs):
-        return super().delete(request, *args, **kwargs)
+        pending = schedule_category_deletion(self.get_object())
+        return deletion_accepted_response(pending)
 
 
-class IncomesView(generics.ListCreateAPIView):
+class IncomesView(LedgerETagMixin, generics.ListCreateAPIView):
     """
     **Zarządzanie przychodami.**
 
     Ten endpoint pozwala na pobranie listy wszystkich przychodów użytkownika
     oraz na dodawanie nowych przychodów.
-    Możliwe jest filtrowanie po roku i miesiącu w URL-u.
+    Możliwe jest filtrowanie po roku i miesiącu w URL-u oraz po kategoriach,
+    kwotach i datach w parametrach zapytania.
     """
     serializer_class = IncomesSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = LedgerCursorPagination
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Incomes.objects.filter(user=user)
+        queryset = Incomes.objects.filter(user=user, category__is_deleted=False).select_related('category')
 
         year = self.kwargs.get('year')
         month = self.kwargs.get('month')
 
         if year and month:
-            queryset = queryset.filter(date__year=year, date__month=month)
-
-        return queryset.order_by('-date')
+            try:
+                queryset = filter_by_month(queryset, year, month)
+            except ValueError:
+                return queryset.none()
+
+        filters = LedgerListFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        queryset = filter_ledger(queryset, filters.validated_data)
+        # Kolejność czytana też przez `LedgerCursorPagination` (pola kursora).
+        self.ledger_ordering = LEDGER_ORDERINGS[filters.validated_data['ordering']]
+        return queryset.order_by(*self.ledger_ordering)
+
+    def paginate_queryset(self, queryset):
+        if self.kwargs.get('year') and self.kwargs.get('month'):
+            return None
+        return super().paginate_queryset(queryset)
+
+    def list(self, request, *args, **kwargs):
+        # Wiersze `.values()` są serializowane bezpośrednio przez `LedgerListSerializer`.
+        queryset = self.filter_queryset(self.get_queryset()).values(*LEDGER_LIST_VALUES)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
     
     @extend_schema(
         summary="Pobierz listę przychodów użytkownika",
         description="Zwraca listę wszystkich przychodów zalogowanego użytkownika. "
-                    "Można filtrować wyniki, podając rok i miesiąc w ścieżce URL.",
+                    "Można filtrować wyniki, podając rok i miesiąc w ścieżce URL, oraz parametrami "
+                    "kategorii, zakresu kwot i dat; `ordering` wybiera sortowanie. "
+                    "Bez filtra miesiąca wyniki są stronicowane kursorem (parametry `cursor` i `page_size`).",
         parameters=[
+            LedgerListFilterSerializer,
             OpenApiParameter(name='year', type=OpenApiTypes.INT, location=OpenApiParameter.PATH,
                              description='Rok (np. `2024`) do filtrowania przychodów.', required=False,
                              examples=[OpenApiExample('Bieżący rok', value=2024)]),
@@ -406,6 +603,9 @@ class IncomesView(generics.ListCreateAPIView):
         }
     )
     def get(self, request, *args, **kwargs):
+        not_modified = self.ledger_not_modified(request)
+        if not_modified is not None:
+            return not_modified
         return super().get(request, *args, **kwargs)
     
     @extend_schema(
@@ -423,10 +623,53 @@ class IncomesView(generics.ListCreateAPIView):
     
     def perform_create(self, serializer):
         if serializer.is_valid():
-            serializer.save(user=self.request.user)
+            with transaction.atomic():
+                serializer.save(user=self.request.user)
         else:
             print(serializer.errors)
 
+class IncomesBulkView(APIView):
+    """
+    **Masowe dodawanie przychodów.**
+
+    Ten endpoint pozwala dodać w jednym żądaniu wiele przychodów (np. tysiące wpisów).
+    Niepoprawne wpisy są zwracane jako lista błędów, a poprawne zapisywane,
+    chyba że włączono tryb `atomic` (wszystko albo nic).
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Dodaj wiele przychodów jednocześnie",
+        description="Waliduje każdy wpis osobno, sprawdza kategorie jednym zapytaniem i zapisuje "
+                    "poprawne wpisy porcjami. Zwraca `201`, gdy zapisano wszystkie wpisy, `207`, gdy "
+                    "zapisano tylko część, oraz `400`, gdy nie zapisano żadnego.",
+        request=LedgerBulkCreateSerializer,
+        responses={
+            201: LedgerBulkResultSerializer,
+            207: LedgerBulkResultSerializer,
+            400: LedgerBulkResultSerializer,
+            401: {'description': 'Brak autoryzacji.'},
+        }
+    )
+    def post(self, request):
+        serializer = LedgerBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        created, errors = bulk_create_transactions(
+            Incomes, IncomesCategory, request.user,
+            serializer.validated_data['items'], atomic=serializer.validated_data['atomic']
+        )
+        if not created:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response({
+            'created': len(created),
+            'ids': [obj.id for obj in created],
+            'errors': errors,
+        }, status=response_status)
+
 class IncomesDelete(generics.DestroyAPIView):
     """
     **Usuwanie przychodu.**
@@ -439,7 +682,7 @@ class IncomesDelete(generics.DestroyAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Incomes.objects.filter(user=user)
+        return Incomes.objects.filter(user=user, category__is_deleted=False).select_related('category')
 
     @extend_schema(
         summary="Usuń przychód",
@@ -457,35 +700,65 @@ class IncomesDelete(generics.DestroyAPIView):
     def delete(self, request, *args, **kwargs):
         return super().delete(request, *args, **kwargs)
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+
 
-class ExpensesView(generics.ListCreateAPIView):
+class ExpensesView(LedgerETagMixin, generics.ListCreateAPIView):
     """
     **Zarządzanie wydatkami.**
 
     Ten endpoint pozwala na pobranie listy wszystkich wydatków użytkownika
     oraz na dodawanie nowych wydatków.
-    Możliwe jest filtrowanie po roku i miesiącu w URL-u.
+    Możliwe jest filtrowanie po roku i miesiącu w URL-u oraz po kategoriach,
+    kwotach i datach w parametrach zapytania.
     """
     serializer_class = ExpensesSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = LedgerCursorPagination
 
     def get_queryset(self):
         user = self.request.user
-        queryset = Expenses.objects.filter(user=user)
+        queryset = Expenses.objects.filter(user=user, category__is_deleted=False).select_related('category')
 
         year = self.kwargs.get('year')
         month = self.kwargs.get('month')
         
         if year and month:
-            queryset = queryset.filter(date__year=year, date__month=month)
-
-        return queryset.order_by('-date')
+            try:
+                queryset = filter_by_month(queryset, year, month)
+            except ValueError:
+                return queryset.none()
+
+        filters = LedgerListFilterSerializer(data=self.request.query_params)
+        filters.is_valid(raise_exception=True)
+        queryset = filter_ledger(queryset, filters.validated_data)
+        # Kolejność czytana też przez `LedgerCursorPagination` (pola kursora).
+        self.ledger_ordering = LEDGER_ORDERINGS[filters.validated_data['ordering']]
+        return queryset.order_by(*self.ledger_ordering)
+
+    def paginate_queryset(self, queryset):
+        if self.kwargs.get('year') and self.kwargs.get('month'):
+            return None
+        return super().paginate_queryset(queryset)
+
+    def list(self, request, *args, **kwargs):
+        # Wiersze `.values()` są serializowane bezpośrednio przez `LedgerListSerializer`.
+        queryset = self.filter_queryset(self.get_queryset()).values(*LEDGER_LIST_VALUES)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
     
     @extend_schema(
         summary="Pobierz listę wydatków użytkownika",
         description="Zwraca listę wszystkich wydatków zalogowanego użytkownika. "
-                    "Można filtrować wyniki, podając rok i miesiąc w ścieżce URL.",
+                    "Można filtrować wyniki, podając rok i miesiąc w ścieżce URL, oraz parametrami "
+                    "kategorii, zakresu kwot i dat; `ordering` wybiera sortowanie. "
+                    "Bez filtra miesiąca wyniki są stronicowane kursorem (parametry `cursor` i `page_size`).",
         parameters=[
+            LedgerListFilterSerializer,
             OpenApiParameter(name='year', type=OpenApiTypes.INT, location=OpenApiParameter.PATH,
                              description='Rok (np. `2024`) do filtrowania wydatków.', required=False,
                              examples=[OpenApiExample('Bieżący rok', value=2024)]),
@@ -499,6 +772,9 @@ class ExpensesView(generics.ListCreateAPIView):
         }
     )
     def get(self, request, *args, **kwargs):
+        not_modified = self.ledger_not_modified(request)
+        if not_modified is not None:
+            return not_modified
         return super().get(request, *args, **kwargs)
     
     @extend_schema(
@@ -516,10 +792,53 @@ class ExpensesView(generics.ListCreateAPIView):
     
     def perform_create(self, serializer):
         if serializer.is_valid():
-            serializer.save(user=self.request.user)
+            with transaction.atomic():
+                serializer.save(user=self.request.user)
         else:
             print(serializer.errors)
 
+class ExpensesBulkView(APIView):
+    """
+    **Masowe dodawanie wydatków.**
+
+    Ten endpoint pozwala dodać w jednym żądaniu wiele wydatków (np. tysiące wpisów).
+    Niepoprawne wpisy są zwracane jako lista błędów, a poprawne zapisywane,
+    chyba że włączono tryb `atomic` (wszystko albo nic).
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Dodaj wiele wydatków jednocześnie",
+        description="Waliduje każdy wpis osobno, sprawdza kategorie jednym zapytaniem i zapisuje "
+                    "poprawne wpisy porcjami. Zwraca `201`, gdy zapisano wszystkie wpisy, `207`, gdy "
+                    "zapisano tylko część, oraz `400`, gdy nie zapisano żadnego.",
+        request=LedgerBulkCreateSerializer,
+        responses={
+            201: LedgerBulkResultSerializer,
+            207: LedgerBulkResultSerializer,
+            400: LedgerBulkResultSerializer,
+            401: {'description': 'Brak autoryzacji.'},
+        }
+    )
+    def post(self, request):
+        serializer = LedgerBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        created, errors = bulk_create_transactions(
+            Expenses, ExpensesCategory, request.user,
+            serializer.validated_data['items'], atomic=serializer.validated_data['atomic']
+        )
+        if not created:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response({
+            'created': len(created),
+            'ids': [obj.id for obj in created],
+            'errors': errors,
+        }, status=response_status)
+
 class ExpensesDelete(generics.DestroyAPIView):
     """
     **Usuwanie wydatku.**
@@ -532,7 +851,7 @@ class ExpensesDelete(generics.DestroyAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Expenses.objects.filter(user=user)
+        return Expenses.objects.filter(user=user, category__is_deleted=False).select_related('category')
     
     @extend_schema(
         summary="Usuń wydatek",
@@ -549,14 +868,151 @@ class ExpensesDelete(generics.DestroyAPIView):
     )
     def delete(self, request, *args, **kwargs):
         return super().delete(request, *args, **kwargs)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
     
 
-class MonthlySummaryView(APIView):
+class TransactionImportView(APIView):
+    """
+    **Import transakcji z pliku CSV.**
+
+    Ten endpoint pozwala wczytać historię przychodów i wydatków z pliku CSV
+    (np. eksportu z banku). Plik jest przetwarzany strumieniowo i zapisywany porcjami.
+    Import odbywa się w ramach żądania, więc rozmiar pliku i liczba wierszy są ograniczone
+    (`LEDGER_IMPORT_MAX_BYTES`, `LEDGER_IMPORT_MAX_ROWS`); większe pliki importuje
+    polecenie `import_transactions`.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+
+    @extend_schema(
+        summary="Zaimportuj transakcje z pliku CSV",
+        description="Wczytuje plik CSV, tworzy brakujące kategorie i zapisuje przychody oraz wydatki. "
+                    "Niepoprawne wiersze są pomijane i raportowane. Plik przekraczający limit "
+                    "rozmiaru lub liczby wierszy jest odrzucany w całości (400).",
+        request={'multipart/form-data': TransactionImportSerializer},
+        responses={
+            201: TransactionImportResultSerializer,
+            400: ValidationErrorSerializer,
+            401: {'description': 'Brak autoryzacji.'},
+        }
+    )
+    def post(self, request):
+        serializer = TransactionImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        importer = TransactionImporter(
+            request.user,
+            columns=serializer.get_columns(),
+            delimiter=serializer.validated_data['delimiter'],
+            date_format=serializer.validated_data['date_format'],
+            decimal_comma=serializer.validated_data['decimal_comma'],
+            max_rows=settings.LEDGER_IMPORT_MAX_ROWS,
+        )
+        stream = io.TextIOWrapper(serializer.validated_data['file'].file, encoding='utf-8-sig', newline='')
+        try:
+            result = importer.run(stream)
+        except (ValueError, csv.Error) as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        response_status = status.HTTP_201_CREATED if result.created else status.HTTP_400_BAD_REQUEST
+        return Response(result.as_dict(), status=response_status)
+
+
+class LedgerExportView(APIView):
+    """
+    **Eksport wszystkich przychodów i wydatków użytkownika.**
+
+    Ten endpoint zwraca całą księgę użytkownika jako plik CSV lub JSON.
+    Odpowiedź jest generowana strumieniowo, więc zużycie pamięci nie zależy od liczby wpisów.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Eksportuj przychody i wydatki",
+        description="Zwraca plik CSV (kolumny: type, id, date, category, amount, description) lub JSON "
+                    "z transakcjami użytkownika. Można zawęzić rodzaj transakcji, zakres dat i kwot "
+                    "oraz kategorie (wymaga `kind`), a także włączyć kompresję gzip.",
+        parameters=[LedgerExportSerializer],
+        responses={
+            (200, 'text/csv'): OpenApiTypes.BINARY,
+            (200, 'application/json'): OpenApiTypes.BINARY,
+            (200, 'application/gzip'): OpenApiTypes.BINARY,
+            400: ValidationErrorSerializer,
+            401: {'description': 'Brak autoryzacji.'},
+        }
+    )
+    def get(self, request):
+        serializer = LedgerExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        models = {'all': [Incomes, Expenses], 'incomes': [Incomes], 'expenses': [Expenses]}[params['kind']]
+        rows = ledger_rows(request.user, models, params)
+        if params['output'] == 'json':
+            chunks, content_type = stream_json(rows), 'application/json'
+        else:
+            chunks, content_type = stream_csv(rows), 'text/csv'
+        filename = f"savespace-{params['kind']}.{params['output']}"
+
+        if params['compress'] == 'gzip':
+            chunks, content_type, filename = gzip_stream(chunks), 'application/gzip', filename + '.gz'
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class TransactionSearchView(APIView):
+    """
+    **Wyszukiwanie pełnotekstowe w opisach przychodów i wydatków.**
+
+    Ten endpoint przeszukuje opisy transakcji użytkownika w obu tabelach naraz
+    i zwraca wyniki uszeregowane według trafności.
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = TransactionSearchPagination
+
+    @extend_schema(
+        summary="Wyszukaj przychody i wydatki po opisie",
+        description="Zwraca przychody i wydatki, których opis zawiera wszystkie podane słowa "
+                    "(ostatnie także jako początek słowa), od najtrafniejszych; przy równej trafności od najnowszych. "
+                    "Można zawęzić zakres dat i rodzaj transakcji. Wyniki są stronicowane kursorem "
+                    "(parametry `cursor` i `page_size`).",
+        parameters=[
+            TransactionSearchSerializer,
+            OpenApiParameter(name='cursor', type=OpenApiTypes.STR, location=OpenApiParameter.QUERY,
+                             description='Kursor kolejnej strony (z pola `next`).', required=False),
+            OpenApiParameter(name='page_size', type=OpenApiTypes.INT, location=OpenApiParameter.QUERY,
+                             description='Liczba wyników na stronie.', required=False),
+        ],
+        responses={
+            200: TransactionSearchPageSerializer,
+            400: ValidationErrorSerializer,
+            401: {'description': 'Brak autoryzacji.'},
+            404: {'description': 'Nieprawidłowy kursor.'},
+        }
+    )
+    def get(self, request):
+        serializer = TransactionSearchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        kinds = {'all': ('expense', 'income'), 'incomes': ('income',), 'expenses': ('expense',)}[params['kind']]
+        paginator = self.pagination_class()
+        page = paginator.paginate_search(request, lambda after, limit: search_transactions(
+            request.user, params['q'], kinds, params.get('date_from'), params.get('date_to'), after, limit,
+        ))
+        return paginator.get_paginated_response(TransactionSearchResultSerializer(page, many=True).data)
+
+
+class MonthlySummaryView(LedgerETagMixin, APIView):
     """
     **Miesięczne podsumowanie przychodów i wydatków.**
 
     Ten endpoint zwraca zagregowane dane o przychodach i wydatkach dla danego
     roku i miesiąca, pogrupowane według kategorii.
+    Dane pochodzą z przyrostowo aktualizowanej tabeli `MonthlyCategoryTotal` i są
+    przechowywane w cache do czasu zmiany wpisów z danego miesiąca.
     """
     permission_classes = [IsAuthenticated]
 
@@ -606,6 +1062,9 @@ class MonthlySummaryView(APIView):
         }
     )
     def get(self, request, year, month):
+        not_modified = self.ledger_not_modified(request)
+        if not_modified is not None:
+            return not_modified
         user = request.user
         try:
             current_year = datetime.datetime.now().year
@@ -626,45 +1085,134 @@ class MonthlySummaryView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        incomes_summary_raw = Incomes.objects.filter(
-            user=user,
-            date__year=year,
-            date__month=month
-        ).values('category__category').annotate(total_amount=Coalesce(Sum('amount'), Decimal('0.00')))
-
-        expenses_summary_raw = Expenses.objects.filter(
-            user=user,
-            date__year=year,
-            date__month=month
-        ).values('category__category').annotate(total_amount=Coalesce(Sum('amount'), Decimal('0.00')))
-
-        total_income = sum(item['total_amount'] for item in incomes_summary_raw)
-        total_expense = sum(item['total_amount'] for item in expenses_summary_raw)
-
-        balance = total_income - total_expense
-
-        sorted_income_by_category_list = sorted(
-            [(item['category__category'], item['total_amount']) for item in incomes_summary_raw],
-            key=lambda x: x[1],
-            reverse=True
-        )
-        income_by_category_ordered = {k: v for k, v in sorted_income_by_category_list}
+        response_data, hit = cached_month_summary(user.id, year, month, self.ledger_data_version)
+        response = Response(response_data, status=status.HTTP_200_OK)
+        response['X-Summary-Cache'] = 'hit' if hit else 'miss'
+        return response
 
-        sorted_expense_by_category_list = sorted(
-            [(item['category__category'], item['total_amount']) for item in expenses_summary_raw],
-            key=lambda x: x[1],
-            reverse=True
-        )
-        expense_by_category_ordered = {k: v for k, v in sorted_expense_by_category_list}
 
-        response_data = {
+class DashboardView(LedgerETagMixin, APIView):
+    """
+    **Dane ekranu głównego dla wybranego miesiąca.**
+
+    Ten endpoint zwraca w jednej odpowiedzi przychody i wydatki z miesiąca, obie listy
+    kategorii oraz sumy miesięczne, zastępując cztery osobne żądania.
+    Liczba zapytań do bazy jest stała, niezależnie od liczby wpisów.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Pobierz dane ekranu głównego dla miesiąca",
+        description="Zwraca przychody i wydatki z danego miesiąca, kategorie przychodów i wydatków "
+                    "oraz sumę przychodów, sumę wydatków i bilans miesiąca.",
+        parameters=[
+            OpenApiParameter(name='year', type=OpenApiTypes.INT, location=OpenApiParameter.PATH,
+                             description='**Rok** (np. `2024`).', required=True,
+                             examples=[OpenApiExample('Rok 2024', value=2024)]),
+            OpenApiParameter(name='month', type=OpenApiTypes.INT, location=OpenApiParameter.PATH,
+                             description='**Miesiąc** (np. `6` dla czerwca).', required=True,
+                             examples=[OpenApiExample('Czerwiec', value=6)]),
+        ],
+        responses={
+            200: DashboardSerializer,
+            400: ErrorSerializer,
+            401: {'description': 'Brak autoryzacji.'},
+        }
+    )
+    def get(self, request, year, month):
+        not_modified = self.ledger_not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        user = request.user
+        try:
+            start, end = month_date_range(year, month)
+        except ValueError:
+            return Response(
+                {"error": "Invalid year or month combination."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        incomes = list(Incomes.objects.filter(
+            user=user, category__is_deleted=False, date__gte=start, date__lt=end
+        ).order_by('-date', '-id').values(*LEDGER_LIST_VALUES))
+        expenses = list(Expenses.objects.filter(
+            user=user, category__is_deleted=False, date__gte=start, date__lt=end
+        ).order_by('-date', '-id').values(*LEDGER_LIST_VALUES))
+
+        total_income = sum((income['amount'] for income in incomes), Decimal('0.00'))
+        total_expense = sum((expense['amount'] for expense in expenses), Decimal('0.00'))
+
+        dashboard = {
             'year': year,
             'month': month,
-            'total_income': f"{total_income:.2f}",
-            'total_expense': f"{total_expense:.2f}",
-            'balance': f"{balance:.2f}",
-            'income_by_category': income_by_category_ordered,
-            'expense_by_category': expense_by_category_ordered,
+            'total_income': total_income,
+            'total_expense': total_expense,
+            'balance': total_income - total_expense,
+            'incomes': incomes,
+            'expenses': expenses,
+            'incomes_categories': IncomesCategory.objects.filter(user=user, is_deleted=False).order_by('category'),
+            'expenses_categories': ExpensesCategory.objects.filter(user=user, is_deleted=False).order_by('category'),
+        }
+        return Response(DashboardSerializer(dashboard).data, status=status.HTTP_200_OK)
+
+class RangeSummaryView(LedgerETagMixin, APIView):
+    """
+    **Podsumowanie przychodów i wydatków dla zakresu miesięcy.**
+
+    Ten endpoint zwraca sumy pogrupowane według miesiąca i kategorii dla całego
+    zakresu (np. roku) w jednej odpowiedzi, zamiast osobnego żądania na każdy miesiąc.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Pobierz podsumowanie finansowe dla zakresu miesięcy",
+        description="Zwraca sumy przychodów i wydatków pogrupowane według miesiąca i kategorii "
+                    "(jedno zapytanie do tabeli sum miesięcznych) oraz bilans całego zakresu. "
+                    "Filtr kategorii (wymaga `kind`) korzysta z sum miesięcznych; filtry kwot i dat "
+                    "agregują surowe wpisy.",
+        parameters=[SummaryRangeSerializer],
+        responses={
+            200: {
+                'type': 'object',
+                'properties': {
+                    'from': {'type': 'string', 'description': 'Pierwszy miesiąc zakresu (YYYY-MM).'},
+                    'to': {'type': 'string', 'description': 'Ostatni miesiąc zakresu (YYYY-MM).'},
+                    'total_income': {'type': 'string', 'format': 'decimal'},
+                    'total_expense': {'type': 'string', 'format': 'decimal'},
+                    'balance': {'type': 'string', 'format': 'decimal'},
+                    'months': {
+                        'type': 'array',
+                        'description': 'Podsumowanie każdego miesiąca (w formacie podsumowania miesięcznego).',
+                        'items': {'type': 'object'},
+                    },
+                },
+            },
+            400: ValidationErrorSerializer,
+            401: {'description': 'Brak autoryzacji.'},
         }
+    )
+    def get(self, request):
+        not_modified = self.ledger_not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        serializer = SummaryRangeSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        start = params['from']
+        end = month_date_range(params['to'].year, params['to'].month)[1]
+        kinds = {
+            'all': (MonthlyCategoryTotal.KIND_INCOME, MonthlyCategoryTotal.KIND_EXPENSE),
+            'incomes': (MonthlyCategoryTotal.KIND_INCOME,),
+            'expenses': (MonthlyCategoryTotal.KIND_EXPENSE,),
+        }[params['kind']]
+        filters = {key: value for key, value in params.items() if key not in ('from', 'to', 'kind')}
 
+        response_data = {
+            'from': request.query_params['from'],
+            'to': request.query_params['to'],
+            **single_flight.do(
+                f'range:{request.user.id}:{start}:{end}:{",".join(kinds)}:{sorted(filters.items())}',
+                lambda: range_summary(request.user, start, end, kinds, filters)
+            )[0],
+        }
         return Response(response_data, status=status.HTTP_200_OK)
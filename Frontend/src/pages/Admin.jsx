@@ -5,6 +5,8 @@ import '../styles/Admin.css';
 
 function Admin() {
 	const [users, setUsers] = useState([]);
+	const [nextPage, setNextPage] = useState(null);
+	const [search, setSearch] = useState('');
 	const [loading, setLoading] = useState(true);
 	const [error, setError] = useState('');
 	const [editingUser, setEditingUser] = useState(null);
@@ -36,30 +38,28 @@ function Admin() {
 		return 'Użytkownik';
 	};
 
-	const fetchUsers = useCallback(async () => {
+	const fetchUsers = useCallback(async (url = null) => {
 		setLoading(true);
 		setError('');
 		try {
-			const response = await api.get('/api/admin/users/');
-			let fetchedUsers = [];
-			if (response.data && Array.isArray(response.data.results)) {
-				fetchedUsers = response.data.results;
-			} else if (Array.isArray(response.data)) {
-				fetchedUsers = response.data;
-			} else {
+			// Lista jest stronicowana kursorem; `next` to adres kolejnej strony.
+			const response = url
+				? await api.get(url)
+				: await api.get('/api/admin/users/', { params: { search: search || undefined, stats: 1 } });
+			if (!response.data || !Array.isArray(response.data.results)) {
 				setError('Nieoczekiwany format danych z serwera.');
 				setUsers([]);
 				return;
 			}
-			const sortedUsers = fetchedUsers.sort((a, b) => a.id - b.id);
-			setUsers(sortedUsers);
+			setUsers((prevUsers) => url ? [...prevUsers, ...response.data.results] : response.data.results);
+			setNextPage(response.data.next);
 		} catch (err) {
 			setError('Nie udało się załadować listy użytkowników. Sprawdź uprawnienia administratora.');
 			setUsers([]);
 		} finally {
 			setLoading(false);
 		}
-	}, []);
+	}, [search]);
 
 	useEffect(() => {
 		fetchUsers();
@@ -166,7 +166,7 @@ function Admin() {
 		}
 	};
 
-	if (loading) {
+	if (loading && users.length === 0) {
 		return (
 			<div className='admin-app-content'>
 				<p>Ładowanie panelu administracyjnego...</p>
@@ -267,6 +267,13 @@ function Admin() {
 			)}
 			<div className="user-list-section">
 				<h3>Lista użytkowników</h3>
+				<input
+					type="search"
+					className="user-search"
+					placeholder="Szukaj po nazwie lub e-mailu..."
+					value={search}
+					onChange={(e) => setSearch(e.target.value)}
+				/>
 				<table className="users-table">
 					<thead>
 						<tr>
@@ -371,6 +378,9 @@ function Admin() {
 														<p><strong>Nazwisko:</strong> {user.last_name || 'N/A'}</p>
 														<p><strong>Email:</strong> {user.email}</p>
 														<p><strong>Rola:</strong> {getUserRole(user)}</p>
+														<p><strong>Przychody:</strong> {user.incomes_count} ({user.total_incomes})</p>
+														<p><strong>Wydatki:</strong> {user.expenses_count} ({user.total_expenses})</p>
+														<p><strong>Ostatnia aktywność:</strong> {user.last_activity || 'N/A'}</p>
 														<div className="action-buttons">
 															<button
 																className="edit-button"
@@ -401,6 +411,11 @@ function Admin() {
 						)}
 					</tbody>
 				</table>
+				{nextPage && (
+					<button className="toggle-form-button" onClick={() => fetchUsers(nextPage)} disabled={loading}>
+						załaduj więcej
+					</button>
+				)}
 			</div>
 		</div>
 	);
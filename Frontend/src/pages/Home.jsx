@@ -29,44 +29,30 @@ function Home() {
 
   document.title = "Home";
 
-  const fetchSummaryData = useCallback(async () => {
+  const fetchDashboardData = useCallback(async () => {
     setLoading(true);
     setError(null);
     try {
-      const API_URL = `/api/categories/summary/${year}/${month}/`;
-      const response = await api.get(API_URL);
-      setSummary(response.data);
+      const response = await api.get(`/api/dashboard/${year}/${month}/`);
+      const { incomes, expenses, incomes_categories, expenses_categories, ...totals } = response.data;
+      setExpenses(expenses);
+      setIncomes(incomes);
+      setCategories({ expenses: expenses_categories, incomes: incomes_categories });
+      setSummary(totals);
     } catch (err) {
-      console.error("Błąd podczas pobierania podsumowania:", err);
-      if (err.response && err.response.status === 404) {
-        setSummary({ total_income: 0, total_expense: 0, balance: 0 });
-      } else {
-        setError("Nie udało się załadować podsumowania. Spróbuj ponownie.");
-        setSummary({ total_income: 0, total_expense: 0, balance: 0 });
-      }
+      console.error("Błąd podczas pobierania danych:", err);
+      setError("Nie udało się załadować danych. Spróbuj ponownie.");
+      setExpenses([]);
+      setIncomes([]);
+      setSummary({ total_income: 0, total_expense: 0, balance: 0 });
     } finally {
       setLoading(false);
     }
-  }, [year, month, setSummary, setLoading, setError]);
+  }, [year, month, setExpenses, setIncomes, setCategories, setSummary, setLoading, setError]);
 
   useEffect(() => {
-    fetchSummaryData();
-  }, [fetchSummaryData]);
-
-  useEffect(() => {
-    const fetchCategories = async () => {
-      try {
-        const response1 = await api.get('/api/expenses/categories/');
-        const response2 = await api.get('/api/incomes/categories/');
-        setCategories({ expenses: response1.data, incomes: response2.data });
-      } catch (err) {
-        console.error("Błąd podczas pobierania kategorii:", err);
-        setError("Nie udało się załadować kategorii. Spróbuj ponownie.");
-      }
-    };
-
-    fetchCategories();
-  }, []);
+    fetchDashboardData();
+  }, [fetchDashboardData]);
 
   const handleTypeChange = (newType) => {
     setFormData(prevFormData => ({
@@ -115,8 +101,7 @@ function Home() {
         type: formData.type 
       });
 
-      await fetchSummaryData();
-      await fetchTransactionsData();
+      await fetchDashboardData();
 
     } catch (err) {
       setFormError("Błąd podczas dodawania transakcji:", err);
@@ -135,35 +120,6 @@ function Home() {
     }
   };
 
-  const fetchTransactionsData = useCallback(async () => {
-    setLoading(true);
-    setError(null);
-    try {
-      const expensesResponse = await api.get(`/api/expenses/${year}/${month}/`);
-      setExpenses(expensesResponse.data);
-
-      const incomesResponse = await api.get(`/api/incomes/${year}/${month}/`);
-      setIncomes(incomesResponse.data);
-
-    } catch (err) {
-      console.error("Błąd podczas pobierania transakcji:", err);
-      if (err.response && err.response.status === 404) {
-        setExpenses([]);
-        setIncomes([]);
-      } else {
-        setError("Nie udało się załadować transakcji. Spróbuj ponownie.");
-        setExpenses([]);
-        setIncomes([]);
-      }
-    } finally {
-      setLoading(false);
-    }
-  }, [year, month, setExpenses, setIncomes, setLoading, setError]);
-
-  useEffect(() => {
-    fetchTransactionsData();
-  }, [fetchTransactionsData]);
-
   const toggleTransactionDetails = (idToToggle, typeOfTransaction) => {
     if (expandedTransaction.type === typeOfTransaction && expandedTransaction.id === idToToggle) {
       setExpandedTransaction({ type: null, id: null });
@@ -185,8 +141,7 @@ function Home() {
       : `/api/incomes/delete/${id}/`;
     
     await api.delete(API_URL);
-    await fetchTransactionsData();
-    await fetchSummaryData();
+    await fetchDashboardData();
 
     } catch (err) {
       console.error("Błąd podczas usuwania transakcji:", err);
@@ -200,7 +155,7 @@ function Home() {
         setFormSuccess("Transakcja została pomyślnie usunięta.");
       }
     }
-  }, [fetchTransactionsData, fetchSummaryData, setLoading, setError]);
+  }, [fetchDashboardData, setLoading, setError]);
 
   return (
     <div className="main-app-content">
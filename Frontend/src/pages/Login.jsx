@@ -3,6 +3,7 @@ import api from "../api";
 import { useNavigate, Link} from "react-router-dom";
 import { useLocation } from 'react-router-dom';
 import { ACCESS_TOKEN, REFRESH_TOKEN } from "../constants"; 
+import { jwtDecode } from "jwt-decode";
 import LoadingIndicator from "../components/LoadingIndicator";
 
 import useTimedMessage from "../hooks/useTimedMessage";
@@ -42,9 +43,11 @@ function Login() {
 			localStorage.setItem(ACCESS_TOKEN, res.data.access);
 			localStorage.setItem(REFRESH_TOKEN, res.data.refresh);
 
-			const userRes = await api.get("/api/user-info/", {});
-
-			const isSuperUser = userRes.data.is_superuser;
+			// Token zawiera claimy profilu; /api/user-info/ tylko dla starszych tokenów.
+			const claims = jwtDecode(res.data.access);
+			const isSuperUser = "is_superuser" in claims
+				? claims.is_superuser
+				: (await api.get("/api/user-info/", {})).data.is_superuser;
 			localStorage.setItem("IS_SUPERUSER", JSON.stringify(isSuperUser));
 
 			navigate("/");